@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+import core.globals
+from core.metrics import CONTENT_TYPE
+
+router = APIRouter(prefix="/api", tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Pipeline histograms and gauges in the Prometheus text exposition format."""
+    text = await core.globals.job_manager.metrics_text()
+    return PlainTextResponse(text, media_type=CONTENT_TYPE)
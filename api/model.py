@@ -1,34 +1,53 @@
-from fastapi import APIRouter, BackgroundTasks
-from core.model_manager import check_ram_availability, is_model_downloaded, download_model
-from config import WHISPER_MODEL
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from typing import Optional
+import asyncio
+from core.model_manager import (
+    check_ram_availability, is_model_downloaded, download_model, installed_models, model_path, model_load_path,
+    model_size_mb
+)
+from config import WHISPER_MODEL, MODEL_TIERS
 from api.websocket import ws_manager
+import core.globals
 
 router = APIRouter(prefix="/api/model", tags=["model"])
 
 @router.get("/status")
 async def get_model_status():
-    """Returns whether the model is downloaded and checks RAM."""
+    """
+    Returns whether a model is downloaded, which sizes are installed, the one in use with its size on disk
+    (and the directory the workers load it from, i.e. whether the pre-quantized copy is used), and checks RAM.
+    """
+    # Only stats the files once the manifests are written; the first check after an upgrade hashes model.bin
+    installed = await asyncio.to_thread(installed_models)
+    selected = core.globals.job_manager.model_config
     return {
-        "downloaded": is_model_downloaded(),
-        "model": WHISPER_MODEL,
-        "size_mb": 465,
-        "ram_check": check_ram_availability()
+        "downloaded": bool(installed),
+        "model": selected["model"],
+        "size_mb": await asyncio.to_thread(model_size_mb, model_path(selected["model"])),
+        "installed": installed,
+        "selected": selected,
+        "load_path": str(await asyncio.to_thread(model_load_path, selected["model"], selected["compute_type"])),
+        "ram_check": await asyncio.to_thread(check_ram_availability, selected["model"], selected["compute_type"])
     }
 
 @router.post("/download")
-async def start_download(background_tasks: BackgroundTasks):
-    """Triggers background download if not already downloaded."""
-    if is_model_downloaded():
+async def start_download(background_tasks: BackgroundTasks, model: Optional[str] = None):
+    """Triggers background download of a model size (the default one unless `model` is given)."""
+    model = model or WHISPER_MODEL
+    if model not in MODEL_TIERS:
+        raise HTTPException(status_code=400, detail=f"Unknown model size: {model}")
+    if await asyncio.to_thread(is_model_downloaded, model_path(model)):
         return {"status": "already_downloaded"}
         
     async def _download_task():
-        success = await download_model(progress_callback=ws_manager.broadcast)
+        success = await download_model(progress_callback=ws_manager.broadcast, model=model)
         # We can emit final success/error here if needed, but progress_callback does it mostly.
         # Actually, let's emit a completion event
         if success:
-            await ws_manager.broadcast({"event": "model_download_complete"})
+            await ws_manager.broadcast({"event": "model_download_complete", "model": model})
+            await core.globals.job_manager.preload_model()
         else:
-            await ws_manager.broadcast({"event": "model_download_failed"})
+            await ws_manager.broadcast({"event": "model_download_failed", "model": model})
 
     background_tasks.add_task(_download_task)
     return {"status": "download_started"}
@@ -2,6 +2,7 @@ from fastapi import APIRouter
 from api.websocket import router as ws_router
 from api.model import router as model_router
 from api.transcription import router as transcription_router
+from api.metrics import router as metrics_router
 
 api_router = APIRouter()
 
@@ -9,3 +10,4 @@ api_router = APIRouter()
 api_router.include_router(ws_router)
 api_router.include_router(model_router)
 api_router.include_router(transcription_router)
+api_router.include_router(metrics_router)
@@ -1,49 +1,70 @@
-from fastapi import APIRouter, HTTPException, File, UploadFile
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from typing import List, Optional
 from pathlib import Path
-import shutil
+import asyncio
+import os
+import uuid
 import datetime
 import platformdirs
 
 from schemas.models import Job
 import core.globals
-from config import EXPORTS_DIR, TMP_DIR
+from core.upload_receiver import receive_uploads, UploadRejected
+from config import EXPORTS_DIR, TMP_DIR, TRANSCRIPT_CACHE_FULL_HASH
 
 router = APIRouter(prefix="/api", tags=["transcription"])
 
 class JobPathsRequest(BaseModel):
     paths: List[str]
+    priority: int = 0
+
+
+class PriorityRequest(BaseModel):
+    priority: int
 
 
 @router.post("/transcription/upload")
-async def upload_files(files: List[UploadFile] = File(...)):
-    """Receives files via standard multipart format and queues them."""
+async def upload_files(request: Request, total: Optional[int] = None, priority: int = 0):
+    """
+    Streams multipart files (field "files") to TMP_DIR without blocking the event loop and
+    queues each one as soon as it has fully arrived. `total` is the number of files the client
+    is sending, so early jobs already report their batch position.
+    """
     job_ids = []
-    total = len(files)
     new_jobs = []
-
-    for idx, f in enumerate(files):
-        job = Job(
-            original_filename=f.filename,
-            index_in_batch=idx + 1,
-            total_in_batch=total
-        )
-
-        # Save to TMP_DIR
-        safe_name = f"{job.id}_{f.filename}"
-        save_path = TMP_DIR / safe_name
-        save_path.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(save_path, "wb") as buffer:
-            shutil.copyfileobj(f.file, buffer)
-
-        job.original_path = save_path
-        new_jobs.append(job)
-        job_ids.append(job.id)
-
-    core.globals.job_manager.submit_jobs(new_jobs)
+    batch_id = str(uuid.uuid4())
+
+    try:
+        async for landed in receive_uploads(request):
+            job = Job(
+                original_filename=landed["filename"],
+                index_in_batch=len(new_jobs) + 1,
+                total_in_batch=max(total or 0, len(new_jobs) + 1),
+                batch_id=batch_id,
+                priority=priority
+            )
+
+            # Same directory, so this is a rename rather than a copy
+            save_path = TMP_DIR / f"{job.id}_{Path(landed['filename']).name}"
+            os.replace(landed["path"], save_path)
+            job.original_path = save_path
+            if TRANSCRIPT_CACHE_FULL_HASH:
+                # Hashed during the copy: the transcript cache lookup needs no second read of the file.
+                # Otherwise the file gets the same sampled fingerprint as one submitted by path
+                job._content_fingerprint = "sha256:" + landed["sha256"]
+
+            core.globals.job_manager.submit_jobs([job])
+            new_jobs.append(job)
+            job_ids.append(job.id)
+    except UploadRejected as e:
+        # Files that arrived before the quota was hit stay queued
+        raise HTTPException(status_code=e.status_code, detail={"error": str(e), "job_ids": job_ids})
+
+    if not total:
+        for job in new_jobs:
+            job.total_in_batch = len(new_jobs)
     return {"job_ids": job_ids}
 
 
@@ -53,6 +74,7 @@ async def upload_paths(req: JobPathsRequest):
     job_ids = []
     total = len(req.paths)
     new_jobs = []
+    batch_id = str(uuid.uuid4())
 
     for idx, path_str in enumerate(req.paths):
         p = Path(path_str)
@@ -63,7 +85,9 @@ async def upload_paths(req: JobPathsRequest):
             original_filename=p.name,
             original_path=p,
             index_in_batch=idx + 1,
-            total_in_batch=total
+            total_in_batch=total,
+            batch_id=batch_id,
+            priority=req.priority
         )
         new_jobs.append(job)
         job_ids.append(job.id)
@@ -72,9 +96,37 @@ async def upload_paths(req: JobPathsRequest):
     return {"job_ids": job_ids}
 
 
+@router.get("/transcription/pool")
+async def get_pool_stats():
+    """Reports the worker pool configuration and its measured throughput."""
+    return core.globals.job_manager.pool_stats()
+
+
+@router.get("/transcription/cache")
+async def get_cache_stats():
+    """Reports transcript cache hit/miss counters and size."""
+    return core.globals.job_manager.cache_stats()
+
+
+@router.get("/transcription/queue")
+async def get_queue():
+    """Lists waiting jobs in the order the scheduler would dispatch them now."""
+    return core.globals.job_manager.queue_snapshot()
+
+
+@router.post("/transcription/{id}/priority")
+async def set_priority(id: str, req: PriorityRequest):
+    """Reorders a waiting job: higher priority is dispatched first, whatever the scheduling policy."""
+    job = await core.globals.job_manager.get_job(id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    core.globals.job_manager.set_priority(id, req.priority)
+    return {"status": "updated", "priority": req.priority}
+
+
 @router.post("/transcription/{id}/pause")
 async def pause_job(id: str):
-    job = core.globals.job_manager.get_job(id)
+    job = await core.globals.job_manager.get_job(id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     core.globals.job_manager.pause_job(id)
@@ -83,7 +135,7 @@ async def pause_job(id: str):
 
 @router.post("/transcription/{id}/resume")
 async def resume_job(id: str):
-    job = core.globals.job_manager.get_job(id)
+    job = await core.globals.job_manager.get_job(id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     core.globals.job_manager.resume_job(id)
@@ -92,7 +144,7 @@ async def resume_job(id: str):
 
 @router.post("/transcription/{id}/cancel")
 async def cancel_job(id: str):
-    job = core.globals.job_manager.get_job(id)
+    job = await core.globals.job_manager.get_job(id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     core.globals.job_manager.cancel_job(id)
@@ -101,12 +153,21 @@ async def cancel_job(id: str):
 
 @router.get("/transcription/{id}/text")
 async def get_text(id: str):
-    job = core.globals.job_manager.get_job(id)
+    job = await core.globals.job_manager.get_job(id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return {"text": job.result_text}
 
 
+@router.get("/transcription/{id}/trace")
+async def get_trace(id: str):
+    """Chrome trace JSON of the job's pipeline and worker spans (only recorded with AURA_PROFILE=1)."""
+    trace = await asyncio.to_thread(core.globals.job_manager.get_trace, id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="No trace for this job (is profiling enabled?)")
+    return trace
+
+
 class ExportRequest(BaseModel):
     job_ids: List[str]
     mode: str  # "separate" or "merged"
@@ -122,7 +183,7 @@ def _resolve_export_dir(folder_path: Optional[str]) -> Path:
 @router.post("/export/single")
 async def export_single(job_id: str):
     """Exports a single job's text to the Documents/AuraTranscribe folder."""
-    job = core.globals.job_manager.get_job(job_id)
+    job = await core.globals.job_manager.get_job(job_id)
     if not job or not job.result_text:
         raise HTTPException(status_code=404, detail="Job or text not found")
 
@@ -148,7 +209,7 @@ async def export_batch(req: ExportRequest):
     if req.mode == "separate":
         exported = []
         for jid in req.job_ids:
-            job = core.globals.job_manager.get_job(jid)
+            job = await core.globals.job_manager.get_job(jid)
             if not job or not job.result_text:
                 continue
 
@@ -166,8 +227,7 @@ async def export_batch(req: ExportRequest):
         return {"status": "exported", "mode": "separate", "files": exported, "folder": str(export_dir)}
 
     elif req.mode == "merged":
-        jobs = [core.globals.job_manager.get_job(jid) for jid in req.job_ids
-                if core.globals.job_manager.get_job(jid)]
+        jobs = [job for job in [await core.globals.job_manager.get_job(jid) for jid in req.job_ids] if job]
         if not jobs:
             raise HTTPException(status_code=404, detail="No jobs found")
 
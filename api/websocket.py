@@ -1,34 +1,112 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import List
+from collections import deque
+from typing import List, Dict, Optional, Tuple
+import asyncio
+import json
 import logging
+import time
+
+from config import WS_MAX_PENDING_MESSAGES
+from core.metrics import WS_SEND_SECONDS
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Events where only the latest message per job matters; anything else is never dropped
+COALESCED_EVENTS = {"progress", "model_download"}
+
+
+class ClientChannel:
+    """
+    Bounded send queue plus a dedicated writer task for one WebSocket client,
+    so a slow client only ever delays itself.
+    A newer coalescable event replaces the pending one with the same key: the stale one is dropped and
+    the new one queued at the tail, so it is never sent ahead of messages queued after the stale one.
+    """
+
+    def __init__(self, websocket: WebSocket, max_pending: int = WS_MAX_PENDING_MESSAGES):
+        self.websocket = websocket
+        self.max_pending = max_pending
+        # Items are [coalesce_key, text, enqueued_at]; pending coalesced items are also indexed by key in _by_key.
+        # A replacement inherits enqueued_at, so the latency covers the whole time the update waited
+        self._pending: deque = deque()
+        self._by_key: Dict[Tuple[str, Optional[str]], list] = {}
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._writer())
+
+    def enqueue(self, text: str, coalesce_key: Optional[Tuple[str, Optional[str]]] = None) -> bool:
+        """Queues a serialized message. Returns False when the client has fallen too far behind."""
+        stale = self._by_key.get(coalesce_key) if coalesce_key is not None else None
+        if stale is not None:
+            self._pending.remove(stale)
+        elif len(self._pending) >= self.max_pending:
+            return False
+
+        item = [coalesce_key, text, stale[2] if stale is not None else time.perf_counter()]
+        if coalesce_key is not None:
+            self._by_key[coalesce_key] = item
+        self._pending.append(item)
+        self._wakeup.set()
+        return True
+
+    async def _writer(self):
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while self._pending:
+                    key, text, enqueued_at = self._pending.popleft()
+                    if key is not None:
+                        self._by_key.pop(key, None)
+                    await self.websocket.send_text(text)
+                    WS_SEND_SECONDS.observe(time.perf_counter() - enqueued_at)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"Error sending ws message (disconnecting client): {e}")
+            ws_manager.disconnect(self.websocket)
+
+    def close(self):
+        self._task.cancel()
+
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        self._channels: Dict[WebSocket, ClientChannel] = {}
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        self._channels[websocket] = ClientChannel(websocket)
 
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        channel = self._channels.pop(websocket, None)
+        if channel:
+            channel.close()
 
     async def broadcast(self, message: dict):
-        """Send message to all connected clients."""
-        disconnected = []
-        for connection in list(self.active_connections):
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.warning(f"Error sending ws message (disconnecting client): {e}")
-                disconnected.append(connection)
-                
-        for conn in disconnected:
-            self.disconnect(conn)
+        """
+        Queue a message for all connected clients without waiting on any of them.
+        The message is serialized once and shared by every client queue.
+        """
+        text = json.dumps(message)
+        event = message.get("event")
+        coalesce_key = (event, message.get("job_id")) if event in COALESCED_EVENTS else None
+
+        for websocket, channel in list(self._channels.items()):
+            if not channel.enqueue(text, coalesce_key):
+                logger.warning("WebSocket client is too slow (send queue full), disconnecting it")
+                self.disconnect(websocket)
+                asyncio.create_task(self._close(websocket))
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)  # Try again later
+        except Exception:
+            pass
 
 ws_manager = ConnectionManager()
 
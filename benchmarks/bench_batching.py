@@ -0,0 +1,124 @@
+"""
+Batched inference of many short files against transcribing them one by one.
+
+    python -m benchmarks.bench_batching --files 16 --seconds 20 --batch-sizes 1 4 8
+
+Writes --files synthetic voice-like WAVs of --seconds each, then, in this process with the model
+warm, transcribes them one at a time with run_transcription (what the worker does for a lone job)
+and with run_batch at each --batch-sizes (what it does for a batch collected by the JobManager's
+batcher). Reports wall time and audio seconds per wall-clock second for each, and for how many files
+batching produced exactly the text of the one-by-one run. Needs the model to be downloaded. JSON output.
+"""
+import argparse
+import json
+import tempfile
+import threading
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from config import WHISPER_MODEL, WHISPER_COMPUTE_TYPE
+
+
+class _ProgressSink:
+    def __init__(self):
+        self.segments = 0
+
+    def put(self, msg):
+        if msg.get("event") == "segment":
+            self.segments += 1
+
+
+def _write_wav(path: Path, samples: np.ndarray):
+    from core.media_processor import SAMPLE_RATE
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes((np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes())
+
+
+def run(args) -> dict:
+    from core import transcriber
+    from core.autotune import calibration_audio
+    from core.model_manager import is_model_downloaded, model_path
+
+    if not is_model_downloaded(model_path(args.model)):
+        raise SystemExit(f"Model {args.model} is not downloaded")
+    _, load_seconds = transcriber.get_model(args.threads, "whisper", args.model, args.compute_type)
+
+    pause, cancel = threading.Event(), threading.Event()
+    pause.set()
+    report = {
+        "model": args.model,
+        "compute_type": args.compute_type,
+        "cpu_threads": args.threads,
+        "files": args.files,
+        "seconds_per_file": args.seconds,
+        "model_load_seconds": round(load_seconds, 3),
+        "runs": []
+    }
+    audio_seconds = args.files * args.seconds
+
+    with tempfile.TemporaryDirectory() as tmp:
+        voice = calibration_audio(None, args.seconds * 2)
+        paths = []
+        for i in range(args.files):
+            # Different offsets into the signal, so the files are not identical
+            offset = int(i * len(voice) / (2 * args.files))
+            path = Path(tmp) / f"note_{i}.wav"
+            _write_wav(path, voice[offset:offset + int(len(voice) / 2)])
+            paths.append(path)
+
+        sink = _ProgressSink()
+        start = time.perf_counter()
+        texts = []
+        for i, path in enumerate(paths):
+            result = transcriber.run_transcription(f"seq{i}", path, args.language, args.seconds, pause, cancel, sink,
+                                                   cpu_threads=args.threads, model=args.model,
+                                                   compute_type=args.compute_type)
+            texts.append(result.get("text"))
+        wall = time.perf_counter() - start
+        report["runs"].append({
+            "mode": "one_by_one", "wall_seconds": round(wall, 2),
+            "realtime_factor": round(audio_seconds / wall, 2), "segments": sink.segments
+        })
+
+        for size in args.batch_sizes:
+            sink = _ProgressSink()
+            units = [
+                {"job_id": f"batch{i}", "audio_path": path, "stream": False, "duration_seconds": args.seconds,
+                 "language": args.language, "pause_event": pause, "cancel_event": cancel}
+                for i, path in enumerate(paths)
+            ]
+            start = time.perf_counter()
+            results = transcriber.run_batch(units, sink, cpu_threads=args.threads, model=args.model,
+                                            compute_type=args.compute_type, max_size=size)["results"]
+            wall = time.perf_counter() - start
+            report["runs"].append({
+                "mode": "batched", "batch_size": size, "wall_seconds": round(wall, 2),
+                "realtime_factor": round(audio_seconds / wall, 2), "segments": sink.segments,
+                "same_text_as_one_by_one": sum(
+                    results[f"batch{i}"].get("text") == text for i, text in enumerate(texts)
+                )
+            })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=WHISPER_MODEL)
+    parser.add_argument("--compute-type", default=WHISPER_COMPUTE_TYPE)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--language", default="es")
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Measures time-to-cancel of the media stages.
+
+    python -m benchmarks.bench_cancel --minutes 60 --container mp4 --after 1.0 --runs 5
+
+For each of ffprobe (get_media_duration), WAV extraction (extract_audio) and in-memory decoding
+(stream_audio), the stage is started in a thread on a long synthetic file, its cancel event is set
+after --after seconds, and the time until the call returns is recorded. Reports per-stage
+mean/max cancel latency in milliseconds as JSON. A cancel that lands after the stage has already
+finished is reported as "finished_first".
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_media import make_media
+from core.media_processor import get_media_duration, extract_audio, stream_audio
+
+
+def time_to_cancel(func, after: float) -> dict:
+    cancel_event = threading.Event()
+    done = threading.Event()
+    thread = threading.Thread(target=lambda: (func(cancel_event), done.set()), daemon=True)
+    thread.start()
+    if done.wait(after):
+        thread.join()
+        return {"finished_first": True}
+    cancelled_at = time.perf_counter()
+    cancel_event.set()
+    thread.join()
+    return {"finished_first": False, "latency_ms": (time.perf_counter() - cancelled_at) * 1000}
+
+
+def bench_stage(func, after: float, runs: int) -> dict:
+    samples = [time_to_cancel(func, after) for _ in range(runs)]
+    latencies = [s["latency_ms"] for s in samples if not s["finished_first"]]
+    return {
+        "runs": runs,
+        "finished_first": runs - len(latencies),
+        "cancel_ms_mean": round(statistics.mean(latencies), 1) if latencies else None,
+        "cancel_ms_max": round(max(latencies), 1) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=60)
+    parser.add_argument("--container", default="mp4")
+    parser.add_argument("--after", type=float, default=1.0, help="Seconds to let each stage run before cancelling")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        media = tmp_dir / f"bench.{args.container}"
+        make_media(media, args.minutes)
+        duration = get_media_duration(media)
+        wav = tmp_dir / "bench.wav"
+
+        results = {
+            "media": {"container": args.container, "minutes": args.minutes},
+            "probe": bench_stage(lambda ev: get_media_duration(media, ev), args.after, args.runs),
+            "extract": bench_stage(lambda ev: extract_audio(media, wav, ev), args.after, args.runs),
+            "stream": bench_stage(lambda ev: stream_audio(media, duration, ev), args.after, args.runs),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
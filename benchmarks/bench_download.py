@@ -0,0 +1,155 @@
+"""
+Model download against a local stand-in for the Hugging Face file server.
+
+    python -m benchmarks.bench_download --size-mb 64 --connections 1 4 --rate-mbps 20
+
+Serves a random model.bin (plus the small files) from a local HTTP server that supports Range
+requests, caps each connection at --rate-mbps to mimic a per-stream CDN limit, and drops every
+--drop-every-mb MB on a connection to exercise the in-session retries. For each connection count
+it reports the wall time and the resulting hash check, then interrupts one download halfway and
+measures how much of it the resumed attempt had to fetch again. JSON output.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+class _ModelServer(BaseHTTPRequestHandler):
+    files = {}
+    rate_bytes = 0
+    drop_every = 0
+    served_bytes = 0
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        data = self.files.get(self.path.rsplit("/", 1)[-1])
+        if data is None:
+            self.send_error(404)
+            return
+        start, end = 0, len(data) - 1
+        header = self.headers.get("Range")
+        if header:
+            first, last = header.split("=", 1)[1].split("-")
+            start, end = int(first), min(int(last or end), end)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("ETag", '"bench"')
+        self.end_headers()
+
+        sent = 0
+        block = 65536
+        started = time.perf_counter()
+        for offset in range(start, end + 1, block):
+            piece = data[offset:min(end + 1, offset + block)]
+            if self.drop_every and sent >= self.drop_every:
+                # Simulate a dropped connection partway through the range
+                self.close_connection = True
+                return
+            try:
+                self.wfile.write(piece)
+            except OSError:
+                return
+            sent += len(piece)
+            with self.lock:
+                _ModelServer.served_bytes += len(piece)
+            if self.rate_bytes:
+                ahead = sent / self.rate_bytes - (time.perf_counter() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+
+def _serve(files: dict, rate_mbps: float, drop_every_mb: float):
+    _ModelServer.files = files
+    _ModelServer.rate_bytes = int(rate_mbps * 1_048_576)
+    _ModelServer.drop_every = int(drop_every_mb * 1_048_576)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ModelServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _timed_download(base_url: str, model_dir: Path, expected: str, connections: int) -> dict:
+    from core.model_manager import download_model, verify_model
+    _ModelServer.served_bytes = 0
+    start = time.perf_counter()
+    ok = await download_model(base_url=base_url, model_dir=model_dir, expected_sha256=expected, connections=connections)
+    wall = time.perf_counter() - start
+    return {
+        "connections": connections,
+        "ok": ok,
+        "wall_seconds": round(wall, 2),
+        "served_mb": round(_ModelServer.served_bytes / 1_048_576, 1),
+        "verified_from_manifest": ok and verify_model(model_dir, expected),
+    }
+
+
+async def _interrupted_download(base_url: str, model_dir: Path, expected: str, connections: int, size: int) -> dict:
+    from core.model_manager import download_model
+    _ModelServer.served_bytes = 0
+    task = asyncio.ensure_future(download_model(
+        base_url=base_url, model_dir=model_dir, expected_sha256=expected, connections=connections
+    ))
+    while _ModelServer.served_bytes < size // 2:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    # Let the server threads notice the closed sockets before counting again
+    await asyncio.sleep(0.5)
+    before = _ModelServer.served_bytes
+
+    _ModelServer.served_bytes = 0
+    ok = await download_model(base_url=base_url, model_dir=model_dir, expected_sha256=expected, connections=connections)
+    return {
+        "ok": ok,
+        "first_attempt_mb": round(before / 1_048_576, 1),
+        "resumed_attempt_mb": round(_ModelServer.served_bytes / 1_048_576, 1),
+        "total_mb": round(size / 1_048_576, 1),
+    }
+
+
+async def run(args) -> dict:
+    size = int(args.size_mb * 1_048_576)
+    model = os.urandom(size)
+    files = {"model.bin": model, "config.json": b"{}", "tokenizer.json": b"{}", "vocabulary.txt": b"a\nb\n"}
+    expected = hashlib.sha256(model).hexdigest()
+    server = _serve(files, args.rate_mbps, args.drop_every_mb)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/model"
+
+    results = {"size_mb": args.size_mb, "rate_mbps_per_connection": args.rate_mbps, "runs": []}
+    try:
+        for connections in args.connections:
+            with tempfile.TemporaryDirectory() as model_dir:
+                results["runs"].append(await _timed_download(base_url, Path(model_dir), expected, connections))
+        with tempfile.TemporaryDirectory() as model_dir:
+            results["resume"] = await _interrupted_download(
+                base_url, Path(model_dir), expected, max(args.connections), size
+            )
+    finally:
+        server.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=64)
+    parser.add_argument("--connections", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--rate-mbps", type=float, default=20.0, help="Per-connection bandwidth cap (0 = none)")
+    parser.add_argument("--drop-every-mb", type=float, default=0.0, help="Drop connections after this many MB (0 = never)")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
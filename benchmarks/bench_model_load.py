@@ -0,0 +1,73 @@
+"""
+Cold-start model load: original float model converted to int8 at load time vs the pre-quantized copy.
+
+    python -m benchmarks.bench_model_load --model small --repeats 3
+    python -m benchmarks.bench_model_load --model-dir path/to/ct2-model
+
+Each load runs in a fresh process (core.autotune.measure) so the time is a cold load and the RSS is
+that process's own; the short synthetic clip it transcribes afterwards also checks the copy decodes.
+The copy is built first if needed (into MODELS_DIR, or a temporary directory with --model-dir) and
+the build time is reported too. JSON output with the median load time and peak RSS of each variant.
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from config import WHISPER_MODEL, WHISPER_COMPUTE_TYPE
+
+
+def _variant(model: str, compute_type: str, threads: int, audio, model_dir: Path, repeats: int) -> dict:
+    from core.autotune import measure
+    runs = [measure(model, compute_type, threads, audio, model_dir=model_dir) for _ in range(repeats)]
+    failed = [r["error"] for r in runs if "error" in r]
+    if failed:
+        return {"model_dir": str(model_dir), "error": failed[0]}
+    return {
+        "model_dir": str(model_dir),
+        "model_bin_mb": round((model_dir / "model.bin").stat().st_size / 1_048_576, 1),
+        "load_seconds": round(statistics.median(r["load_seconds"] for r in runs), 3),
+        "peak_rss_mb": round(statistics.median(r["peak_rss_bytes"] for r in runs) / 1_048_576, 1),
+        "realtime_factor": round(statistics.median(r["realtime_factor"] for r in runs), 2),
+    }
+
+
+def run(args) -> dict:
+    from core.autotune import calibration_audio
+    from core.model_manager import model_path, quantize_model, quantized_model_path
+
+    audio = calibration_audio(None, args.seconds)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = args.model_dir or model_path(args.model)
+        target = Path(tmp) / "int8" if args.model_dir else quantized_model_path(args.model)
+        start = time.perf_counter()
+        if not quantize_model(args.model, source_dir=source, target_dir=target):
+            raise SystemExit(f"Could not build the pre-quantized copy of {source} (is the model downloaded?)")
+        build_seconds = time.perf_counter() - start
+
+        return {
+            "model": str(args.model_dir or args.model),
+            "compute_type": args.compute_type,
+            "cpu_threads": args.threads,
+            "build_seconds": round(build_seconds, 2),
+            "original": _variant(args.model, args.compute_type, args.threads, audio, source, args.repeats),
+            "prequantized": _variant(args.model, args.compute_type, args.threads, audio, target, args.repeats),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=WHISPER_MODEL, help="Installed model size")
+    parser.add_argument("--model-dir", type=Path, default=None, help="Any CTranslate2 Whisper model directory instead")
+    parser.add_argument("--compute-type", default=WHISPER_COMPUTE_TYPE)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=5.0, help="Length of the synthetic clip decoded after loading")
+    args = parser.parse_args()
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
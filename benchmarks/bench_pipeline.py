@@ -0,0 +1,240 @@
+"""
+End-to-end benchmark suite on synthetic local media.
+
+    python -m benchmarks.bench_pipeline --containers mp3 m4a mp4 --minutes 0.5 5 --output bench.json
+    python -m benchmarks.bench_pipeline --stub-only --stub-jobs 50 --ws-clients 4
+
+Stage mode (default): for every container x length it times get_media_duration, extract_audio and,
+when the model is downloaded, run_transcription (reported as real-time factor = audio seconds per
+wall-clock second). The model load is timed once, cold, in this process.
+
+Stub mode: runs --stub-jobs short files through a real JobManager whose workers use the stub engine
+(core.stub_engine, no Whisper), with --ws-clients fake WebSocket clients attached to the broadcast
+path. Reports per-job latency, jobs per second and WebSocket fan-out cost, i.e. the overhead
+of everything except the model.
+
+All app data (job store, caches, checkpoints, tmp WAVs) goes to a scratch AURA_DATA_DIR.
+Results are printed as JSON (and written to --output) so runs can be compared across commits.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_media import make_media, CONTAINERS
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def _meta() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+class _ProgressSink:
+    """Collects what the worker would send over its progress channel."""
+
+    def __init__(self):
+        self.messages = 0
+
+    def put(self, msg):
+        self.messages += 1
+
+
+def bench_stages(containers, lengths, kind: str, media_dir: Path, tmp_dir: Path) -> dict:
+    from core import transcriber
+    from core.media_processor import get_media_duration, extract_audio
+    from core.model_manager import is_model_downloaded
+
+    with_model = is_model_downloaded()
+    report = {"model_load_seconds": None, "media": []}
+    if with_model:
+        _, load_seconds = transcriber.get_model()
+        report["model_load_seconds"] = round(load_seconds, 3)
+
+    for minutes in lengths:
+        for ext in containers:
+            media = media_dir / f"{kind}_{minutes:g}min.{ext}"
+            make_media(media, minutes, kind)
+            entry = {"container": ext, "minutes": minutes, "size_bytes": media.stat().st_size}
+
+            start = time.perf_counter()
+            duration = get_media_duration(media)
+            entry["probe_seconds"] = round(time.perf_counter() - start, 3)
+            entry["duration_seconds"] = round(duration, 2)
+
+            wav = tmp_dir / "bench.wav"
+            start = time.perf_counter()
+            ok = extract_audio(media, wav)
+            entry["extract_seconds"] = round(time.perf_counter() - start, 3)
+            entry["extract_ok"] = ok
+
+            if ok and with_model:
+                pause, cancel = threading.Event(), threading.Event()
+                pause.set()
+                sink = _ProgressSink()
+                result = transcriber.run_transcription(
+                    "bench", wav, "es", duration, pause, cancel, sink
+                )
+                transcribe_seconds = result.get("timings", {}).get("transcribe")
+                entry["transcribe_seconds"] = transcribe_seconds
+                entry["realtime_factor"] = round(duration / transcribe_seconds, 2) if transcribe_seconds else None
+                entry["segments"] = len(result.get("segments") or [])
+
+            wav.unlink(missing_ok=True)
+            media.unlink()
+            report["media"].append(entry)
+    return report
+
+
+class _FakeWebSocket:
+    """Counts what the WebSocket fan-out would put on the wire for one client."""
+
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.messages += 1
+        self.bytes += len(text)
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+async def bench_stub_pipeline(media_dir: Path, jobs: int, seconds: float, ws_clients: int, workers: int) -> dict:
+    from api.websocket import ConnectionManager
+    from core.job_manager import JobManager
+    from core.worker import WorkerPool
+    from schemas.models import Job
+
+    # Distinct seeds, so the transcript cache cannot answer any of them
+    paths = []
+    for i in range(jobs):
+        path = media_dir / f"stub_{i}.wav"
+        make_media(path, seconds / 60, "speech", seed=i + 1)
+        paths.append(path)
+
+    # The stub measures pipeline overhead; the VAD would only add model-independent work to every job
+    manager = JobManager(engine="stub", vad_mode="off")
+    if workers != manager.pool.size:
+        manager.pool = WorkerPool(manager.progress_channel, size=workers, engine="stub")
+    ws = ConnectionManager()
+    clients = [_FakeWebSocket() for _ in range(ws_clients)]
+    for client in clients:
+        await ws.connect(client)
+
+    submitted, finished = {}, {}
+    broadcast_seconds = []
+    all_done = asyncio.Event()
+
+    async def on_event(event: dict):
+        start = time.perf_counter()
+        await ws.broadcast(event)
+        broadcast_seconds.append(time.perf_counter() - start)
+        if event["event"] == "completed" or (event["event"] == "status_change" and event["status"] in ("error", "cancelled")):
+            finished[event["job_id"]] = time.perf_counter()
+            if len(finished) == jobs:
+                all_done.set()
+
+    manager.add_event_callback(on_event)
+    await manager.start()
+    # Let the workers come up before the clock starts
+    await asyncio.sleep(1.0)
+
+    new_jobs = [Job(original_filename=p.name, original_path=p, index_in_batch=i + 1, total_in_batch=jobs)
+                for i, p in enumerate(paths)]
+    start = time.perf_counter()
+    for job in new_jobs:
+        submitted[job.id] = time.perf_counter()
+    manager.submit_jobs(new_jobs)
+    await all_done.wait()
+    wall = time.perf_counter() - start
+    # Give the per-client writers a moment to drain
+    await asyncio.sleep(0.2)
+
+    stage_totals = {}
+    for job in new_jobs:
+        for stage, value in ((await manager.get_job(job.id)).stage_timings or {}).items():
+            stage_totals.setdefault(stage, []).append(value)
+    await manager.stop()
+    manager.manager.shutdown()
+
+    latencies = [finished[j] - submitted[j] for j in finished]
+    return {
+        "jobs": jobs,
+        "seconds_per_file": seconds,
+        "workers": workers,
+        "ws_clients": ws_clients,
+        "wall_seconds": round(wall, 3),
+        "jobs_per_second": round(jobs / wall, 2),
+        "job_latency_s_mean": round(statistics.mean(latencies), 3),
+        "job_latency_s_p95": round(_percentile(latencies, 0.95), 3),
+        "events": len(broadcast_seconds),
+        "broadcast_us_mean": round(statistics.mean(broadcast_seconds) * 1e6, 1),
+        "broadcast_us_p95": round(_percentile(broadcast_seconds, 0.95) * 1e6, 1),
+        "ws_messages_per_client": clients[0].messages if clients else 0,
+        "ws_bytes_per_client": clients[0].bytes if clients else 0,
+        "stage_seconds_mean": {k: round(statistics.mean(v), 4) for k, v in stage_totals.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--containers", nargs="+", default=["mp3", "wav", "m4a", "ogg", "mp4", "webm"],
+                        choices=CONTAINERS)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[0.5, 5])
+    parser.add_argument("--kind", choices=["tone", "speech"], default="speech")
+    parser.add_argument("--stub-only", action="store_true", help="Skip the per-stage timings")
+    parser.add_argument("--skip-stub", action="store_true", help="Skip the stub-engine pipeline run")
+    parser.add_argument("--stub-jobs", type=int, default=20)
+    parser.add_argument("--stub-seconds", type=float, default=30.0, help="Length of each stub-mode file")
+    parser.add_argument("--ws-clients", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--output", type=Path, default=None, help="Write JSON results here as well")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir, tempfile.TemporaryDirectory() as media_dir:
+        # Must be set before config is imported, here and in the worker processes
+        os.environ["AURA_DATA_DIR"] = data_dir
+        from config import TMP_DIR
+        TMP_DIR.mkdir(parents=True, exist_ok=True)
+
+        results = {"meta": _meta()}
+        if not args.stub_only:
+            results["stages"] = bench_stages(args.containers, args.minutes, args.kind, Path(media_dir), TMP_DIR)
+        if not args.skip_stub:
+            results["stub_pipeline"] = asyncio.run(bench_stub_pipeline(
+                Path(media_dir), args.stub_jobs, args.stub_seconds, args.ws_clients, args.workers
+            ))
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        args.output.write_text(report, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Measures progress delivery from a worker process to the event loop.
+
+    python -m benchmarks.bench_progress_channel --messages 2000 --interval-ms 2
+
+"manager": the previous transport, a multiprocessing.Manager().Queue() polled from a thread
+           with get(timeout=0.5) via asyncio.to_thread.
+"channel": core.progress_channel.ProgressChannel (per-worker pipe + wait() reader thread).
+
+For each transport it reports end-to-end latency (worker send -> handled on the loop) and the
+CPU time spent per message in the parent and in the worker, as JSON.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import statistics
+import time
+from queue import Empty
+
+import psutil
+
+from core.progress_channel import ProgressChannel, ProgressSender
+
+
+def _producer(sink, count: int, interval: float, wrap_pipe: bool, cpu_out):
+    sender = ProgressSender(sink) if wrap_pipe else sink
+    start_cpu = time.process_time()
+    for i in range(count):
+        # perf_counter is a system-wide monotonic clock on Windows and Linux, so it compares across processes
+        sender.put({"job_id": "bench", "event": "progress_update", "progress": i / count, "sent": time.perf_counter()})
+        if interval:
+            time.sleep(interval)
+    sender.put({"job_id": "bench", "event": "done", "sent": time.perf_counter()})
+    cpu_out.value = time.process_time() - start_cpu
+
+
+def _summary(latencies, parent_cpu, worker_cpu, count):
+    latencies.sort()
+    return {
+        "messages": count,
+        "latency_ms_mean": round(statistics.mean(latencies) * 1000, 3),
+        "latency_ms_p50": round(latencies[len(latencies) // 2] * 1000, 3),
+        "latency_ms_p99": round(latencies[int(len(latencies) * 0.99)] * 1000, 3),
+        "parent_cpu_us_per_msg": round(parent_cpu / count * 1e6, 2),
+        "worker_cpu_us_per_msg": round(worker_cpu / count * 1e6, 2),
+    }
+
+
+def _parent_cpu() -> float:
+    # Includes the Manager server process, which relays every message of the old transport
+    me = psutil.Process()
+    procs = [me] + me.children(recursive=True)
+    total = 0.0
+    for p in procs:
+        try:
+            t = p.cpu_times()
+            total += t.user + t.system
+        except psutil.Error:
+            pass
+    return total
+
+
+async def bench_manager(count: int, interval: float) -> dict:
+    manager = multiprocessing.Manager()
+    queue = manager.Queue()
+    cpu_out = multiprocessing.Value("d", 0.0)
+    latencies = []
+
+    def poll():
+        try:
+            return queue.get(timeout=0.5)
+        except Empty:
+            return None
+
+    cpu_before = _parent_cpu()
+    proc = multiprocessing.Process(target=_producer, args=(queue, count, interval, False, cpu_out))
+    proc.start()
+    while True:
+        msg = await asyncio.to_thread(poll)
+        if msg is None:
+            continue
+        if msg["event"] == "done":
+            break
+        latencies.append(time.perf_counter() - msg["sent"])
+    proc.join()
+    parent_cpu = _parent_cpu() - cpu_before
+    manager.shutdown()
+    return _summary(latencies, parent_cpu, cpu_out.value, count)
+
+
+async def bench_channel(count: int, interval: float) -> dict:
+    channel = ProgressChannel()
+    sender = channel.new_sender()
+    events: asyncio.Queue = asyncio.Queue()
+    cpu_out = multiprocessing.Value("d", 0.0)
+    latencies = []
+
+    cpu_before = _parent_cpu()
+    channel.start(asyncio.get_running_loop(), events.put_nowait)
+    proc = multiprocessing.Process(target=_producer, args=(sender, count, interval, True, cpu_out))
+    proc.start()
+    while True:
+        msg = await events.get()
+        if msg["event"] == "done":
+            break
+        latencies.append(time.perf_counter() - msg["sent"])
+    proc.join()
+    channel.stop()
+    parent_cpu = _parent_cpu() - cpu_before
+    return _summary(latencies, parent_cpu, cpu_out.value, count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--interval-ms", type=float, default=2.0, help="Pause between messages in the worker")
+    args = parser.parse_args()
+
+    interval = args.interval_ms / 1000
+    results = {
+        "manager": asyncio.run(bench_manager(args.messages, interval)),
+        "channel": asyncio.run(bench_channel(args.messages, interval)),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
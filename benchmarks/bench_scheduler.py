@@ -0,0 +1,104 @@
+"""
+Simulates the job queue under each scheduling policy.
+
+    python -m benchmarks.bench_scheduler --batches 4 --jobs-per-batch 25 --workers 1 --rtf 20
+
+Synthetic workload: batches arrive every --batch-interval seconds; each one holds --jobs-per-batch
+files with log-normally distributed durations, and the first batch starts with one --huge-minutes
+file (the case where FIFO makes a hundred short files wait behind a single long one).
+A file occupies a worker for duration / rtf seconds. Jobs are dispatched with core.scheduler.JobScheduler
+on a simulated clock, so no model or media is needed.
+Reports mean, p95 and max completion latency (arrival -> transcript ready) per policy, as JSON.
+"""
+import argparse
+import heapq
+import json
+import math
+import random
+import statistics
+
+from core.scheduler import JobScheduler, POLICIES
+from schemas.models import Job
+
+
+def make_workload(args) -> list:
+    rng = random.Random(args.seed)
+    jobs = []
+    for b in range(args.batches):
+        arrival = b * args.batch_interval
+        durations = [rng.lognormvariate(math.log(args.median_minutes), 1.0) * 60 for _ in range(args.jobs_per_batch)]
+        if b == 0:
+            durations[0] = args.huge_minutes * 60
+        for i, duration in enumerate(durations):
+            # Files of one upload land a moment apart
+            jobs.append(Job(
+                original_filename=f"b{b}_{i}",
+                duration_seconds=duration,
+                batch_id=f"batch{b}",
+                created_at=arrival + i * 0.01
+            ))
+    return sorted(jobs, key=lambda j: j.created_at)
+
+
+def simulate(policy: str, jobs: list, workers: int, rtf: float) -> dict:
+    now = 0.0
+    scheduler = JobScheduler(policy, clock=lambda: now)
+    pending = list(jobs)          # not arrived yet, by arrival time
+    running = []                  # heap of (finish time, tie-breaker, job)
+    free = workers
+    latencies = []
+
+    while pending or running or scheduler.qsize():
+        # Advance to the next event: an arrival or a job finishing
+        next_arrival = pending[0].created_at if pending else float("inf")
+        next_finish = running[0][0] if running else float("inf")
+        if scheduler.qsize() == 0 or free == 0:
+            now = min(next_arrival, next_finish)
+
+        while pending and pending[0].created_at <= now:
+            scheduler.put_nowait(pending.pop(0))
+        while running and running[0][0] <= now:
+            _, _, job = heapq.heappop(running)
+            latencies.append(now - job.created_at)
+            free += 1
+        while free and scheduler.qsize():
+            job = scheduler.pop_next()
+            heapq.heappush(running, (now + job.duration_seconds / rtf, id(job), job))
+            free -= 1
+
+    latencies.sort()
+    return {
+        "jobs": len(latencies),
+        "latency_s_mean": round(statistics.mean(latencies), 1),
+        "latency_s_p95": round(latencies[int(len(latencies) * 0.95) - 1], 1),
+        "latency_s_max": round(latencies[-1], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batches", type=int, default=4)
+    parser.add_argument("--jobs-per-batch", type=int, default=25)
+    parser.add_argument("--batch-interval", type=float, default=300.0, help="Seconds between batch arrivals")
+    parser.add_argument("--median-minutes", type=float, default=2.0, help="Median length of the batch files")
+    parser.add_argument("--huge-minutes", type=float, default=180.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--rtf", type=float, default=20.0, help="Audio seconds transcribed per second per worker")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    jobs = make_workload(args)
+    results = {
+        "workload": {
+            "jobs": len(jobs),
+            "audio_hours": round(sum(j.duration_seconds for j in jobs) / 3600, 2),
+            "workers": args.workers,
+            "rtf": args.rtf
+        },
+        "policies": {policy: simulate(policy, jobs, args.workers, args.rtf) for policy in POLICIES}
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Compares the WAV extraction path against ffmpeg streaming.
+
+    python -m benchmarks.bench_streaming --minutes 10 30 --container m4a mp4
+
+WAV path:    extract_audio() to a tmp WAV, then decode it the way faster-whisper does (decode_audio).
+Stream path: stream_audio() straight into a NumPy buffer.
+Reports wall time and peak disk use in the tmp dir for each, as JSON.
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_media import make_media
+from core.media_processor import extract_audio, stream_audio
+
+
+class DiskWatcher:
+    """Samples the total size of a directory in the background and keeps the peak."""
+
+    def __init__(self, directory: Path, interval: float = 0.05):
+        self.directory = directory
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            total = sum(e.stat().st_size for e in os.scandir(self.directory) if e.is_file())
+            self.peak = max(self.peak, total)
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def bench_wav_path(media: Path, tmp_dir: Path) -> dict:
+    from faster_whisper import decode_audio
+
+    wav = tmp_dir / "bench.wav"
+    with DiskWatcher(tmp_dir) as watcher:
+        start = time.perf_counter()
+        extract_audio(media, wav)
+        audio = decode_audio(str(wav))
+        elapsed = time.perf_counter() - start
+        wav.unlink()
+    return {"wall_seconds": round(elapsed, 3), "peak_disk_bytes": watcher.peak, "samples": len(audio)}
+
+
+def bench_stream_path(media: Path, tmp_dir: Path, duration: float) -> dict:
+    with DiskWatcher(tmp_dir) as watcher:
+        start = time.perf_counter()
+        audio = stream_audio(media, duration)
+        elapsed = time.perf_counter() - start
+    return {"wall_seconds": round(elapsed, 3), "peak_disk_bytes": watcher.peak, "samples": len(audio)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[5, 30])
+    parser.add_argument("--container", nargs="+", default=["m4a", "mp4"])
+    parser.add_argument("--output", type=Path, default=None, help="Write JSON results here as well")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as media_dir, tempfile.TemporaryDirectory() as tmp_dir:
+        for minutes in args.minutes:
+            for ext in args.container:
+                media = Path(media_dir) / f"bench_{minutes:g}min.{ext}"
+                make_media(media, minutes)
+                results.append({
+                    "container": ext,
+                    "minutes": minutes,
+                    "wav": bench_wav_path(media, Path(tmp_dir)),
+                    "stream": bench_stream_path(media, Path(tmp_dir), minutes * 60),
+                })
+                media.unlink()
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        args.output.write_text(report, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
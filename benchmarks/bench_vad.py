@@ -0,0 +1,109 @@
+"""
+Decoding with and without the VAD on a recording that is mostly silence.
+
+    python -m benchmarks.bench_vad --seconds 180 --speech-ratio 0.3 --modes off energy silero
+
+Writes a synthetic meeting-like WAV of --seconds: voice-like phrases (core.autotune's calibration signal)
+separated by pauses of low room noise, --speech-ratio of it voiced. Then, in this process with the model
+warm, transcribes it once per VAD mode with run_transcription, as a worker does. Reports wall time,
+the speech ratio and saved-compute estimate the job would report, and how many segments land in the
+silent stretches (hallucinated filler). Needs the model to be downloaded. JSON output.
+"""
+import argparse
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from config import WHISPER_MODEL, WHISPER_COMPUTE_TYPE
+from benchmarks.bench_batching import _ProgressSink, _write_wav
+
+
+def _meeting(seconds: float, speech_ratio: float, phrase_seconds: float = 6.0):
+    """Audio alternating phrase_seconds of voice with pauses; returns it and the voiced (start, end) ranges."""
+    from core.autotune import calibration_audio
+    from core.media_processor import SAMPLE_RATE
+
+    rng = np.random.default_rng(3)
+    audio = rng.normal(0, 0.002, int(seconds * SAMPLE_RATE)).astype(np.float32)
+    voice = calibration_audio(None, phrase_seconds)
+    pause = phrase_seconds * (1 - speech_ratio) / speech_ratio
+    voiced, position = [], pause / 2
+    while position + phrase_seconds <= seconds:
+        first = int(position * SAMPLE_RATE)
+        audio[first:first + len(voice)] += voice
+        voiced.append((position, position + phrase_seconds))
+        position += phrase_seconds + pause
+    return audio, voiced
+
+
+def run(args) -> dict:
+    from core import transcriber
+    from core.model_manager import is_model_downloaded, model_path
+
+    if not is_model_downloaded(model_path(args.model)):
+        raise SystemExit(f"Model {args.model} is not downloaded")
+    _, load_seconds = transcriber.get_model(args.threads, "whisper", args.model, args.compute_type)
+
+    pause, cancel = threading.Event(), threading.Event()
+    pause.set()
+    audio, voiced = _meeting(args.seconds, args.speech_ratio)
+    report = {
+        "model": args.model,
+        "compute_type": args.compute_type,
+        "cpu_threads": args.threads,
+        "seconds": args.seconds,
+        "true_speech_ratio": round(sum(e - s for s, e in voiced) / args.seconds, 3),
+        "model_load_seconds": round(load_seconds, 3),
+        "runs": []
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "meeting.wav"
+        _write_wav(path, audio)
+        for mode in args.modes:
+            sink = _ProgressSink()
+            start = time.perf_counter()
+            result = transcriber.run_transcription(
+                f"vad_{mode}", path, args.language, args.seconds, pause, cancel, sink,
+                cpu_threads=args.threads, model=args.model, compute_type=args.compute_type, vad=mode
+            )
+            wall = time.perf_counter() - start
+            if result["status"] != "completed":
+                report["runs"].append({"vad": mode, "error": result.get("error", result["status"])})
+                continue
+            in_silence = [
+                seg for seg in result["segments"]
+                if not any(s <= (seg["start"] + seg["end"]) / 2 <= e for s, e in voiced)
+            ]
+            vad = result.get("vad") or {}
+            report["runs"].append({
+                "vad": mode,
+                "wall_seconds": round(wall, 2),
+                "realtime_factor": round(args.seconds / wall, 2),
+                "speech_ratio": round(vad["speech_seconds"] / vad["audio_seconds"], 3) if vad else 1.0,
+                "saved_seconds_estimate": vad.get("saved_seconds"),
+                "segments": len(result["segments"]),
+                "segments_in_silence": len(in_silence)
+            })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=WHISPER_MODEL)
+    parser.add_argument("--compute-type", default=WHISPER_COMPUTE_TYPE)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--language", default="es")
+    parser.add_argument("--seconds", type=float, default=180.0)
+    parser.add_argument("--speech-ratio", type=float, default=0.3)
+    parser.add_argument("--modes", nargs="+", default=["off", "energy", "silero"])
+    args = parser.parse_args()
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
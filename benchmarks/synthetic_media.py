@@ -0,0 +1,41 @@
+"""
+Deterministic test media generated locally with ffmpeg, shared by the benchmarks.
+"""
+import subprocess
+from pathlib import Path
+
+# Every container the app accepts (see README)
+CONTAINERS = ["mp3", "wav", "ogg", "flac", "m4a", "wma", "aac", "opus", "mp4", "mkv", "avi", "mov", "webm"]
+VIDEO_CONTAINERS = {"mp4", "mkv", "avi", "mov", "webm"}
+
+# Speech-like envelope: ~4 syllables per second, in 2.5 s phrases separated by 0.8 s pauses
+_SPEECH_ENVELOPE = "volume='0.8*(0.5+0.5*sin(2*PI*4*t))*lt(mod(t\\,3.3)\\,2.5)':eval=frame"
+
+
+def make_media(path: Path, minutes: float, kind: str = "tone", seed: int = 7):
+    """
+    Writes `minutes` of deterministic audio to `path`, encoded as its extension implies.
+    kind="tone":   a 440 Hz tone mixed with pink noise.
+    kind="speech": a 180 Hz voice-like tone plus pink noise, shaped into syllables and pauses,
+                   so silence detection and VAD have real boundaries to find.
+    Video containers also get a tiny black video track. Different seeds give different content
+    (and therefore different cache fingerprints).
+    """
+    seconds = max(1, int(minutes * 60))
+    video = path.suffix.lstrip(".") in VIDEO_CONTAINERS
+    frequency = 180 if kind == "speech" else 440
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"sine=frequency={frequency}:sample_rate=44100:duration={seconds}",
+        "-f", "lavfi", "-i", f"anoisesrc=color=pink:amplitude=0.05:seed={seed}:duration={seconds}",
+    ]
+    if video:
+        cmd += ["-f", "lavfi", "-i", f"color=black:size=160x120:rate=5:duration={seconds}"]
+    graph = "[0:a][1:a]amix=inputs=2"
+    if kind == "speech":
+        graph += f",{_SPEECH_ENVELOPE}"
+    cmd += ["-filter_complex", graph + "[a]", "-map", "[a]"]
+    if video:
+        cmd += ["-map", "2:v"]
+    cmd += ["-shortest", str(path)]
+    subprocess.run(cmd, check=True)
@@ -1,20 +1,133 @@
+import os
 import platformdirs
 from pathlib import Path
 
 APP_NAME   = "AuraTranscribe"
 APP_AUTHOR = "AuraTranscribe"
 
-BASE_DIR     = Path(platformdirs.user_data_dir(APP_NAME))
-MODEL_DIR    = BASE_DIR / "models" / "small"
+USER_DATA_DIR = Path(platformdirs.user_data_dir(APP_NAME))
+# AURA_DATA_DIR relocates jobs, caches and tmp files (benchmarks use a scratch directory); models stay put
+BASE_DIR     = Path(os.environ.get("AURA_DATA_DIR") or USER_DATA_DIR)
+MODELS_DIR   = USER_DATA_DIR / "models"   # One sub-directory per installed model size
+MODEL_DIR    = MODELS_DIR / "small"       # The default model (WHISPER_MODEL)
 TMP_DIR      = BASE_DIR / "tmp"
 EXPORTS_DIR  = Path(platformdirs.user_documents_dir()) / APP_NAME
 LOG_FILE     = BASE_DIR / "auratranscribe.log"
 
 FASTAPI_PORT  = 47821   # Fixed, uncommon port to avoid collisions
 WHISPER_MODEL = "small"
+WHISPER_COMPUTE_TYPE = "int8"
 LANGUAGES     = {"es": "Spanish", "en": "English"}
 
 # Model SHA256 checksum for integrity verification after download
+# (sizes without an entry are hashed on download and checked against that from then on)
 MODEL_SHA256 = {
     "small": "3e305921506d8872816023e4c273e75d2419fb89b24da97b4fe7bce14170d671"
 }
+
+# Adaptive model selection: several sizes can be installed side by side; `python main.py --autotune`
+# measures each installed size x compute type x thread count on this machine, and the workers then
+# run the largest size that reaches MODEL_TARGET_RTF and fits in free memory (its fastest setup)
+MODEL_TIERS            = ["tiny", "base", "small", "medium"]   # Smallest to largest
+MODEL_AUTO_SELECT      = True
+MODEL_TARGET_RTF       = 4.0    # Audio seconds per wall-clock second a configuration must reach
+MODEL_RAM_HEADROOM_MB  = 512    # Free memory left over after the workers have loaded the model
+MODEL_RAM_ESTIMATE_MB  = {"tiny": 1000, "base": 1300, "small": 2400, "medium": 5000}   # Until measured
+AUTOTUNE_COMPUTE_TYPES = ["int8", "int8_float32", "float32"]
+AUTOTUNE_CLIP_SECONDS  = 30
+AUTOTUNE_FILE          = MODELS_DIR / "autotune.json"
+
+# Pre-quantized copy of each model (MODELS_DIR/<size>-int8), built once after download, which workers with an
+# int8 compute type load as is instead of converting the float weights on every start (~half the disk space again)
+MODEL_PREQUANTIZE = True
+
+# Model download: parallel HTTP Range requests into MODEL_DIR/model.bin.part, resumable across restarts
+MODEL_DOWNLOAD_CONNECTIONS = 4
+MODEL_DOWNLOAD_PART_MB     = 16
+MODEL_DOWNLOAD_RETRIES     = 3   # Per part, each retry continuing from the last byte written
+
+# Persistent transcription workers
+TRANSCRIPTION_WORKERS = 1   # Number of worker processes transcribing concurrently
+WORKER_CPU_THREADS    = 0   # CTranslate2 threads per worker (0 = split the available cores evenly)
+TRANSCRIPTION_ENGINE  = "whisper"   # "stub" swaps Whisper for synthetic segments (pipeline benchmarks)
+WORKER_PIN_CPUS       = False  # Pin each worker to its own disjoint set of cores
+PRELOAD_MODEL     = True    # Load the model in the background when the server starts
+WORKER_MAX_JOBS   = 50      # Recycle the worker process after this many jobs...
+WORKER_MAX_RSS_MB = 3500    # ...or as soon as its resident memory exceeds this
+CANCEL_PREEMPT_SECONDS = 0.5   # Kill and respawn a worker that has not stopped a cancelled job by then (0 = never)
+
+# Extraction pipeline: audio of upcoming jobs is extracted while the current one transcribes
+PREFETCH_DEPTH      = 2      # Extracted jobs allowed to wait for a free worker
+PREFETCH_MAX_TMP_MB = 4096   # Cap on tmp-disk used by extracted WAVs
+PROBE_CONCURRENCY   = 4      # ffprobe processes run in parallel for newly submitted files
+PROBE_CACHE_SIZE    = 1024   # Probed durations remembered by content fingerprint
+
+# Order in which queued jobs are extracted and transcribed: "fifo" (submission order, the default), or opt in to
+# "shortest" (shortest file first, aged) or "fair" (round-robin between batches)
+SCHEDULER_POLICY    = "fifo"
+SCHEDULER_SJF_AGING = 0.1    # "shortest": audio seconds credited per second waited, so long files are never starved
+
+# Stream ffmpeg's raw PCM output straight into the model instead of writing a tmp WAV
+AUDIO_STREAMING = False
+
+# Long files are split on silence and their chunks transcribed in parallel (needs TRANSCRIPTION_WORKERS > 1)
+LONG_FILE_MIN_SECONDS   = 20 * 60
+LONG_FILE_CHUNK_SECONDS = 5 * 60
+
+# Batched inference for short files: jobs up to BATCH_MAX_JOB_SECONDS are cut into <= 30 s windows on silence,
+# and windows of several such jobs are decoded together in one batched encoder/decoder call on a worker, with
+# the decoding settings of the sequential path. Opt-in until benchmarks.bench_batching shows the same text
+# and a speedup on the target machines
+BATCHING              = False
+BATCH_MAX_JOB_SECONDS = 60
+BATCH_MAX_SIZE        = 8     # Windows per batched call
+BATCH_MAX_WAIT_MS     = 200   # How long an open batch waits for more jobs before it goes to a free worker
+
+# Voice activity detection: non-speech is dropped before decoding and the timestamps are mapped back onto the
+# original timeline. "silero" is faster-whisper's Silero model (run in the worker), "energy" a NumPy gate on
+# frame energy computed right after extraction, "off" decodes everything
+VAD_MODE             = "silero"
+VAD_MIN_SILENCE_MS   = 1000   # Shorter pauses are kept, so words are never cut apart
+VAD_SPEECH_PAD_MS    = 300    # Kept on both sides of every speech region
+VAD_ENERGY_MARGIN_DB = 12     # "energy": frames this far above the noise floor count as speech
+
+# Repetition guard: a decoded segment that completes a loop (one phrase over and over, back to back, in the recent
+# text), or whose text compresses too well, is taken as a decoding loop; that 30 s window is decoded again with
+# fallback settings (sampling temperatures, no conditioning on the previous text), and skipped if the retry loops
+# too. A phrase that comes back with other words in between is normal speech, not a loop
+REPETITION_GUARD            = True
+REPETITION_MAX_PHRASE_WORDS = 20     # Longest repeated phrase looked for
+REPETITION_MAX_REPEATS      = 4      # Back-to-back copies of one phrase that count as a loop...
+REPETITION_MIN_LOOP_WORDS   = 12     # ...once they add up to this many words ("no, no, no" is speech)
+REPETITION_HISTORY_WORDS    = 80     # Recent words looked at
+REPETITION_MAX_COMPRESSION  = 2.4    # zlib ratio of a segment's text (Whisper's own fallback threshold)
+REPETITION_RETRY_TEMPERATURES = [0.4, 0.6, 0.8]
+
+# Content-addressed transcript cache (key: media fingerprint + model + compute type + language + every other
+# setting that changes the transcript, see core.transcript_cache.decode_settings)
+TRANSCRIPT_CACHE_DIR       = BASE_DIR / "cache" / "transcripts"
+TRANSCRIPT_CACHE_MAX_MB    = 512
+TRANSCRIPT_CACHE_FULL_HASH = False   # Hash whole files instead of size + sampled blocks
+
+# Segment journals that let interrupted transcriptions resume instead of restarting
+CHECKPOINT_DIR = BASE_DIR / "checkpoints"
+
+# Durable job history (SQLite, WAL mode)
+JOB_DB_PATH             = BASE_DIR / "jobs.sqlite3"
+JOB_STORE_FLUSH_SECONDS = 0.2   # Writes arriving within this window share one transaction
+RECENT_JOBS_IN_MEMORY   = 32    # Finished jobs kept in RAM; older ones are read back from the store
+
+# WebSocket fan-out: per-client send queue bound (stale progress events are coalesced, never queued twice)
+WS_MAX_PENDING_MESSAGES = 256
+
+# Streaming uploads: quotas checked while the request body is still arriving
+UPLOAD_MAX_FILE_MB    = 8192
+UPLOAD_MAX_REQUEST_MB = 32768
+UPLOAD_MIN_FREE_MB    = 1024    # Refuse upload bytes that would leave less free space than this in TMP_DIR
+
+# Opt-in profiling: per-job span traces (Chrome trace JSON) written to PROFILE_DIR and served at
+# /api/transcription/{id}/trace. Enable with AURA_PROFILE=1; AURA_PROFILE_CPROFILE=1 also dumps a
+# cProfile of every worker run next to the traces.
+PROFILING        = os.environ.get("AURA_PROFILE", "0") == "1"
+PROFILE_CPROFILE = os.environ.get("AURA_PROFILE_CPROFILE", "0") == "1"
+PROFILE_DIR      = BASE_DIR / "profiles"
@@ -0,0 +1 @@
+# Makes the repository root importable (core, api, config, ...) when the tests run under plain `pytest`
@@ -0,0 +1,162 @@
+"""
+Measures every installed model size x compute type x CPU thread count on this machine and stores the
+real-time factor and peak RSS of each in AUTOTUNE_FILE, where model_manager.select_model_config picks
+the configuration the workers run.
+
+    python main.py --autotune
+    python main.py --autotune --models base small --compute-types int8 float32 --threads 4 8 --clip talk.mp3
+
+Each configuration runs in a fresh process so the load time is cold and the RSS is its own.
+Without --clip a synthetic voice-like signal is used; a short real recording in the language you
+transcribe gives more representative decoding times.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import psutil
+
+from config import AUTOTUNE_COMPUTE_TYPES, AUTOTUNE_CLIP_SECONDS, AUTOTUNE_FILE
+from core.media_processor import SAMPLE_RATE, stream_audio, get_media_duration
+from core.model_manager import installed_models, model_load_path, save_autotune
+
+logger = logging.getLogger(__name__)
+
+# Per configuration; a large model on a slow machine can take a while
+MEASURE_TIMEOUT_SECONDS = 900
+
+
+def _synthetic_voice(seconds: float) -> np.ndarray:
+    """Harmonic 'voice' at ~4 syllables per second in 2.5 s phrases, over a little noise."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 25 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)) * ((t % 3.3) < 2.5)
+    noise = np.random.default_rng(7).normal(0, 0.02, len(t))
+    return (0.3 * voice * envelope + noise).astype(np.float32)
+
+
+def calibration_audio(clip: Optional[Path], seconds: float) -> np.ndarray:
+    if clip is None:
+        return _synthetic_voice(seconds)
+    duration = min(seconds, get_media_duration(clip) or seconds)
+    audio = stream_audio(clip, duration)
+    if audio is None:
+        raise RuntimeError(f"Could not decode calibration clip {clip}")
+    return audio[:int(seconds * SAMPLE_RATE)]
+
+
+def _peak_rss_bytes() -> int:
+    info = psutil.Process().memory_info()
+    if hasattr(info, "peak_wset"):
+        return info.peak_wset   # Windows
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _measure_main(conn, model_dir: Path, compute_type: str, cpu_threads: int, audio: np.ndarray):
+    """Child process: cold-loads one configuration and transcribes the clip once."""
+    try:
+        from faster_whisper import WhisperModel
+        start = time.perf_counter()
+        whisper = WhisperModel(str(model_dir), device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        segments, _ = whisper.transcribe(audio, language="es", task="transcribe")
+        count = sum(1 for _ in segments)
+        transcribe_seconds = time.perf_counter() - start
+        conn.send({
+            "load_seconds": round(load_seconds, 3),
+            "transcribe_seconds": round(transcribe_seconds, 3),
+            "realtime_factor": round(len(audio) / SAMPLE_RATE / transcribe_seconds, 2),
+            "segments": count,
+            "peak_rss_bytes": _peak_rss_bytes()
+        })
+    except Exception as e:
+        conn.send({"error": str(e)})
+    finally:
+        conn.close()
+
+
+def measure(model: str, compute_type: str, cpu_threads: int, audio: np.ndarray,
+            model_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """Measures in a fresh process the directory the workers would load (or model_dir)."""
+    parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+    model_dir = model_dir or model_load_path(model, compute_type)
+    process = multiprocessing.Process(
+        target=_measure_main, args=(child_conn, model_dir, compute_type, cpu_threads, audio), daemon=True
+    )
+    process.start()
+    child_conn.close()
+    try:
+        if not parent_conn.poll(MEASURE_TIMEOUT_SECONDS):
+            result = {"error": f"timed out after {MEASURE_TIMEOUT_SECONDS}s"}
+        else:
+            result = parent_conn.recv()
+    except EOFError:
+        result = {"error": "measurement process exited unexpectedly"}
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+    return {"model": model, "compute_type": compute_type, "cpu_threads": cpu_threads, **result}
+
+
+def default_thread_counts() -> List[int]:
+    physical = psutil.cpu_count(logical=False) or 1
+    logical = psutil.cpu_count() or physical
+    return sorted({max(1, physical // 2), physical, logical})
+
+
+def autotune(models: Optional[List[str]] = None, compute_types: Optional[List[str]] = None,
+             threads: Optional[List[int]] = None, clip: Optional[Path] = None,
+             seconds: float = AUTOTUNE_CLIP_SECONDS) -> List[Dict[str, Any]]:
+    """Runs every candidate configuration and saves the successful measurements. Returns all of them."""
+    models = models or installed_models()
+    if not models:
+        raise RuntimeError("No model is installed yet; download one before running autotune")
+    audio = calibration_audio(clip, seconds)
+    results = []
+    for model in models:
+        for compute_type in compute_types or AUTOTUNE_COMPUTE_TYPES:
+            for cpu_threads in threads or default_thread_counts():
+                result = measure(model, compute_type, cpu_threads, audio)
+                if "error" in result:
+                    logger.warning(f"{model} / {compute_type} / {cpu_threads} threads failed: {result['error']}")
+                else:
+                    logger.info(
+                        f"{model} / {compute_type} / {cpu_threads} threads: RTF {result['realtime_factor']}, "
+                        f"load {result['load_seconds']}s, peak RSS {result['peak_rss_bytes'] / 1_048_576:.0f} MB"
+                    )
+                results.append(result)
+    save_autotune([r for r in results if "error" not in r], round(len(audio) / SAMPLE_RATE, 1))
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="+", default=None, help="Model sizes to measure (default: all installed)")
+    parser.add_argument("--compute-types", nargs="+", default=None)
+    parser.add_argument("--threads", type=int, nargs="+", default=None, help="CPU thread counts to try")
+    parser.add_argument("--clip", type=Path, default=None, help="Calibration recording (default: synthetic)")
+    parser.add_argument("--seconds", type=float, default=AUTOTUNE_CLIP_SECONDS)
+    args = parser.parse_args(argv)
+
+    results = autotune(args.models, args.compute_types, args.threads, args.clip, args.seconds)
+    print(json.dumps(results, indent=2))
+    print(f"Saved to {AUTOTUNE_FILE}")
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    logging.basicConfig(level="INFO", format="%(message)s")
+    main()
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from schemas.models import Job
+from config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+from core.segmenter import WINDOW_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# (job, unit payload for the worker, future receiving the job's result)
+Pending = Tuple[Job, Dict[str, Any], asyncio.Future]
+
+
+def window_count(duration_seconds: float) -> int:
+    """Windows a batched job contributes: one per started WINDOW_SECONDS."""
+    return max(1, math.ceil((duration_seconds or 0) / WINDOW_SECONDS))
+
+
+class JobBatcher:
+    """
+    Collects short jobs into batches that a worker decodes in one batched call.
+    The first job to arrive opens a batch. It closes once it holds max_size windows or max_wait seconds
+    have passed, and then waits for a free worker; jobs arriving in the meantime still join it, up to
+    max_size windows. So a busy pool naturally gets full batches while an idle one adds at most max_wait.
+    run_batch(worker, [(job, unit)]) returns {job_id: result}; it owns the worker and releases it
+    (the list can be empty when every job of the batch was cancelled while waiting).
+    """
+
+    def __init__(self, acquire: Callable[[], Awaitable[Any]],
+                 run_batch: Callable[[Any, List[Tuple[Job, Dict[str, Any]]]], Awaitable[Dict[str, Dict[str, Any]]]],
+                 max_size: int = BATCH_MAX_SIZE, max_wait: float = BATCH_MAX_WAIT_MS / 1000):
+        self.acquire = acquire
+        self.run_batch = run_batch
+        self.max_size = max(1, max_size)
+        self.max_wait = max_wait
+        self._pending: List[Pending] = []
+        self._full = asyncio.Event()
+        self._collector: asyncio.Task | None = None
+        self._running: set = set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _windows(self) -> int:
+        return sum(unit["windows"] for _, unit, _ in self._pending)
+
+    async def submit(self, job: Job, unit: Dict[str, Any]) -> Dict[str, Any]:
+        """Queues one job for the next batch and waits for its result."""
+        future = asyncio.get_running_loop().create_future()
+        unit["windows"] = window_count(unit["duration_seconds"])
+        self._pending.append((job, unit, future))
+        job._batched_at = time.perf_counter()
+        if self._windows() >= self.max_size:
+            self._full.set()
+        if self._collector is None or self._collector.done():
+            self._collector = asyncio.create_task(self._collect())
+        return await future
+
+    def _take(self) -> List[Pending]:
+        """
+        Up to max_size windows of pending jobs, in arrival order (at least one job if any is left).
+        Jobs cancelled while they waited are answered right away instead of going to the worker.
+        """
+        batch, windows, taken = [], 0, 0
+        for item in self._pending:
+            job, unit, future = item
+            if future.done():
+                pass
+            elif job._cancel_event.is_set():
+                future.set_result({"status": "cancelled", "text": None})
+            elif batch and windows + unit["windows"] > self.max_size:
+                break
+            else:
+                batch.append(item)
+                windows += unit["windows"]
+            taken += 1
+        self._pending = self._pending[taken:]
+        if self._windows() < self.max_size:
+            self._full.clear()
+        return batch
+
+    async def _collect(self):
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.max_wait)
+            except asyncio.TimeoutError:
+                pass
+            worker = await self.acquire()
+            batch = self._take()
+            task = asyncio.create_task(self._dispatch(worker, batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _dispatch(self, worker, batch: List[Pending]):
+        try:
+            results = await self.run_batch(worker, [(job, unit) for job, unit, _ in batch])
+        except Exception as e:
+            logger.error(f"Batch of {len(batch)} jobs failed: {e}")
+            results = {}
+            error = str(e)
+        else:
+            error = "Missing from batch result"
+        for job, _, future in batch:
+            if not future.done():
+                future.set_result(results.get(job.id, {"status": "error", "error": error, "text": None}))
+
+    def stop(self):
+        if self._collector:
+            self._collector.cancel()
+        for task in list(self._running):
+            task.cancel()
@@ -0,0 +1,89 @@
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from config import CHECKPOINT_DIR
+
+logger = logging.getLogger(__name__)
+
+
+def journal_path(key: str, chunk_index: Optional[int] = None) -> Path:
+    """Journals are keyed like the transcript cache, so a re-submitted or restored job finds its own."""
+    name = key if chunk_index is None else f"{key}.chunk{chunk_index}"
+    return CHECKPOINT_DIR / f"{name}.jsonl"
+
+
+def has_checkpoint(key: Optional[str]) -> bool:
+    return bool(key) and any(CHECKPOINT_DIR.glob(f"{key}*.jsonl"))
+
+
+def discard_checkpoints(key: Optional[str]):
+    """Removes every journal of a job (whole-file and per-chunk) once it no longer needs resuming."""
+    if not key:
+        return
+    for path in CHECKPOINT_DIR.glob(f"{key}*.jsonl"):
+        try:
+            path.unlink()
+        except OSError as e:
+            logger.warning(f"Could not remove checkpoint {path.name}: {e}")
+
+
+class CheckpointJournal:
+    """
+    Append-only JSONL journal of committed segments for one transcription unit.
+    The first line records the detected language; every following line is one segment
+    with absolute start/end timestamps. Each line is flushed as soon as it is written,
+    so a killed process loses at most the segment being decoded.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    def load(self) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """
+        Returns (detected_language, committed segments). A torn last line from a crash is cut off the
+        file, so the segments appended from here on follow the last good one.
+        """
+        language, segments = None, []
+        if not self.path.exists():
+            return language, segments
+        good = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                good += len(line)
+                if "language" in record:
+                    language = record["language"]
+                else:
+                    segments.append(record)
+        if good < self.path.stat().st_size:
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+        return language, segments
+
+    def _write(self, record: Dict[str, Any]):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def start(self, language: str):
+        """Records the detected language (only once per journal)."""
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            self._write({"language": language})
+
+    def append(self, segment: Dict[str, Any]):
+        self._write(segment)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -1,31 +1,84 @@
 import asyncio
 import logging
+import os
 import time
+import functools
+import json
+from collections import OrderedDict
 from typing import Dict, Any, Callable, Awaitable, List
-from concurrent.futures import ProcessPoolExecutor
 import multiprocessing
 from multiprocessing.managers import SyncManager
 
 from schemas.models import Job, JobStatus
-from core.media_processor import get_media_duration, extract_audio
-from core.transcriber import run_transcription
-from config import TMP_DIR
+from core.media_processor import get_media_duration, extract_audio, wav_duration, WAV_BYTES_PER_SECOND
+from core.model_manager import (
+    is_model_downloaded, model_path, select_model_config, quantize_model, PREQUANTIZED_COMPUTE_TYPES
+)
+from core.worker import WorkerPool
+from core.batcher import JobBatcher
+from core.segmenter import plan_chunks, plan_speech, merge_chunk_results
+from core.transcript_cache import TranscriptCache, file_fingerprint, cache_key, decode_settings
+from core.checkpoint import has_checkpoint, discard_checkpoints
+from core.job_store import JobStore
+from core.scheduler import JobScheduler
+from core.progress_channel import ProgressChannel
+from core import metrics
+from core.profiler import Trace
+from config import (
+    TMP_DIR, PRELOAD_MODEL, PREFETCH_DEPTH, PREFETCH_MAX_TMP_MB, AUDIO_STREAMING, CANCEL_PREEMPT_SECONDS,
+    PROBE_CONCURRENCY, PROBE_CACHE_SIZE, TRANSCRIPTION_ENGINE, PROFILING, PROFILE_DIR, WORKER_CPU_THREADS,
+    LONG_FILE_MIN_SECONDS, LONG_FILE_CHUNK_SECONDS, BATCHING, BATCH_MAX_JOB_SECONDS, BATCH_MAX_SIZE,
+    WHISPER_MODEL, WHISPER_COMPUTE_TYPE, MODEL_PREQUANTIZE, TRANSCRIPT_CACHE_FULL_HASH, RECENT_JOBS_IN_MEMORY, VAD_MODE
+)
 
 logger = logging.getLogger(__name__)
 
 class JobManager:
-    def __init__(self):
+    def __init__(self, engine: str = TRANSCRIPTION_ENGINE, vad_mode: str = VAD_MODE):
+        # Only unfinished jobs live here; finished ones move to the store (plus a small recent cache)
         self.jobs: Dict[str, Job] = {}
-        # Max 1 worker to serialize transcriptions (batch processing sequentially)
-        self.executor = ProcessPoolExecutor(max_workers=1)
+        self.store = JobStore()
+        self._recent: "OrderedDict[str, Job]" = OrderedDict()
+        self._store_opened = False
         self.manager = multiprocessing.Manager()
-        self.progress_queue = self.manager.Queue()
+        # Worker progress arrives over per-worker pipes and is pushed onto this loop-side queue
+        self.progress_channel = ProgressChannel()
+        self._progress_events: asyncio.Queue = asyncio.Queue()
+        # Long-lived workers keep the model warm; each one transcribes a single job at a time
+        self.pool = WorkerPool(self.progress_channel, engine=engine)
+        self.engine = engine
+        # "silero" runs in the workers; "energy" regions are found here right after extraction
+        self.vad_mode = vad_mode
+        # Model size / compute type the workers run; replaced by the autotuned choice in start()
+        self.model_config: Dict[str, Any] = {
+            "model": WHISPER_MODEL, "compute_type": WHISPER_COMPUTE_TYPE, "cpu_threads": self.pool.cpu_threads, "source": "config"
+        }
         self.event_callbacks: List[Callable[[dict], Awaitable[None]]] = []
+        self.cache = TranscriptCache()
         
         # Background task for progress monitoring
         self._monitor_task = None
-        self._process_queue_task = None
-        self._job_queue: asyncio.Queue = asyncio.Queue()
+        self._admission_task = None
+        self._prefetch_task = None
+        self._quantize_task = None
+        self._process_queue_tasks: List[asyncio.Task] = []
+        # Short jobs are decoded together (see core.batcher) and do not hold a _process_jobs consumer;
+        # the slots bound how many wait in the batcher, about one batch forming per worker plus one
+        self.batcher = JobBatcher(lambda: self.pool.acquire(), self._run_batch)
+        self._batch_slots = asyncio.Semaphore(BATCH_MAX_SIZE * (self.pool.size + 1))
+        self._batched_tasks: set = set()
+        # Pipeline: submitted jobs -> cache lookup -> scheduler -> (probe + extract) -> ready queue -> transcription
+        self._admission_queue: asyncio.Queue = asyncio.Queue()
+        self.scheduler = JobScheduler()
+        self._ready_queue: asyncio.Queue = asyncio.Queue()
+        self._prefetch_slots = asyncio.Semaphore(PREFETCH_DEPTH)
+        self._prefetched: Dict[str, Job] = {}
+        # Estimated WAV bytes held in TMP_DIR per job, bounded by PREFETCH_MAX_TMP_MB
+        self._tmp_reserved: Dict[str, int] = {}
+        self._tmp_space = asyncio.Condition()
+        # Durations are probed for every file at submit time, a few at once, and remembered by fingerprint
+        self._probe_slots = asyncio.Semaphore(PROBE_CONCURRENCY)
+        self._probe_cache: OrderedDict[str, float] = OrderedDict()
 
     def add_event_callback(self, callback: Callable[[dict], Awaitable[None]]):
         self.event_callbacks.append(callback)
@@ -38,48 +91,392 @@ class JobManager:
                 logger.error(f"Error in event callback: {e}")
 
     async def start(self):
-        """Starts background tasks to process queued jobs and monitor progress."""
+        """Starts the transcription workers and background tasks to process queued jobs and monitor progress."""
+        await self._select_model()
+        if not self.pool.is_alive():
+            # Spawning is quick; the model itself loads inside each worker without blocking the server
+            preload = PRELOAD_MODEL and await asyncio.to_thread(is_model_downloaded, model_path(self.model_config["model"]))
+            await asyncio.to_thread(self.pool.start, preload)
+        if not self._store_opened:
+            # Only once the workers exist: restored jobs start probing with ffprobe right away, and a worker forked
+            # while one is being launched inherits its pipes and keeps that Popen waiting forever
+            await asyncio.to_thread(self.store.open)
+            self._store_opened = True
+            await self._restore_jobs()
+        if self._quantize_task is None:
+            # Installs from before the pre-quantized copy existed get it in the background, used from the next start
+            self._quantize_task = asyncio.create_task(self._ensure_quantized())
         if self._monitor_task is None:
+            self.progress_channel.start(asyncio.get_running_loop(), self._progress_events.put_nowait)
             self._monitor_task = asyncio.create_task(self._monitor_progress_queue())
-        if self._process_queue_task is None:
-            self._process_queue_task = asyncio.create_task(self._process_jobs())
+        if self._admission_task is None:
+            self._admission_task = asyncio.create_task(self._admit_jobs())
+        if self._prefetch_task is None:
+            self._prefetch_task = asyncio.create_task(self._prefetch_jobs())
+        if not self._process_queue_tasks:
+            # One consumer per worker so several queued jobs are dispatched at once
+            self._process_queue_tasks = [
+                asyncio.create_task(self._process_jobs()) for _ in range(self.pool.size)
+            ]
 
     async def stop(self):
         if self._monitor_task:
             self._monitor_task.cancel()
-        if self._process_queue_task:
-            self._process_queue_task.cancel()
-        self.executor.shutdown(wait=False)
+            self.progress_channel.stop()
+        if self._admission_task:
+            self._admission_task.cancel()
+        if self._prefetch_task:
+            self._prefetch_task.cancel()
+        for task in self._process_queue_tasks:
+            task.cancel()
+        self.batcher.stop()
+        for task in list(self._batched_tasks):
+            task.cancel()
+        await asyncio.to_thread(self.pool.stop)
+        if self._store_opened:
+            await asyncio.to_thread(self.store.close)
+            self._store_opened = False
+
+    async def _restore_jobs(self):
+        """
+        Re-queues the jobs that were still pending when the app last stopped.
+        Paused jobs come back paused and wait for resume_job like any other parked job.
+        """
+        restorable = []
+        for job in await asyncio.to_thread(self.store.load_unfinished):
+            if job.original_path and job.original_path.exists() and job.status == JobStatus.PAUSED:
+                self._register(job)
+            elif job.original_path and job.original_path.exists():
+                job.status = JobStatus.QUEUED
+                restorable.append(job)
+            else:
+                job.status = JobStatus.ERROR
+                job.error = "Source file no longer exists"
+                self.store.save(job)
+        if restorable:
+            logger.info(f"Restoring {len(restorable)} unfinished jobs from the job store")
+            self.submit_jobs(restorable)
+
+    async def _select_model(self):
+        """
+        Chooses the model size / compute type from the autotune measurements and hands it to the workers.
+        With several workers (or explicit WORKER_CPU_THREADS / pinning) the pool's thread split is kept.
+        """
+        if self.engine != "whisper":
+            return
+        fixed_threads = self.pool.cpu_threads if (self.pool.size > 1 or WORKER_CPU_THREADS or self.pool.pin_cpus) else 0
+        config = await asyncio.to_thread(select_model_config, self.pool.size, fixed_threads)
+        if config != self.model_config:
+            logger.info(
+                f"Using model {config['model']} ({config['compute_type']}, {config['cpu_threads'] or 'auto'} threads) "
+                f"from {config['source']}"
+            )
+        self.model_config = config
+        await asyncio.to_thread(self.pool.configure_model, config["model"], config["compute_type"], config["cpu_threads"])
+
+    async def _ensure_quantized(self):
+        """Builds the pre-quantized copy of the selected model if its compute type can use one."""
+        if self.engine != "whisper" or not MODEL_PREQUANTIZE:
+            return
+        if self.model_config["compute_type"] in PREQUANTIZED_COMPUTE_TYPES:
+            await asyncio.to_thread(quantize_model, self.model_config["model"])
+
+    async def preload_model(self):
+        """Warms up the workers after a model becomes available (e.g. right after download)."""
+        # A newly installed size may change the best configuration; reconfigured workers come back warm
+        await self._select_model()
+        # Quantized before the workers load, so they start from the int8 copy right away
+        await self._ensure_quantized()
+        # The workers are usually already running, spawned cold before the model existed
+        results = await asyncio.gather(*[asyncio.to_thread(w.warm) for w in self.pool.workers])
+        for result in results:
+            if result.get("status") != "loaded":
+                logger.error(f"Model warm-up failed: {result.get('error')}")
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return self.pool.throughput()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
+
+    async def metrics_text(self) -> str:
+        """
+        Prometheus exposition of the pipeline: the histograms in core.metrics plus gauges sampled now.
+        Only counters are read and one directory is listed, so scraping every few seconds is cheap.
+        """
+        tmp_bytes = await asyncio.to_thread(_dir_bytes, TMP_DIR)
+        worker_rss = await asyncio.to_thread(lambda: [w.rss_bytes() for w in self.pool.workers])
+        gauges = []
+        gauges += metrics.render_gauge("aura_queue_depth", "Jobs waiting in each pipeline queue", [
+            ({"queue": "admission"}, self._admission_queue.qsize()),
+            ({"queue": "scheduler"}, self.scheduler.qsize()),
+            ({"queue": "ready"}, self._ready_queue.qsize())
+        ])
+        gauges += metrics.render_gauge("aura_active_jobs", "Unfinished jobs, including paused ones",
+                                       [({}, len(self.jobs))])
+        gauges += metrics.render_gauge("aura_workers", "Transcription worker processes", [({}, self.pool.size)])
+        gauges += metrics.render_gauge("aura_active_workers", "Workers currently running a job",
+                                       [({}, self.pool.active_workers)])
+        gauges += metrics.render_gauge("aura_tmp_dir_bytes", "Bytes held in TMP_DIR (extracted WAVs and uploads)",
+                                       [({}, tmp_bytes)])
+        gauges += metrics.render_gauge("aura_tmp_reserved_bytes", "Estimated WAV bytes reserved by prefetched jobs",
+                                       [({}, sum(self._tmp_reserved.values()))])
+        gauges += metrics.render_gauge("aura_worker_rss_bytes", "Resident memory of each worker process",
+                                       [({"worker": str(i)}, rss) for i, rss in enumerate(worker_rss)])
+        return metrics.render(gauges)
 
     def submit_jobs(self, new_jobs: List[Job]):
         for j in new_jobs:
-            # Initialize these safely inside the Manager context for Windows pickling
-            j._pause_event = self.manager.Event()
-            j._cancel_event = self.manager.Event()
-            self.jobs[j.id] = j
-            self._job_queue.put_nowait(j)
+            self._register(j)
+            self._admission_queue.put_nowait(j)
+
+    def _register(self, j: Job):
+        # Initialize these safely inside the Manager context for Windows pickling
+        j._pause_event = self.manager.Event()
+        j._cancel_event = self.manager.Event()
+        j._queued_at = time.perf_counter()
+        j._trace = Trace(PROFILING)
+        self.jobs[j.id] = j
+        self.store.save(j)
+        j._probe_task = asyncio.ensure_future(self._probe(j))
+
+    def get_trace(self, job_id: str) -> Dict[str, Any] | None:
+        """Chrome trace of a job: live for jobs still in memory, otherwise from the file written when it finished."""
+        job = self.jobs.get(job_id) or self._recent.get(job_id)
+        if job is not None and job._trace is not None and job._trace.enabled:
+            return job._trace.to_chrome(job.original_filename)
+        path = PROFILE_DIR / f"{job_id}.trace.json"
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8"))
+        return None
+
+    async def get_job(self, job_id: str) -> Job | None:
+        job = self.jobs.get(job_id) or self._recent.get(job_id)
+        if job is None and self._store_opened:
+            # Finished a while ago: load it (with its text) from the store on demand
+            job = await asyncio.to_thread(self.store.load, job_id)
+        return job
+
+    def _finish(self, job: Job):
+        """Persists a job's final state and moves it out of the active set, so memory stays flat."""
+        self.store.save(job)
+        if job._trace is not None and job._trace.enabled:
+            try:
+                job._trace.save(PROFILE_DIR / f"{job.id}.trace.json", job.original_filename)
+            except OSError as e:
+                logger.error(f"Failed to write trace for job {job.id}: {e}")
+        if self.jobs.pop(job.id, None) is not None:
+            metrics.JOBS_FINISHED.inc(job.status.value)
+        self._recent[job.id] = job
+        self._recent.move_to_end(job.id)
+        while len(self._recent) > RECENT_JOBS_IN_MEMORY:
+            self._recent.popitem(last=False)
+
+    def _language(self, job: Job) -> str:
+        return job.detected_language or "es" # or passed language
+
+    async def _admit_jobs(self):
+        """
+        Admission stage: answers jobs straight from the transcript cache when possible,
+        and hands cache misses to the scheduler. Jobs submitted together are admitted together,
+        so the scheduler can order the whole group rather than whichever job came first.
+        """
+        while True:
+            try:
+                group = [await self._admission_queue.get()]
+                while not self._admission_queue.empty():
+                    group.append(self._admission_queue.get_nowait())
+                await asyncio.gather(*[self._admit(job) for job in group])
+            except asyncio.CancelledError:
+                break
+
+    async def _admit(self, job: Job):
+        try:
+            if job.status in [JobStatus.CANCELLED, JobStatus.ERROR]:
+                self._finish(job)
+                return
+            with job._trace.span("cache_lookup"):
+                answered = await self._complete_from_cache(job)
+            if answered:
+                return
+            if self.scheduler.needs_duration:
+                # Probes run in parallel since submit; the policy cannot order jobs without them
+                await job._probe_task
+        except Exception as e:
+            logger.error(f"Error admitting job: {e}")
+        self.scheduler.put_nowait(job)
+
+    async def _fingerprint(self, job: Job) -> str:
+        """Content fingerprint of the job's file, computed at most once per job."""
+        if job._content_fingerprint is None:
+            if job._fingerprint_task is None:
+                job._fingerprint_task = asyncio.ensure_future(
+                    asyncio.to_thread(file_fingerprint, job.original_path, TRANSCRIPT_CACHE_FULL_HASH)
+                )
+            job._content_fingerprint = await job._fingerprint_task
+        return job._content_fingerprint
+
+    async def _probe(self, job: Job) -> float:
+        """
+        Metadata prefetch, started for every job as soon as it is submitted so batch-wide audio totals
+        and ETAs are known up front. At most PROBE_CONCURRENCY ffprobe processes run at once and
+        results are cached by content fingerprint, so re-submitted files are never probed again.
+        """
+        try:
+            slot_wait = time.perf_counter()
+            async with self._probe_slots:
+                job._trace.add_span("probe_slot_wait", slot_wait, time.perf_counter(), lane="probe")
+                fingerprint = await self._fingerprint(job)
+                if job.status in [JobStatus.COMPLETED, JobStatus.CANCELLED, JobStatus.ERROR]:
+                    # Answered from the transcript cache (or dropped) while waiting for a slot
+                    return job.duration_seconds or 0.0
+                duration = self._probe_cache.get(fingerprint)
+                if duration is None:
+                    stage_start = time.perf_counter()
+                    duration = await asyncio.to_thread(get_media_duration, job.original_path, job._cancel_event)
+                    job.stage_timings["probe"] = round(time.perf_counter() - stage_start, 3)
+                    metrics.PROBE_SECONDS.observe(job.stage_timings["probe"])
+                    job._trace.add_span("ffprobe", stage_start, time.perf_counter(), lane="probe", duration=duration)
+                    if duration:
+                        self._probe_cache[fingerprint] = duration
+                        while len(self._probe_cache) > PROBE_CACHE_SIZE:
+                            self._probe_cache.popitem(last=False)
+                else:
+                    self._probe_cache.move_to_end(fingerprint)
+        except Exception as e:
+            logger.error(f"Error probing {job.original_path}: {e}")
+            return 0.0
+
+        if duration and job.duration_seconds is None:
+            job.duration_seconds = duration
+            await self.emit({
+                "event": "probed",
+                "job_id": job.id,
+                "duration_seconds": duration,
+                "queued_audio_seconds": round(self._queued_audio_seconds(), 1)
+            })
+        return duration
+
+    def _queued_audio_seconds(self) -> float:
+        """Audio still to be transcribed across all active jobs (as far as it has been probed)."""
+        return sum((j.duration_seconds or 0) * (1 - j.progress_audio) for j in self.jobs.values())
+
+    async def _complete_from_cache(self, job: Job) -> bool:
+        fingerprint = await self._fingerprint(job)
+        job._cache_key = cache_key(
+            fingerprint, self.model_config["model"], self.model_config["compute_type"], self._language(job),
+            decode_settings(self.engine, self.vad_mode, self.pool.size)
+        )
+        entry = await asyncio.to_thread(self.cache.get, job._cache_key)
+        if entry is None:
+            return False
+
+        logger.info(f"Job {job.id} served from transcript cache")
+        job.status = JobStatus.COMPLETED
+        job.progress_audio = 1.0
+        job.result_text = entry["text"]
+        job.detected_language = entry["detected_language"]
+        job.duration_seconds = entry["duration_seconds"]
+        await self._emit_completed(job)
+        self._finish(job)
+        return True
+
+    async def _prefetch_jobs(self):
+        """
+        Extraction stage: probes and extracts audio for upcoming jobs while earlier ones are transcribing.
+        At most PREFETCH_DEPTH extracted jobs wait in the ready queue at any time.
+        """
+        while True:
+            try:
+                # Wait for a slot before choosing, so the scheduler decides as late as possible
+                await self._prefetch_slots.acquire()
+                try:
+                    job: Job = await self.scheduler.get()
+                except asyncio.CancelledError:
+                    self._prefetch_slots.release()
+                    raise
+                if job._queued_at is not None:
+                    metrics.QUEUE_WAIT_SECONDS.observe(time.perf_counter() - job._queued_at, "scheduler")
+                    job._trace.add_span("queue_scheduler", job._queued_at, time.perf_counter())
+
+                if job.status == JobStatus.CANCELLED:
+                    # A resumed job may still own its WAV and journals
+                    self._prefetch_slots.release()
+                    await self._cleanup_and_emit(job)
+                    continue
+                if job.status == JobStatus.ERROR:
+                    self._prefetch_slots.release()
+                    self._finish(job)
+                    continue
 
-    def get_job(self, job_id: str) -> Job | None:
-        return self.jobs.get(job_id)
+                resumable = job.tmp_audio_path is not None and job.tmp_audio_path.exists()
+                if job.status == JobStatus.CANCELLED or not (resumable or await self._prepare_job(job)):
+                    self._prefetch_slots.release()
+                    continue
+
+                self._prefetched[job.id] = job
+                job._ready_at = time.perf_counter()
+                self._ready_queue.put_nowait(job)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error prefetching job: {e}")
 
     async def _process_jobs(self):
-        """Continuously pulls jobs from the queue and processes them one by one."""
+        """Continuously pulls extracted jobs from the ready queue and transcribes them (one such loop per worker)."""
         while True:
             try:
-                job: Job = await self._job_queue.get()
+                job: Job = await self._ready_queue.get()
+                self._prefetched.pop(job.id, None)
+                self._prefetch_slots.release()
+                metrics.QUEUE_WAIT_SECONDS.observe(time.perf_counter() - job._ready_at, "ready")
+                job._trace.add_span("queue_ready", job._ready_at, time.perf_counter())
                 if job.status in [JobStatus.CANCELLED, JobStatus.ERROR]:
-                    self._job_queue.task_done()
+                    # Cancelled while waiting: its WAV was already removed by cancel_job
+                    self._finish(job)
+                    self._ready_queue.task_done()
                     continue
 
-                await self._run_job(job)
-                self._job_queue.task_done()
+                if self._is_batchable(job):
+                    # Waits in the batcher for other short jobs; this consumer moves on to the next one
+                    await self._batch_slots.acquire()
+                    task = asyncio.create_task(self._run_batched_job(job))
+                    self._batched_tasks.add(task)
+                    task.add_done_callback(self._batched_tasks.discard)
+                else:
+                    await self._run_job(job)
+                self._ready_queue.task_done()
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Error processing job queue: {e}")
 
-    async def _run_job(self, job: Job):
+    async def _run_batched_job(self, job: Job):
+        try:
+            await self._run_job(job)
+        finally:
+            self._batch_slots.release()
+
+    async def _reserve_tmp_space(self, job: Job):
+        """Waits until the job's WAV fits in the tmp-disk budget shared by prefetched jobs."""
+        estimate = int((job.duration_seconds or 0) * WAV_BYTES_PER_SECOND)
+        async with self._tmp_space:
+            # Always admit a job when nothing else holds space, so oversized files still get processed
+            await self._tmp_space.wait_for(
+                lambda: not self._tmp_reserved or
+                sum(self._tmp_reserved.values()) + estimate <= PREFETCH_MAX_TMP_MB * 1_048_576
+            )
+            self._tmp_reserved[job.id] = estimate
+
+    async def _release_tmp_space(self, job: Job):
+        async with self._tmp_space:
+            if self._tmp_reserved.pop(job.id, None) is not None:
+                self._tmp_space.notify_all()
+
+    async def _prepare_job(self, job: Job) -> bool:
+        """Probes the media and extracts its audio. Returns False if the job ended (error/cancel) instead."""
         job.status = JobStatus.EXTRACTING
+        self.store.save(job)
         await self.emit({
             "event": "status_change",
             "job_id": job.id,
@@ -90,16 +487,37 @@ class JobManager:
         job._pause_event.set()
         job._cancel_event.clear()
         
-        # 1. duration
-        duration = await asyncio.to_thread(get_media_duration, job.original_path)
-        job.duration_seconds = duration
+        # 1. duration: probed at submit time, so normally already known by now
+        stage_start = time.perf_counter()
+        if job._probe_task is None:
+            job._probe_task = asyncio.ensure_future(self._probe(job))
+        job.duration_seconds = await job._probe_task or job.duration_seconds
+        job.stage_timings["probe_wait"] = round(time.perf_counter() - stage_start, 3)
+        job._trace.add_span("probe_wait", stage_start, time.perf_counter())
+        if job._cancel_event.is_set():
+            job.status = JobStatus.CANCELLED
+            await self._cleanup_and_emit(job)
+            return False
+
+        if self._can_stream(job):
+            # The worker decodes the media itself; nothing to extract ahead of time
+            job._stream_audio = True
+            return True
 
         # 2. extract audio
+        with job._trace.span("tmp_space_wait"):
+            await self._reserve_tmp_space(job)
+        if job._cancel_event.is_set():
+            job.status = JobStatus.CANCELLED
+            await self._cleanup_and_emit(job)
+            return False
         tmp_id = job.id
         tmp_audio_path = TMP_DIR / f"{tmp_id}.wav"
         job.tmp_audio_path = tmp_audio_path
         
-        success = await asyncio.to_thread(extract_audio, job.original_path, tmp_audio_path)
+        stage_start = time.perf_counter()
+        success = await asyncio.to_thread(extract_audio, job.original_path, tmp_audio_path, job._cancel_event)
+        job.stage_timings["extract"] = round(time.perf_counter() - stage_start, 3)
         if not success or job._cancel_event.is_set():
             if not job._cancel_event.is_set():
                 job.status = JobStatus.ERROR
@@ -107,59 +525,230 @@ class JobManager:
             else:
                 job.status = JobStatus.CANCELLED
             await self._cleanup_and_emit(job)
-            return
+            return False
+        metrics.EXTRACT_SECONDS.observe(job.stage_timings["extract"])
+        job._trace.add_span("ffmpeg_extract", stage_start, time.perf_counter())
+        # The WAV header gives the exact length for free, even when the probe failed
+        with job._trace.span("wav_header"):
+            job.duration_seconds = await asyncio.to_thread(wav_duration, tmp_audio_path) or job.duration_seconds
+        if self.vad_mode == "energy":
+            stage_start = time.perf_counter()
+            try:
+                job._speech_regions = await asyncio.to_thread(plan_speech, tmp_audio_path)
+            except Exception as e:
+                # The worker runs the gate itself when there are no regions
+                logger.warning(f"Job {job.id}: energy VAD failed during extraction: {e}")
+            job.stage_timings["vad_plan"] = round(time.perf_counter() - stage_start, 3)
+            job._trace.add_span("vad_plan", stage_start, time.perf_counter())
+        return True
+
+    def _can_stream(self, job: Job) -> bool:
+        """
+        Whether the job can skip the intermediate WAV and have ffmpeg stream straight into the model.
+        Needs a known duration to size the buffer and report progress. Chunked long files and jobs resuming
+        from a checkpoint need seekable input, so they keep the WAV path.
+        """
+        return (
+            AUDIO_STREAMING and bool(job.duration_seconds)
+            and not self._is_long_file(job) and not has_checkpoint(job._cache_key)
+        )
+
+    def _is_long_file(self, job: Job) -> bool:
+        """Long files are split on silence and their chunks spread across the pool's workers."""
+        return self.pool.size > 1 and (job.duration_seconds or 0) >= LONG_FILE_MIN_SECONDS
+
+    def _is_batchable(self, job: Job) -> bool:
+        """
+        Short files are decoded in batches together with other short files. Jobs resuming from a
+        checkpoint keep the single-job path, which knows how to continue from their journal.
+        """
+        return (
+            BATCHING and 0 < (job.duration_seconds or 0) <= BATCH_MAX_JOB_SECONDS
+            and not self._is_long_file(job) and not has_checkpoint(job._cache_key)
+        )
+
+    async def _run_batch(self, worker, items: List[tuple]) -> Dict[str, Dict[str, Any]]:
+        """
+        Runs one batch of short jobs [(job, unit)] on the worker the batcher acquired, and releases it.
+        Timings and worker spans belong to the whole batch and are recorded on every job in it;
+        segments and progress reach each job through the progress channel as usual.
+        """
+        run_start = time.perf_counter()
+        audio_seconds = 0.0
+        try:
+            if not items:
+                return {}
+            for job, _ in items:
+                job._trace.add_span("batch_wait", job._batched_at, run_start, lane="transcribe")
+            metrics.BATCH_WINDOWS.observe(sum(unit["windows"] for _, unit in items))
+            loop = asyncio.get_running_loop()
+            batch = await loop.run_in_executor(
+                None,
+                functools.partial(
+                    worker.run_batch,
+                    units=[unit for _, unit in items],
+                    max_size=BATCH_MAX_SIZE,
+                    vad=self.vad_mode,
+                    profile=any(job._trace.enabled for job, _ in items)
+                )
+            )
+            timings = batch.get("timings", {})
+            results = batch["results"]
+            for job, unit in items:
+                job._trace.extend(batch.get("trace"))
+                job._trace.add_span("worker_run", run_start, time.perf_counter(), lane="transcribe",
+                                    worker_pid=worker.pid, batch_jobs=len(items))
+                result = results.get(job.id, {})
+                if result.get("status") == "completed":
+                    result["timings"] = {**timings, "batch_jobs": len(items)}
+                    audio_seconds += unit["duration_seconds"]
+            if timings.get("model_load"):
+                metrics.MODEL_LOAD_SECONDS.observe(timings["model_load"])
+            if timings.get("transcribe") and audio_seconds:
+                metrics.TRANSCRIPTION_RTF.observe(audio_seconds / timings["transcribe"])
+            return results
+        finally:
+            self.pool.release(worker, audio_seconds)
+
+    async def _run_on_worker(self, job: Job, **kwargs) -> Dict[str, Any]:
+        """
+        Runs one transcription unit (a whole job or one chunk) on the next free warm worker.
+        When profiling, the worker's own spans come back with the result; the gap between them and
+        the enclosing worker_run span is the pipe round-trip plus pickling of the result.
+        """
+        chunk_index = kwargs.get("chunk_index")
+        lane = "transcribe" if chunk_index is None else f"chunk {chunk_index}"
+        with job._trace.span("worker_acquire", lane=lane):
+            worker = await self.pool.acquire()
+        job._workers.append(worker)
+        transcribed_seconds = 0.0
+        run_start = time.perf_counter()
+        try:
+            # The blocking round-trip to the worker process runs in a thread
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                None,
+                functools.partial(
+                    worker.run,
+                    job_id=job.id,
+                    language=self._language(job),
+                    pause_event=job._pause_event,
+                    cancel_event=job._cancel_event,
+                    checkpoint_key=job._cache_key,
+                    vad=self.vad_mode,
+                    speech_regions=job._speech_regions,
+                    profile=job._trace.enabled,
+                    **kwargs
+                )
+            )
+            job._trace.extend(result.pop("trace", None))
+            if result["status"] == "completed":
+                transcribed_seconds = kwargs["duration_seconds"] or 0.0
+                timings = result.get("timings", {})
+                if timings.get("model_load"):
+                    metrics.MODEL_LOAD_SECONDS.observe(timings["model_load"])
+                if timings.get("transcribe") and transcribed_seconds:
+                    metrics.TRANSCRIPTION_RTF.observe(transcribed_seconds / timings["transcribe"])
+            elif result["status"] == "error":
+                # Stop the job's other chunks early; the error is what gets reported
+                job._cancel_event.set()
+            return result
+        finally:
+            job._trace.add_span("worker_run", run_start, time.perf_counter(), lane=lane, worker_pid=worker.pid)
+            job._workers.remove(worker)
+            self.pool.release(worker, transcribed_seconds)
+
+    async def _transcribe(self, job: Job) -> Dict[str, Any]:
+        if self._is_batchable(job):
+            return await self.batcher.submit(job, {
+                "job_id": job.id,
+                "audio_path": job.original_path if job._stream_audio else job.tmp_audio_path,
+                "stream": job._stream_audio,
+                "duration_seconds": job.duration_seconds,
+                "language": self._language(job),
+                "pause_event": job._pause_event,
+                "cancel_event": job._cancel_event,
+                "speech_regions": job._speech_regions
+            })
 
+        if not self._is_long_file(job):
+            return await self._run_on_worker(
+                job,
+                audio_path=job.original_path if job._stream_audio else job.tmp_audio_path,
+                stream=job._stream_audio,
+                duration_seconds=job.duration_seconds
+            )
+
+        with job._trace.span("plan_chunks"):
+            chunks = await asyncio.to_thread(plan_chunks, job.tmp_audio_path, LONG_FILE_CHUNK_SECONDS)
+        job._chunk_weights = [end - start for start, end in chunks]
+        if len(job._chunk_progress) != len(chunks):
+            # Kept across pause/resume: finished chunks return straight from their journals
+            job._chunk_progress = [0.0] * len(chunks)
+        results = await asyncio.gather(*[
+            self._run_on_worker(
+                job,
+                audio_path=job.tmp_audio_path,
+                duration_seconds=end - start,
+                start_seconds=start,
+                end_seconds=end,
+                chunk_index=idx
+            )
+            for idx, (start, end) in enumerate(chunks)
+        ])
+        return merge_chunk_results(results)
+
+    async def _run_job(self, job: Job):
         # 3. transcribe
         job.status = JobStatus.TRANSCRIBING
-        job.elapsed_seconds = 0
+        self.store.save(job)
         await self.emit({
             "event": "status_change",
             "job_id": job.id,
             "status": job.status.value
         })
         
-        start_time = time.time()
+        # A resumed job keeps counting from where it was paused
+        start_time = time.time() - job.elapsed_seconds
+        transcribe_start = time.perf_counter()
+        paused = False
         
-        # Launch in executor
-        loop = asyncio.get_running_loop()
-        future = loop.run_in_executor(
-            self.executor,
-            run_transcription,
-            job.id,
-            job.tmp_audio_path,
-            job.detected_language or "es", # or passed language
-            job.duration_seconds,
-            job._pause_event,
-            job._cancel_event,
-            self.progress_queue
-        )
+        future = asyncio.ensure_future(self._transcribe(job))
         job._process_future = future
         
         try:
-            # We await the future in a tight loop to also update elapsed_seconds
+            # Wake up once a second to update elapsed_seconds, but return as soon as the job is done
             while not future.done():
-                await asyncio.sleep(1)
+                await asyncio.wait({future}, timeout=1)
                 # Only update elapsed if transcribing (not paused)
                 if job.status == JobStatus.TRANSCRIBING:
                     job.elapsed_seconds = int(time.time() - start_time)
             
             result = future.result()
+            job._trace.add_span("transcribe", transcribe_start, time.perf_counter(), status=result["status"])
+            job.stage_timings.update(result.get("timings", {}))
+            logger.info(f"Job {job.id} stage timings: {job.stage_timings}")
             
             if result["status"] == "completed":
                 job.status = JobStatus.COMPLETED
                 job.result_text = result["text"]
                 job.detected_language = result["detected_language"]
+                self._record_vad(job, result.get("vad"))
+                self._record_interventions(job, result.get("interventions", []))
                 
-                await self.emit({
-                    "event": "completed",
-                    "job_id": job.id,
-                    "filename": job.original_filename,
-                    "detected_language": job.detected_language,
-                    "duration_seconds": job.duration_seconds,
-                    "text": job.result_text
-                })
+                await self._emit_completed(job)
+                if job._cache_key:
+                    with job._trace.span("cache_put"):
+                        await asyncio.to_thread(self.cache.put, job._cache_key, {
+                            "text": job.result_text,
+                            "detected_language": job.detected_language,
+                            "duration_seconds": job.duration_seconds,
+                            "segments": result.get("segments", [])
+                        })
             elif result["status"] == "cancelled":
                 job.status = JobStatus.CANCELLED
+            elif result["status"] == "paused":
+                paused = True
             else:
                 job.status = JobStatus.ERROR
                 job.error = result.get("error", "Unknown error")
@@ -168,15 +757,100 @@ class JobManager:
             logger.error(f"Error awaiting transcription future: {e}")
             job.status = JobStatus.ERROR
             job.error = str(e)
-            
+
+        if paused and job.status != JobStatus.CANCELLED:
+            await self._park(job)
+            return
+        if job.status == JobStatus.COMPLETED:
+            logger.info(f"Pool throughput: {self.pool.throughput()}")
         await self._cleanup_and_emit(job)
 
+    async def _park(self, job: Job):
+        """
+        A paused job has already handed its worker back. Its WAV, tmp-space reservation and checkpoint
+        journals stay in place so that resume_job can requeue it from the last committed segment.
+        """
+        if job._pause_event.is_set():
+            # Resumed before the worker reached the pause point
+            self._requeue(job)
+            return
+        job.status = JobStatus.PAUSED
+        self.store.save(job)
+        logger.info(f"Job {job.id} paused at {job.progress_audio:.0%}, worker released")
+        await self.emit({
+            "event": "status_change",
+            "job_id": job.id,
+            "status": job.status.value
+        })
+
+    def _requeue(self, job: Job):
+        job.status = JobStatus.QUEUED
+        job._queued_at = time.perf_counter()
+        self.store.save(job)
+        self.scheduler.put_nowait(job)
+
+    def _record_vad(self, job: Job, report: Dict[str, Any] | None):
+        """Speech ratio and compute saved by the VAD, from the worker's report (None with the VAD off)."""
+        if not report or not report["audio_seconds"]:
+            return
+        job.speech_ratio = round(report["speech_seconds"] / report["audio_seconds"], 3)
+        job.vad_saved_seconds = report["saved_seconds"]
+        metrics.VAD_AUDIO_SECONDS.inc("speech", amount=report["speech_seconds"])
+        metrics.VAD_AUDIO_SECONDS.inc("skipped", amount=report["audio_seconds"] - report["speech_seconds"])
+        if report["saved_seconds"]:
+            metrics.VAD_SAVED_SECONDS.inc(amount=report["saved_seconds"])
+        logger.info(
+            f"Job {job.id}: VAD kept {job.speech_ratio:.0%} of {report['audio_seconds']:.0f}s, "
+            f"saving ~{report['saved_seconds'] or 0:.1f}s of decoding"
+        )
+
+    def _record_interventions(self, job: Job, interventions: List[Dict[str, Any]]):
+        """Counts the repetition guard's interventions (each one was already logged by the worker)."""
+        if not interventions:
+            return
+        for intervention in interventions:
+            metrics.REPETITION_INTERVENTIONS.inc(intervention["reason"], intervention["action"])
+            metrics.REPETITION_RETRY_SECONDS.inc(amount=intervention["retry_seconds"])
+        job.stage_timings["repetition_retry"] = round(sum(i["retry_seconds"] for i in interventions), 3)
+        skipped = [i for i in interventions if i["action"] == "skipped"]
+        logger.warning(
+            f"Job {job.id}: {len(interventions)} repetition loops caught, {len(skipped)} windows skipped "
+            f"({sum(i['seconds'] for i in skipped):.0f}s of audio)"
+        )
+
+    async def _emit_completed(self, job: Job):
+        """
+        The full text is not inlined: segments were already streamed live, and clients fetch
+        the final text from text_url, which keeps every WebSocket frame small.
+        """
+        await self.emit({
+            "event": "completed",
+            "job_id": job.id,
+            "filename": job.original_filename,
+            "detected_language": job.detected_language,
+            "duration_seconds": job.duration_seconds,
+            "segments_total": job._segment_seq,
+            "speech_ratio": job.speech_ratio,
+            "vad_saved_seconds": job.vad_saved_seconds,
+            "text_length": len(job.result_text or ""),
+            "text_url": f"/api/transcription/{job.id}/text"
+        })
+
     async def _cleanup_and_emit(self, job: Job):
+        cleanup_start = time.perf_counter()
         if job.tmp_audio_path and job.tmp_audio_path.exists():
             try:
                 job.tmp_audio_path.unlink()
             except Exception as e:
                 logger.error(f"Failed to delete tmp audio {job.tmp_audio_path}: {e}")
+        await self._release_tmp_space(job)
+        if job.status == JobStatus.CANCELLED and job._cancel_requested_at is not None:
+            job.stage_timings["cancel"] = round(time.perf_counter() - job._cancel_requested_at, 3)
+            logger.info(f"Job {job.id} cancelled in {job.stage_timings['cancel'] * 1000:.0f} ms")
+        if job.status in [JobStatus.COMPLETED, JobStatus.CANCELLED]:
+            # Errors keep their journal so a retry resumes where the failed run stopped
+            await asyncio.to_thread(discard_checkpoints, job._cache_key)
+        job._trace.add_span("cleanup", cleanup_start, time.perf_counter())
                 
         if job.status in [JobStatus.ERROR, JobStatus.CANCELLED]:
             await self.emit({
@@ -185,12 +859,13 @@ class JobManager:
                 "status": job.status.value,
                 "error_message": job.error
             })
+        self._finish(job)
 
     async def _monitor_progress_queue(self):
         while True:
             try:
-                # Use to_thread to safely poll without blocking asyncio loop
-                msg = await asyncio.to_thread(self._poll_queue)
+                # Delivered by the progress channel as soon as a worker produces it
+                msg = await self._progress_events.get()
                 if msg:
                     job_id = msg.get("job_id")
                     event_type = msg.get("event")
@@ -204,20 +879,48 @@ class JobManager:
                             job.status = JobStatus.PAUSED
                         elif new_status == "transcribing":
                             job.status = JobStatus.TRANSCRIBING
+                        self.store.save(job)
                         await self.emit({
                             "event": "status_change",
                             "job_id": job_id,
                             "status": job.status.value
                         })
                         
+                    elif event_type == "segment":
+                        # Sequence numbers let clients detect gaps and order segments from parallel chunks
+                        job._segment_seq += 1
+                        segment_event = {
+                            "event": "segment",
+                            "job_id": job.id,
+                            "seq": job._segment_seq,
+                            "start": msg["start"],
+                            "end": msg["end"],
+                            "text": msg["text"]
+                        }
+                        if "chunk" in msg:
+                            segment_event["chunk"] = msg["chunk"]
+                        await self.emit(segment_event)
+
                     elif event_type == "progress_update":
                         progress = msg.get("progress", 0.0)
+                        chunk = msg.get("chunk")
+                        if chunk is not None and job._chunk_progress:
+                            # Long file: combine chunk progress, weighted by each chunk's length
+                            job._chunk_progress[chunk] = progress
+                            weights = job._chunk_weights
+                            progress = sum(w * p for w, p in zip(weights, job._chunk_progress)) / sum(weights)
                         job.progress_audio = progress
                         
                         # Calculate remaining
                         if progress > 0 and job.elapsed_seconds > 0:
                             total_est = job.elapsed_seconds / progress
                             job.estimated_remaining = int(total_est - job.elapsed_seconds)
+
+                        # Whole queue: remaining probed audio at this job's speed, times the busy workers
+                        batch_eta = 0
+                        if progress > 0 and job.elapsed_seconds > 0 and job.duration_seconds:
+                            speed = progress * job.duration_seconds / job.elapsed_seconds * max(1, self.pool.active_workers)
+                            batch_eta = int(self._queued_audio_seconds() / speed)
                         
                         await self.emit({
                             "event": "progress",
@@ -227,7 +930,8 @@ class JobManager:
                             "batch_current": job.index_in_batch,
                             "batch_total": job.total_in_batch,
                             "elapsed_seconds": job.elapsed_seconds,
-                            "estimated_remaining": job.estimated_remaining
+                            "estimated_remaining": job.estimated_remaining,
+                            "batch_eta_seconds": batch_eta
                         })
                         
             except asyncio.CancelledError:
@@ -236,29 +940,87 @@ class JobManager:
                 logger.error(f"Error polling progress queue: {e}")
                 await asyncio.sleep(1)
 
-    def _poll_queue(self) -> dict | None:
-        try:
-            from queue import Empty
-            return self.progress_queue.get(timeout=0.5)
-        except Empty:
-            return None
-
     def pause_job(self, job_id: str):
+        """The worker stops at the next segment boundary and is handed to the next job in the queue."""
         job = self.jobs.get(job_id)
         if job and job.status == JobStatus.TRANSCRIBING:
             job._pause_event.clear()
 
     def resume_job(self, job_id: str):
         job = self.jobs.get(job_id)
-        if job and job.status == JobStatus.PAUSED:
+        if job and job.status in [JobStatus.TRANSCRIBING, JobStatus.PAUSED]:
             job._pause_event.set()
+            if job.status == JobStatus.PAUSED and job._cache_key is None:
+                # Restored paused at startup and never admitted: admission finds its checkpoint key
+                job.status = JobStatus.QUEUED
+                job._queued_at = time.perf_counter()
+                self.store.save(job)
+                self._admission_queue.put_nowait(job)
+            elif job.status == JobStatus.PAUSED:
+                # Parked: back into the queue, to continue from its checkpoint
+                self._requeue(job)
+
+    def set_priority(self, job_id: str, priority: int):
+        """Higher runs first. Takes effect immediately for a waiting job, since the scheduler orders on dispatch."""
+        job = self.jobs.get(job_id)
+        if job:
+            job.priority = priority
+            self.store.save(job)
+
+    def queue_snapshot(self) -> Dict[str, Any]:
+        """Jobs waiting for extraction, in the order the scheduler would dispatch them now."""
+        return {
+            "policy": self.scheduler.policy,
+            "jobs": [
+                {
+                    "job_id": j.id,
+                    "filename": j.original_filename,
+                    "duration_seconds": j.duration_seconds,
+                    "priority": j.priority,
+                    "batch_id": j.batch_id
+                }
+                for j in self.scheduler.ordered()
+            ]
+        }
 
     def cancel_job(self, job_id: str):
         job = self.jobs.get(job_id)
         if job and job.status not in [JobStatus.COMPLETED, JobStatus.CANCELLED, JobStatus.ERROR]:
+            was_parked = job.status == JobStatus.PAUSED
+            job._cancel_requested_at = time.perf_counter()
             job._cancel_event.set()
             job._pause_event.set() # Unblock if paused
             job.status = JobStatus.CANCELLED
-            if job._process_future and not job._process_future.done():
-                 # Process will see cancel_event and exit
-                 pass
+            self.store.save(job)
+            if self.scheduler.remove(job) or job.id in self._prefetched or was_parked:
+                # Still waiting, extracted ahead of time or parked by pause, so on no worker: finish it right away
+                asyncio.get_running_loop().create_task(self._cleanup_and_emit(job))
+            elif job._workers and CANCEL_PREEMPT_SECONDS > 0:
+                asyncio.get_running_loop().create_task(self._preempt_after(job))
+
+    async def _preempt_after(self, job: Job):
+        """
+        The transcriber only sees the cancel event between segments, and decoding one segment can take
+        seconds. Workers still running the job after CANCEL_PREEMPT_SECONDS are killed and respawned.
+        """
+        await asyncio.sleep(CANCEL_PREEMPT_SECONDS)
+        for worker in list(job._workers):
+            if worker.current_job_id == job.id:
+                logger.warning(f"Job {job.id} still running {CANCEL_PREEMPT_SECONDS}s after cancel, preempting worker PID {worker.pid}")
+                worker.preempt()
+
+
+def _dir_bytes(path) -> int:
+    """Total size of the files directly inside path (0 if it does not exist)."""
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    pass
+    except OSError:
+        pass
+    return total
@@ -0,0 +1,235 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from schemas.models import Job, JobStatus
+from config import JOB_DB_PATH, JOB_STORE_FLUSH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Columns persisted for every job. result_text is only read back when a job is looked up by id.
+_COLUMNS = [
+    "id", "original_filename", "original_path", "status", "index_in_batch", "total_in_batch",
+    "detected_language", "duration_seconds", "error", "result_text", "created_at", "updated_at",
+    "batch_id", "priority", "speech_ratio", "vad_saved_seconds", "content_fingerprint"
+]
+_SUMMARY_COLUMNS = [c for c in _COLUMNS if c != "result_text"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id                TEXT PRIMARY KEY,
+    original_filename TEXT NOT NULL,
+    original_path     TEXT,
+    status            TEXT NOT NULL,
+    index_in_batch    INTEGER NOT NULL,
+    total_in_batch    INTEGER NOT NULL,
+    detected_language TEXT,
+    duration_seconds  REAL,
+    error             TEXT,
+    result_text       TEXT,
+    created_at        REAL NOT NULL,
+    updated_at        REAL NOT NULL,
+    batch_id          TEXT,
+    priority          INTEGER NOT NULL DEFAULT 0,
+    speech_ratio      REAL,
+    vad_saved_seconds REAL,
+    content_fingerprint TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+"""
+
+# Columns added after the first release, applied to existing databases on open()
+_ADDED_COLUMNS = {
+    "batch_id": "TEXT",
+    "priority": "INTEGER NOT NULL DEFAULT 0",
+    "speech_ratio": "REAL",
+    "vad_saved_seconds": "REAL",
+    "content_fingerprint": "TEXT",
+}
+
+_UPSERT = (
+    f"INSERT INTO jobs ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' for _ in _COLUMNS)}) "
+    f"ON CONFLICT(id) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in _COLUMNS if c not in ("id", "created_at"))
+)
+
+# Statuses whose jobs still have work left when the app restarts
+UNFINISHED_STATUSES = [
+    JobStatus.QUEUED.value, JobStatus.EXTRACTING.value, JobStatus.TRANSCRIBING.value, JobStatus.PAUSED.value
+]
+
+_STOP = object()
+
+
+def _row(job: Job) -> tuple:
+    return (
+        job.id,
+        job.original_filename,
+        str(job.original_path) if job.original_path else None,
+        job.status.value,
+        job.index_in_batch,
+        job.total_in_batch,
+        job.detected_language,
+        job.duration_seconds,
+        job.error,
+        job.result_text,
+        job.created_at,
+        time.time(),
+        job.batch_id,
+        job.priority,
+        job.speech_ratio,
+        job.vad_saved_seconds,
+        job._content_fingerprint
+    )
+
+
+def _job_from_row(row: sqlite3.Row) -> Job:
+    keys = row.keys()
+    return Job(
+        id=row["id"],
+        original_filename=row["original_filename"],
+        original_path=Path(row["original_path"]) if row["original_path"] else None,
+        status=JobStatus(row["status"]),
+        index_in_batch=row["index_in_batch"],
+        total_in_batch=row["total_in_batch"],
+        detected_language=row["detected_language"],
+        duration_seconds=row["duration_seconds"],
+        error=row["error"],
+        result_text=row["result_text"] if "result_text" in keys else None,
+        created_at=row["created_at"],
+        batch_id=row["batch_id"],
+        priority=row["priority"],
+        speech_ratio=row["speech_ratio"],
+        vad_saved_seconds=row["vad_saved_seconds"],
+        # A restored job keeps its cache key, and so finds its checkpoint journal again
+        _content_fingerprint=row["content_fingerprint"]
+    )
+
+
+class JobStore:
+    """
+    Durable job history backed by SQLite in WAL mode.
+    save() only snapshots the job and queues it; a background thread writes the snapshots
+    in batches (one transaction per batch, last write per job wins), so the event loop
+    never waits on disk. Lookups use a separate read connection, which WAL lets run
+    alongside the writer; a job whose snapshot is still queued is answered from memory,
+    so it never disappears between save() and the commit.
+    """
+
+    def __init__(self, path: Path = JOB_DB_PATH, flush_seconds: float = JOB_STORE_FLUSH_SECONDS):
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self._queue: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._reader: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+        # job id -> (latest saved job, snapshots of it not committed yet)
+        self._unflushed: Dict[str, Tuple[Job, int]] = {}
+        self._unflushed_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._reader = self._connect()
+        self._reader.executescript(_SCHEMA)
+        existing = {r["name"] for r in self._reader.execute("PRAGMA table_info(jobs)")}
+        for column, declaration in _ADDED_COLUMNS.items():
+            if column not in existing:
+                self._reader.execute(f"ALTER TABLE jobs ADD COLUMN {column} {declaration}")
+        self._reader.commit()
+        self._writer = threading.Thread(target=self._write_loop, name="JobStoreWriter", daemon=True)
+        self._writer.start()
+
+    def close(self):
+        if self._writer:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+        if self._reader:
+            self._reader.close()
+            self._reader = None
+
+    def save(self, job: Job):
+        with self._unflushed_lock:
+            _, pending = self._unflushed.get(job.id, (job, 0))
+            self._unflushed[job.id] = (job, pending + 1)
+        self._queue.put(_row(job))
+
+    def _committed(self, job_ids: List[str]):
+        with self._unflushed_lock:
+            for job_id in job_ids:
+                job, pending = self._unflushed[job_id]
+                if pending > 1:
+                    self._unflushed[job_id] = (job, pending - 1)
+                else:
+                    del self._unflushed[job_id]
+
+    def flush(self):
+        """Blocks until every queued snapshot has been written."""
+        self._queue.join()
+
+    def _write_loop(self):
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+            # Gather whatever else arrives within the flush window into the same transaction
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            rows: Dict[str, tuple] = {}
+            for item in batch:
+                if item is _STOP:
+                    stopping = True
+                else:
+                    rows[item[0]] = item
+            try:
+                if rows:
+                    with conn:
+                        conn.executemany(_UPSERT, list(rows.values()))
+            except sqlite3.Error as e:
+                logger.error(f"Failed to persist {len(rows)} jobs: {e}")
+            finally:
+                self._committed([item[0] for item in batch if item is not _STOP])
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    def load(self, job_id: str) -> Optional[Job]:
+        with self._unflushed_lock:
+            unflushed = self._unflushed.get(job_id)
+        if unflushed:
+            return unflushed[0]
+        with self._read_lock:
+            row = self._reader.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return _job_from_row(row) if row else None
+
+    def load_unfinished(self) -> List[Job]:
+        """Jobs that were still queued or running when the app stopped, oldest first (without results)."""
+        placeholders = ", ".join("?" for _ in UNFINISHED_STATUSES)
+        with self._read_lock:
+            rows = self._reader.execute(
+                f"SELECT {', '.join(_SUMMARY_COLUMNS)} FROM jobs "
+                f"WHERE status IN ({placeholders}) ORDER BY created_at",
+                UNFINISHED_STATUSES
+            ).fetchall()
+        return [_job_from_row(r) for r in rows]
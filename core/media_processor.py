@@ -1,7 +1,9 @@
 import subprocess
 import logging
+import wave
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
+import numpy as np
 import static_ffmpeg
 
 logger = logging.getLogger(__name__)
@@ -9,8 +11,37 @@ logger = logging.getLogger(__name__)
 # Ensure static ffmpeg binaries are added to the PATH dynamically.
 static_ffmpeg.add_paths()
 
-def get_media_duration(filepath: Path) -> float:
-    """Gets the duration of a media file in seconds using ffprobe."""
+# Size of the extracted audio: 16 kHz, mono, 16-bit PCM
+SAMPLE_RATE = 16000
+WAV_BYTES_PER_SECOND = SAMPLE_RATE * 2
+
+# Bytes read from ffmpeg's stdout per call when streaming
+STREAM_CHUNK_BYTES = 1 << 20
+
+# How often a running ffmpeg/ffprobe checks its job's cancel event
+CANCEL_POLL_SECONDS = 0.05
+
+
+def _run_cancellable(cmd: List[str], cancel_event=None) -> Optional[Tuple[int, str, str]]:
+    """
+    Runs a command to completion like subprocess.run, but kills it as soon as cancel_event is set.
+    Output is drained while waiting so a chatty ffmpeg never blocks on a full pipe.
+    Returns (returncode, stdout, stderr), or None if the command was cancelled.
+    """
+    with subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True) as proc:
+        while True:
+            try:
+                stdout, stderr = proc.communicate(timeout=CANCEL_POLL_SECONDS)
+                return proc.returncode, stdout, stderr
+            except subprocess.TimeoutExpired:
+                if cancel_event is not None and cancel_event.is_set():
+                    proc.kill()
+                    proc.communicate()
+                    return None
+
+
+def get_media_duration(filepath: Path, cancel_event=None) -> float:
+    """Gets the duration of a media file in seconds using ffprobe. Returns 0.0 on failure or cancel."""
     try:
         cmd = [
             "ffprobe",
@@ -19,16 +50,22 @@ def get_media_duration(filepath: Path) -> float:
             "-of", "default=noprint_wrappers=1:nokey=1",
             str(filepath)
         ]
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
-        return float(result.stdout.strip())
+        result = _run_cancellable(cmd, cancel_event)
+        if result is None:
+            return 0.0
+        returncode, stdout, stderr = result
+        if returncode != 0:
+            raise RuntimeError(stderr.strip())
+        return float(stdout.strip())
     except Exception as e:
         logger.error(f"Error getting duration for {filepath}: {e}")
         return 0.0
 
-def extract_audio(input_path: Path, output_path: Path) -> bool:
+def extract_audio(input_path: Path, output_path: Path, cancel_event=None) -> bool:
     """
     Extracts audio from a given media file and converts it to Whisper-compatible 16kHz, mono, 16-bit WAV.
     output_path will be written to AppData/tmp/{job_id}.wav.
+    If cancel_event is set while ffmpeg runs, ffmpeg is killed, the partial WAV removed and False returned.
     """
     try:
         output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -39,6 +76,7 @@ def extract_audio(input_path: Path, output_path: Path) -> bool:
         cmd = [
             "ffmpeg",
             "-y",               # Overwrite output
+            "-nostdin",
             "-i", str(input_path),
             "-vn",              # No video
             "-acodec", "pcm_s16le", # 16-bit PCM
@@ -47,15 +85,98 @@ def extract_audio(input_path: Path, output_path: Path) -> bool:
             str(output_path)
         ]
         
-        # We don't check=True immediately to be able to log stderr on failure
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        
-        if result.returncode != 0:
+        # We don't check the return code immediately to be able to log stderr on failure
+        result = _run_cancellable(cmd, cancel_event)
+        if result is None:
+            logger.info(f"FFmpeg extraction cancelled for {input_path}")
+            output_path.unlink(missing_ok=True)
+            return False
+
+        returncode, _, stderr = result
+        if returncode != 0:
             logger.error(f"FFmpeg extraction failed for {input_path}")
-            logger.error(result.stderr)
+            logger.error(stderr)
             return False
             
         return output_path.exists()
     except Exception as e:
         logger.error(f"Exception during audio extraction for {input_path}: {e}")
         return False
+
+
+def stream_audio(input_path: Path, duration_seconds: float = 0.0, cancel_event=None) -> Optional[np.ndarray]:
+    """
+    Decodes a media file straight into memory as Whisper-ready float32 samples (16 kHz, mono),
+    without writing an intermediate WAV. ffmpeg's raw s16le stdout is read in chunks into a
+    NumPy buffer, preallocated from duration_seconds when known.
+    Returns None on failure or when cancel_event is set (ffmpeg is killed right away).
+    """
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-loglevel", "error",
+        "-i", str(input_path),
+        "-vn",
+        "-f", "s16le",          # Raw 16-bit PCM, no container
+        "-acodec", "pcm_s16le",
+        "-ar", str(SAMPLE_RATE),
+        "-ac", "1",
+        "pipe:1"
+    ]
+    try:
+        # Small headroom so an accurate probe never triggers a reallocation
+        capacity = int((duration_seconds or 60.0) * WAV_BYTES_PER_SECOND * 1.01) + STREAM_CHUNK_BYTES
+        buffer = bytearray(capacity)
+        view = memoryview(buffer)
+        filled = 0
+
+        with subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    proc.kill()
+                    proc.communicate()
+                    view.release()
+                    logger.info(f"FFmpeg streaming cancelled for {input_path}")
+                    return None
+                if filled + STREAM_CHUNK_BYTES > len(buffer):
+                    view.release()
+                    buffer.extend(bytearray(max(len(buffer) // 2, STREAM_CHUNK_BYTES)))
+                    view = memoryview(buffer)
+                n = proc.stdout.readinto(view[filled:filled + STREAM_CHUNK_BYTES])
+                if not n:
+                    break
+                filled += n
+            stderr = proc.stderr.read()
+            proc.wait()
+
+        view.release()
+        if proc.returncode != 0:
+            logger.error(f"FFmpeg streaming failed for {input_path}")
+            logger.error(stderr.decode(errors="replace"))
+            return None
+
+        samples = np.frombuffer(buffer, dtype=np.int16, count=filled // 2)
+        return samples.astype(np.float32) / 32768.0
+    except Exception as e:
+        logger.error(f"Exception during audio streaming for {input_path}: {e}")
+        return None
+
+
+def read_wav_range(wav_path: Path, start_seconds: float = 0.0, end_seconds: Optional[float] = None) -> np.ndarray:
+    """
+    Reads [start_seconds, end_seconds) of an extracted 16 kHz mono WAV as float32 samples.
+    Only the requested range is read from disk.
+    """
+    with wave.open(str(wav_path), "rb") as w:
+        rate = w.getframerate()
+        first = min(int(start_seconds * rate), w.getnframes())
+        last = w.getnframes() if end_seconds is None else min(int(end_seconds * rate), w.getnframes())
+        w.setpos(first)
+        raw = w.readframes(max(0, last - first))
+    return np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def wav_duration(wav_path: Path) -> float:
+    """Exact duration of an extracted WAV, read from its header."""
+    with wave.open(str(wav_path), "rb") as w:
+        return w.getnframes() / w.getframerate()
@@ -0,0 +1,148 @@
+"""
+Dependency-free metrics in the Prometheus text exposition format (version 0.0.4).
+Histograms and counters are module-level, updated in place on the event loop, and only
+formatted when /api/metrics is scraped; gauges are sampled by JobManager at scrape time.
+"""
+import bisect
+import math
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket upper bounds
+SECONDS_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+RTF_BUCKETS = (0.5, 1, 2, 4, 8, 16, 32, 64, 128)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32)
+WS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for v in values)
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, escaped)) + "}"
+
+
+def _header(name: str, help_text: str, kind: str) -> List[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+class Histogram:
+    """Cumulative-bucket histogram. observe() is one bisect and a few additions."""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = SECONDS_BUCKETS,
+                 labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.labels = tuple(labels)
+        # label values -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        if not self.labels:
+            self._series[()] = self._new_series()
+
+    def _new_series(self) -> list:
+        return [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+    def observe(self, value: float, *label_values: str):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = self._new_series()
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = _header(self.name, self.help_text, "histogram")
+        for label_values, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                labels = _format_labels(self.labels + ("le",), label_values + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {} if self.labels else {(): 0}
+
+    def inc(self, *label_values: str, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = _header(self.name, self.help_text, "counter")
+        for label_values, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+def render_gauge(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    """A gauge sampled at scrape time: samples are (labels, value) pairs."""
+    lines = _header(name, help_text, "gauge")
+    for labels, value in samples:
+        lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+    return lines
+
+
+PROBE_SECONDS = Histogram("aura_probe_seconds", "ffprobe duration probe per file (cache hits excluded)")
+EXTRACT_SECONDS = Histogram("aura_extract_seconds", "Audio extraction to the tmp WAV per job")
+MODEL_LOAD_SECONDS = Histogram("aura_model_load_seconds", "Cold model loads inside a worker")
+TRANSCRIPTION_RTF = Histogram(
+    "aura_transcription_realtime_factor",
+    "Audio seconds transcribed per wall-clock second, per worker run (whole job or chunk)",
+    RTF_BUCKETS
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "aura_queue_wait_seconds",
+    "Time a job waited: 'scheduler' from submit/resume to extraction, 'ready' from extraction to a free worker",
+    labels=("queue",)
+)
+WS_SEND_SECONDS = Histogram(
+    "aura_ws_broadcast_latency_seconds",
+    "Time from broadcast until the message was written to a WebSocket client",
+    WS_BUCKETS
+)
+BATCH_WINDOWS = Histogram(
+    "aura_batch_windows",
+    "30 s windows per batched decode of short jobs",
+    BATCH_BUCKETS
+)
+JOBS_FINISHED = Counter("aura_jobs_finished_total", "Jobs that reached a final state", labels=("status",))
+VAD_AUDIO_SECONDS = Counter(
+    "aura_vad_audio_seconds_total",
+    "Audio seconds of finished jobs seen by the VAD: 'speech' was decoded, 'skipped' was dropped",
+    labels=("kind",)
+)
+VAD_SAVED_SECONDS = Counter("aura_vad_saved_seconds_total", "Estimated decoding seconds saved by dropping non-speech")
+REPETITION_INTERVENTIONS = Counter(
+    "aura_repetition_interventions_total",
+    "Decoding loops caught by the repetition guard, by trigger and by whether the window was re-decoded or skipped",
+    labels=("reason", "action")
+)
+REPETITION_RETRY_SECONDS = Counter("aura_repetition_retry_seconds_total", "Seconds spent re-decoding looping windows")
+
+HISTOGRAMS = [PROBE_SECONDS, EXTRACT_SECONDS, MODEL_LOAD_SECONDS, TRANSCRIPTION_RTF, QUEUE_WAIT_SECONDS, WS_SEND_SECONDS,
+              BATCH_WINDOWS]
+COUNTERS = [JOBS_FINISHED, VAD_AUDIO_SECONDS, VAD_SAVED_SECONDS, REPETITION_INTERVENTIONS, REPETITION_RETRY_SECONDS]
+
+
+def render(gauge_lines: List[str]) -> str:
+    lines = list(gauge_lines)
+    for metric in HISTOGRAMS + COUNTERS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
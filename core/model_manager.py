@@ -2,119 +2,579 @@ import psutil
 import httpx
 import hashlib
 import asyncio
+import json
+import os
+import shutil
 import time
 import logging
-from typing import Dict, Any, Callable, Awaitable
+from typing import Dict, Any, Callable, Awaitable, Optional, List
 from pathlib import Path
 
-from config import MODEL_DIR, MODEL_SHA256, WHISPER_MODEL
+from config import (
+    MODEL_DIR, MODELS_DIR, MODEL_SHA256, WHISPER_MODEL, WHISPER_COMPUTE_TYPE,
+    MODEL_DOWNLOAD_CONNECTIONS, MODEL_DOWNLOAD_PART_MB, MODEL_DOWNLOAD_RETRIES,
+    MODEL_TIERS, MODEL_AUTO_SELECT, MODEL_TARGET_RTF, MODEL_RAM_HEADROOM_MB, MODEL_RAM_ESTIMATE_MB, AUTOTUNE_FILE,
+    MODEL_PREQUANTIZE
+)
+from core.quantizer import quantize_model_file
 
 logger = logging.getLogger(__name__)
 
-def check_ram_availability() -> Dict[str, Any]:
+MODEL_FILES = ["config.json", "tokenizer.json", "vocabulary.txt", "model.bin"]
+MANIFEST_NAME = "manifest.json"
+HASH_BLOCK_BYTES = 1_048_576
+
+def model_path(model: str) -> Path:
+    """Directory of one model size; sizes are installed side by side under MODELS_DIR."""
+    return MODELS_DIR / model
+
+def check_ram_availability(model: str = WHISPER_MODEL, compute_type: Optional[str] = None) -> Dict[str, Any]:
     """
     Checks if there is sufficient RAM available before starting transcription.
+    Uses the peak RSS autotune measured for this model (and compute type) when there is one,
+    otherwise the rough per-model estimate from config (model + FFmpeg + overhead).
     Returns dict with 'sufficient', 'available_gb', 'required_gb'.
     """
     available = psutil.virtual_memory().available
-    required  = 2_400_000_000   # 2.4 GB: model (2.2 GB) + FFmpeg + overhead
+    measured = [
+        r["peak_rss_bytes"] for r in load_autotune()
+        if r["model"] == model and (compute_type is None or r["compute_type"] == compute_type)
+    ]
+    if measured:
+        required = max(measured) + MODEL_RAM_HEADROOM_MB * 1_048_576
+    else:
+        required = MODEL_RAM_ESTIMATE_MB.get(model, 2400) * 1_048_576
     return {
         "sufficient":    available >= required,
         "available_gb":  round(available / 1e9, 1),
-        "required_gb":   2.4
+        "required_gb":   round(required / 1e9, 1)
     }
 
-async def download_model(progress_callback: Callable[[dict], Awaitable[None]] = None) -> bool:
+def _default_base_url(model: str) -> str:
+    return f"https://huggingface.co/Systran/faster-whisper-{model}/resolve/main"
+
+def _hash_range(path: Path, hasher, start: int, end: int) -> int:
+    """Feeds bytes [start, end) of path into hasher. Returns end."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(HASH_BLOCK_BYTES, remaining))
+            if not block:
+                raise IOError(f"{path} is shorter than expected")
+            hasher.update(block)
+            remaining -= len(block)
+    return end
+
+def _sha256_file(path: Path) -> str:
+    hasher = hashlib.sha256()
+    _hash_range(path, hasher, 0, path.stat().st_size)
+    return hasher.hexdigest()
+
+# ---------------------------------------------------------------------------
+# Verified manifest: size + mtime + SHA256 of every model file, written after a successful
+# verification so later startups only stat() the files instead of re-hashing 465 MB.
+# ---------------------------------------------------------------------------
+
+def _read_manifest_doc(model_dir: Path) -> Dict[str, Any]:
+    try:
+        doc = json.loads((model_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return doc if isinstance(doc, dict) else {}
+
+def _read_manifest(model_dir: Path) -> Dict[str, Any]:
+    return _read_manifest_doc(model_dir).get("files", {})
+
+def _write_manifest(model_dir: Path, files: Dict[str, Any], source: Optional[Dict[str, Any]] = None):
+    """source records what a derived model (the pre-quantized copy) was built from; kept across rewrites."""
+    doc = {"files": files}
+    source = source or _read_manifest_doc(model_dir).get("source")
+    if source:
+        doc["source"] = source
+    tmp = model_dir / (MANIFEST_NAME + ".tmp")
+    tmp.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+    os.replace(tmp, model_dir / MANIFEST_NAME)
+
+def _stamp(path: Path, sha256: str) -> Dict[str, Any]:
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256}
+
+def _stamp_matches(path: Path, stamp: Optional[Dict[str, Any]]) -> bool:
+    if not stamp:
+        return False
+    try:
+        st = path.stat()
+    except OSError:
+        return False
+    return st.st_size == stamp.get("size") and st.st_mtime_ns == stamp.get("mtime_ns")
+
+def verify_model(model_dir: Path = MODEL_DIR, expected_sha256: Optional[str] = None, full: bool = False) -> bool:
+    """
+    Checks every model file against the verified manifest. Files whose size and mtime still match their
+    stamp are trusted without hashing (unless full=True); anything else is hashed and compared with
+    expected_sha256 (model.bin, defaults to config.MODEL_SHA256 for the directory's model size) or the
+    previously recorded hash. The manifest is refreshed when all files check out.
+    """
+    if expected_sha256 is None:
+        expected_sha256 = MODEL_SHA256.get(model_dir.name)
+    manifest = _read_manifest(model_dir)
+    files = {}
+    changed = False
+    for filename in MODEL_FILES:
+        path = model_dir / filename
+        if not path.exists():
+            return False
+        stamp = manifest.get(filename)
+        if not full and _stamp_matches(path, stamp):
+            files[filename] = stamp
+            continue
+        digest = _sha256_file(path)
+        expected = expected_sha256 if filename == "model.bin" and expected_sha256 else (stamp or {}).get("sha256")
+        if expected and digest != expected:
+            logger.error(f"Model file {filename} failed verification (expected {expected}, got {digest})")
+            return False
+        files[filename] = _stamp(path, digest)
+        changed = True
+    if changed:
+        _write_manifest(model_dir, files)
+    return True
+
+def is_model_downloaded(model_dir: Path = MODEL_DIR) -> bool:
+    """Checks that the model is fully downloaded and intact (cheap once the manifest is written)."""
+    try:
+        return verify_model(model_dir)
+    except OSError as e:
+        logger.error(f"Could not verify model files: {e}")
+        return False
+
+def model_size_mb(model_dir: Path) -> Optional[float]:
+    """Disk space taken by the files of a model directory, None when it does not exist."""
+    if not model_dir.is_dir():
+        return None
+    return round(sum(p.stat().st_size for p in model_dir.iterdir() if p.is_file()) / 1_048_576, 1)
+
+def installed_models() -> List[str]:
+    """Model sizes from MODEL_TIERS that are fully downloaded, smallest first."""
+    return [model for model in MODEL_TIERS if is_model_downloaded(model_path(model))]
+
+# ---------------------------------------------------------------------------
+# Pre-quantized int8 copy (see core.quantizer), so int8 workers skip the conversion on every load
+# ---------------------------------------------------------------------------
+
+# CPU compute types whose weights CTranslate2 keeps as int8 (+ float32 for everything else)
+PREQUANTIZED_COMPUTE_TYPES = ("int8", "int8_float32")
+
+def quantized_model_path(model: str) -> Path:
+    return MODELS_DIR / f"{model}-int8"
+
+def is_quantized_model_ready(model: str, source_dir: Optional[Path] = None, target_dir: Optional[Path] = None) -> bool:
+    """The copy passes its own manifest and was built from the model.bin that is installed now."""
+    source_dir = source_dir or model_path(model)
+    target_dir = target_dir or quantized_model_path(model)
+    source_sha256 = _read_manifest(source_dir).get("model.bin", {}).get("sha256")
+    built_from = _read_manifest_doc(target_dir).get("source", {}).get("sha256")
+    return bool(source_sha256) and built_from == source_sha256 and verify_model(target_dir)
+
+def model_load_path(model: str, compute_type: str) -> Path:
+    """Directory the workers load: the pre-quantized copy when it fits the compute type and is intact."""
+    if MODEL_PREQUANTIZE and compute_type in PREQUANTIZED_COMPUTE_TYPES:
+        try:
+            if is_quantized_model_ready(model):
+                return quantized_model_path(model)
+        except OSError as e:
+            logger.warning(f"Could not verify the pre-quantized {model} model: {e}")
+    return model_path(model)
+
+def quantize_model(model: str = WHISPER_MODEL, source_dir: Optional[Path] = None, target_dir: Optional[Path] = None) -> bool:
     """
-    Downloads the faster-whisper model from Hugging Face with progress reporting.
-    Verifies SHA256 checksum on completion.
+    Builds the int8 copy of a downloaded model once (a no-op when it is already up to date).
+    The copy is assembled next to its final location and renamed into place with its manifest, so an
+    interrupted build never leaves a directory that looks usable. Returns whether the copy is ready.
     """
-    MODEL_DIR.mkdir(parents=True, exist_ok=True)
-    
-    base_url = f"https://huggingface.co/Systran/faster-whisper-{WHISPER_MODEL}/resolve/main"
-    files_to_download = [
-        "config.json",
-        "tokenizer.json",
-        "vocabulary.txt",
-        "model.bin"
+    source_dir = source_dir or model_path(model)
+    target_dir = target_dir or quantized_model_path(model)
+    if not is_model_downloaded(source_dir):
+        return False
+    if is_quantized_model_ready(model, source_dir, target_dir):
+        return True
+
+    tmp = target_dir.with_name(target_dir.name + ".tmp")
+    try:
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        start = time.perf_counter()
+        for filename in MODEL_FILES:
+            if filename != "model.bin":
+                shutil.copy2(source_dir / filename, tmp / filename)
+        stats = quantize_model_file(source_dir / "model.bin", tmp / "model.bin")
+        files = {filename: _stamp(tmp / filename, _sha256_file(tmp / filename)) for filename in MODEL_FILES}
+        _write_manifest(tmp, files, source={
+            "model": model,
+            "sha256": _read_manifest(source_dir)["model.bin"]["sha256"],
+            "quantization": "int8"
+        })
+        shutil.rmtree(target_dir, ignore_errors=True)
+        os.replace(tmp, target_dir)
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"Could not build the pre-quantized {model} model: {e}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        return False
+    logger.info(
+        f"Pre-quantized {model} model built in {time.perf_counter() - start:.1f}s "
+        f"({stats['quantized']} weights to int8, {(target_dir / 'model.bin').stat().st_size / 1_048_576:.0f} MB)"
+    )
+    return True
+
+# ---------------------------------------------------------------------------
+# Configuration selection from autotune measurements (see core.autotune)
+# ---------------------------------------------------------------------------
+
+def _machine() -> Dict[str, Any]:
+    return {"cpu_count": psutil.cpu_count(), "total_ram_mb": psutil.virtual_memory().total // 1_048_576}
+
+def load_autotune() -> List[Dict[str, Any]]:
+    """Autotune measurements for this machine ([] if never run, or run on different hardware)."""
+    try:
+        saved = json.loads(AUTOTUNE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    if saved.get("machine") != _machine():
+        return []
+    return saved.get("results", [])
+
+def save_autotune(results: List[Dict[str, Any]], clip_seconds: float):
+    AUTOTUNE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    AUTOTUNE_FILE.write_text(json.dumps({
+        "machine": _machine(),
+        "clip_seconds": clip_seconds,
+        "measured_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results
+    }, indent=2), encoding="utf-8")
+
+def select_model_config(workers: int = 1, cpu_threads: int = 0) -> Dict[str, Any]:
+    """
+    Picks the model size, compute type and thread count the workers should run.
+    Among measured configurations of installed models whose peak RSS (times `workers`) fits in free
+    memory, the largest model reaching MODEL_TARGET_RTF wins, in its fastest compute type / thread
+    count; if none reaches the target, simply the fastest one that fits. cpu_threads fixes the thread
+    count (the pool has already divided the cores); 0 lets the measurements decide.
+    Falls back to WHISPER_MODEL / WHISPER_COMPUTE_TYPE without (usable) measurements.
+    """
+    default = {"model": WHISPER_MODEL, "compute_type": WHISPER_COMPUTE_TYPE, "cpu_threads": cpu_threads, "source": "config"}
+    if not MODEL_AUTO_SELECT:
+        return default
+    installed = set(installed_models())
+    available = psutil.virtual_memory().available - MODEL_RAM_HEADROOM_MB * 1_048_576
+    fits = [
+        r for r in load_autotune()
+        if r["model"] in installed and r.get("realtime_factor") and r["peak_rss_bytes"] * workers <= available
     ]
-    
+    if cpu_threads:
+        # Measurements at the pool's thread count if there are any, otherwise the closest ones
+        closest = min((abs(r["cpu_threads"] - cpu_threads) for r in fits), default=0)
+        fits = [r for r in fits if abs(r["cpu_threads"] - cpu_threads) == closest]
+    if not fits:
+        if installed and WHISPER_MODEL not in installed:
+            default["model"] = max(installed, key=MODEL_TIERS.index)
+        return default
+
+    meeting = [r for r in fits if r["realtime_factor"] >= MODEL_TARGET_RTF]
+    if meeting:
+        largest = max(MODEL_TIERS.index(r["model"]) for r in meeting)
+        best = max((r for r in meeting if MODEL_TIERS.index(r["model"]) == largest), key=lambda r: r["realtime_factor"])
+    else:
+        best = max(fits, key=lambda r: r["realtime_factor"])
+    return {
+        "model": best["model"],
+        "compute_type": best["compute_type"],
+        "cpu_threads": cpu_threads or best["cpu_threads"],
+        "source": "autotune",
+        "realtime_factor": best["realtime_factor"],
+        "peak_rss_bytes": best["peak_rss_bytes"]
+    }
+
+# ---------------------------------------------------------------------------
+# Resumable, parallel download
+# ---------------------------------------------------------------------------
+
+class _RangeState:
+    """
+    Bytes written so far for each fixed-size part of a .part file, saved next to it as JSON.
+    Only ever saved after the bytes it claims were written, so resuming never skips data.
+    """
+
+    def __init__(self, path: Path, size: int, etag: Optional[str], part_size: int):
+        self.path = path
+        self.size = size
+        self.etag = etag
+        self.part_size = part_size
+        self.done: Dict[int, int] = {}
+
+    @classmethod
+    def load(cls, path: Path, size: int, etag: Optional[str], part_size: int) -> "_RangeState":
+        state = cls(path, size, etag, part_size)
+        try:
+            saved = json.loads(path.read_text(encoding="utf-8"))
+            if (saved["size"], saved["etag"], saved["part_size"]) == (size, etag, part_size):
+                state.done = {int(i): n for i, n in saved["done"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return state
+
+    def save(self):
+        self.path.write_text(json.dumps({
+            "size": self.size, "etag": self.etag, "part_size": self.part_size, "done": self.done
+        }), encoding="utf-8")
+
+    @property
+    def parts(self) -> int:
+        return -(-self.size // self.part_size)
+
+    def bounds(self, part: int) -> tuple:
+        start = part * self.part_size
+        return start, min(self.size, start + self.part_size)
+
+    def remaining(self, part: int) -> int:
+        start, end = self.bounds(part)
+        return end - start - self.done.get(part, 0)
+
+    @property
+    def downloaded(self) -> int:
+        return sum(self.done.values())
+
+    def contiguous_end(self) -> int:
+        """
+        End of the prefix of the file made of complete parts. A part still downloading is never
+        included, even the bytes it already wrote: another connection may be writing them.
+        """
+        end = 0
+        for part in range(self.parts):
+            if self.remaining(part) > 0:
+                break
+            end = self.bounds(part)[1]
+        return end
+
+
+async def _download_ranged(client: httpx.AsyncClient, url: str, part_path: Path, size: int, etag: Optional[str],
+                           connections: int, part_size: int, on_bytes: Callable[..., Awaitable[None]]) -> str:
+    """
+    Fetches url into part_path with up to `connections` concurrent Range requests, continuing whatever
+    a previous attempt left behind. The SHA256 is computed over the file's completed prefix as it grows,
+    so little hashing is left once the last part lands. Returns the hex digest.
+    """
+    state = _RangeState.load(part_path.with_name(part_path.name + ".json"), size, etag, part_size)
+    if not part_path.exists() or part_path.stat().st_size != size or not state.done:
+        state.done = {}
+        with open(part_path, "wb") as f:
+            f.truncate(size)
+    elif state.downloaded:
+        logger.info(f"Resuming model download at {state.downloaded / 1_048_576:.0f} of {size / 1_048_576:.0f} MB")
+    await on_bytes(state.downloaded, resumed=True)
+
+    hasher = hashlib.sha256()
+    hashed = 0
+    hash_lock = asyncio.Lock()
+
+    async def advance_hash():
+        nonlocal hashed
+        async with hash_lock:
+            end = state.contiguous_end()
+            if end > hashed:
+                hashed = await asyncio.to_thread(_hash_range, part_path, hasher, hashed, end)
+
+    async def fetch(part: int):
+        start, end = state.bounds(part)
+        for attempt in range(MODEL_DOWNLOAD_RETRIES + 1):
+            offset = start + state.done.get(part, 0)
+            if offset >= end:
+                return
+            try:
+                headers = {"Range": f"bytes={offset}-{end - 1}"}
+                async with client.stream("GET", url, headers=headers) as response:
+                    if response.status_code != 206:
+                        raise httpx.HTTPStatusError(
+                            f"Expected 206 for a range request, got {response.status_code}",
+                            request=response.request, response=response
+                        )
+                    with open(part_path, "r+b") as f:
+                        f.seek(offset)
+                        # As the bytes arrive: a fixed chunk_size holds back a partial chunk, which a
+                        # dropped connection would then lose
+                        async for chunk in response.aiter_bytes():
+                            chunk = chunk[:end - offset]
+                            f.write(chunk)
+                            # On disk before `done` claims it: the hasher reads the file through its own handle
+                            f.flush()
+                            offset += len(chunk)
+                            state.done[part] = offset - start
+                            await on_bytes(len(chunk))
+                if offset >= end:
+                    return
+                raise httpx.RemoteProtocolError(f"connection closed {end - offset} bytes before the end of the range")
+            except httpx.TransportError as e:
+                if attempt == MODEL_DOWNLOAD_RETRIES:
+                    raise
+                logger.warning(f"Model download part {part} interrupted ({e}), retrying from byte {offset}")
+                await asyncio.sleep(min(2 ** attempt, 10))
+
+    pending = [part for part in range(state.parts) if state.remaining(part) > 0]
+
+    async def connection():
+        while pending:
+            part = pending.pop(0)
+            await fetch(part)
+            state.save()
+            await advance_hash()
+
+    tasks = [asyncio.ensure_future(connection()) for _ in range(max(1, connections))]
     try:
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            for filename in files_to_download:
+        await asyncio.gather(*tasks)
+    finally:
+        # One failed connection stops the others; what made it to disk is kept for the next attempt
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        state.save()
+
+    await advance_hash()
+    if hashed != size:
+        raise IOError(f"Download incomplete: {hashed} of {size} bytes")
+    state.path.unlink(missing_ok=True)
+    return hasher.hexdigest()
+
+
+async def _download_stream(client: httpx.AsyncClient, url: str, part_path: Path,
+                           on_bytes: Callable[[int], Awaitable[None]]) -> str:
+    """Single-stream fallback for servers without Range support (cannot resume)."""
+    hasher = hashlib.sha256()
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        with open(part_path, "wb") as f:
+            async for chunk in response.aiter_bytes(chunk_size=65536):
+                f.write(chunk)
+                hasher.update(chunk)
+                await on_bytes(len(chunk))
+    return hasher.hexdigest()
+
+
+async def _probe_size(client: httpx.AsyncClient, url: str) -> tuple:
+    """Returns (size, etag, supports_ranges) using a one-byte range request (HEAD is not reliable behind CDN redirects)."""
+    async with client.stream("GET", url, headers={"Range": "bytes=0-0"}) as response:
+        response.raise_for_status()
+        etag = response.headers.get("etag")
+        content_range = response.headers.get("content-range", "")
+        if response.status_code == 206 and "/" in content_range and not content_range.endswith("/*"):
+            return int(content_range.rsplit("/", 1)[1]), etag, True
+        return int(response.headers.get("content-length", 0)), etag, False
+
+
+async def download_model(
+    progress_callback: Callable[[dict], Awaitable[None]] = None,
+    model: str = WHISPER_MODEL,
+    base_url: Optional[str] = None,
+    model_dir: Optional[Path] = None,
+    expected_sha256: Optional[str] = None,
+    connections: int = MODEL_DOWNLOAD_CONNECTIONS,
+    part_size: int = MODEL_DOWNLOAD_PART_MB * 1_048_576
+) -> bool:
+    """
+    Downloads one faster-whisper model size into its own directory under MODELS_DIR (from Hugging Face
+    unless base_url points elsewhere, e.g. a local test server) with progress reporting. model.bin is fetched in parallel byte ranges into
+    model.bin.part and resumes after an interruption or restart; it is only renamed into place once
+    its SHA256 matches (expected_sha256 defaults to config.MODEL_SHA256). Files that already pass
+    verification are not downloaded again. Ends by writing the verified manifest.
+    """
+    model_dir = model_dir or model_path(model)
+    model_dir.mkdir(parents=True, exist_ok=True)
+    base_url = (base_url or _default_base_url(model)).rstrip("/")
+    if expected_sha256 is None:
+        expected_sha256 = MODEL_SHA256.get(model)
+    manifest = _read_manifest(model_dir)
+    files: Dict[str, Any] = {}
+
+    try:
+        async with httpx.AsyncClient(follow_redirects=True, timeout=httpx.Timeout(30.0)) as client:
+            for filename in MODEL_FILES:
                 url = f"{base_url}/{filename}"
-                filepath = MODEL_DIR / filename
-                
-                if filename == "model.bin":
-                    # Remove existing if incomplete
-                    if filepath.exists():
-                        filepath.unlink()
-                        
-                    async with client.stream("GET", url) as response:
-                        response.raise_for_status()
-                        total_bytes = int(response.headers.get("Content-Length", 465000000))
-                        downloaded_bytes = 0
-                        start_time = time.time()
-                        last_emit_time = 0.0
-                        
-                        hasher = hashlib.sha256()
-                        
-                        with open(filepath, "wb") as f:
-                            async for chunk in response.aiter_bytes(chunk_size=65536):
-                                f.write(chunk)
-                                hasher.update(chunk)
-                                downloaded_bytes += len(chunk)
-                                
-                                current_time = time.time()
-                                # Throttle progress events to ~10 per second
-                                if progress_callback and (current_time - last_emit_time > 0.1):
-                                    elapsed = current_time - start_time
-                                    speed = downloaded_bytes / elapsed if elapsed > 0 else 0
-                                    remaining_bytes = max(0, total_bytes - downloaded_bytes)
-                                    estimated_remaining = remaining_bytes / speed if speed > 0 else 0
-                                    
-                                    await progress_callback({
-                                        "event": "model_download",
-                                        "bytes_downloaded": downloaded_bytes,
-                                        "bytes_total": total_bytes,
-                                        "percent": round((downloaded_bytes / total_bytes) * 100, 1) if total_bytes > 0 else 0.0,
-                                        "speed_mbps": round(speed / 1_048_576, 1),  # MB/s
-                                        "estimated_remaining_seconds": int(estimated_remaining)
-                                    })
-                                    last_emit_time = current_time
-                                    
-                        # Emit final 100% for this file just in case it was skipped by throttle
-                        if progress_callback and filename == "model.bin":
-                            await progress_callback({
-                                "event": "model_download",
-                                "bytes_downloaded": total_bytes,
-                                "bytes_total": total_bytes,
-                                "percent": 100.0,
-                                "speed_mbps": 0.0,
-                                "estimated_remaining_seconds": 0
-                            })
-                        
-                        # Verify SHA256
-                        downloaded_hash = hasher.hexdigest()
-                        expected_hash = MODEL_SHA256.get(WHISPER_MODEL)
-                        if expected_hash and downloaded_hash != expected_hash:
-                            logger.error(f"SHA256 mismatch for {filename}. Expected {expected_hash}, got {downloaded_hash}")
-                            filepath.unlink()
-                            return False
-                else:
-                    if not filepath.exists():
+                filepath = model_dir / filename
+
+                if filename != "model.bin":
+                    if not _stamp_matches(filepath, manifest.get(filename)):
                         resp = await client.get(url)
                         resp.raise_for_status()
                         with open(filepath, "wb") as f:
                             f.write(resp.content)
-                            
+                        manifest[filename] = _stamp(filepath, hashlib.sha256(resp.content).hexdigest())
+                    files[filename] = manifest[filename]
+                    continue
+
+                if filepath.exists():
+                    digest = manifest.get(filename, {}).get("sha256") if _stamp_matches(filepath, manifest.get(filename)) \
+                        else await asyncio.to_thread(_sha256_file, filepath)
+                    if not expected_sha256 or digest == expected_sha256:
+                        files[filename] = _stamp(filepath, digest)
+                        continue
+                    logger.warning(f"Existing {filename} failed verification, downloading it again")
+                    filepath.unlink()
+
+                size, etag, ranged = await _probe_size(client, url)
+                downloaded_bytes = 0
+                session_bytes = 0
+                start_time = time.time()
+                last_emit_time = 0.0
+
+                async def on_bytes(n: int, resumed: bool = False):
+                    nonlocal downloaded_bytes, session_bytes, last_emit_time
+                    downloaded_bytes += n
+                    if not resumed:
+                        # Bytes already on disk from an earlier attempt do not count towards the speed
+                        session_bytes += n
+                    current_time = time.time()
+                    # Throttle progress events to ~10 per second
+                    if progress_callback and (current_time - last_emit_time > 0.1):
+                        elapsed = current_time - start_time
+                        speed = session_bytes / elapsed if elapsed > 0 else 0
+                        remaining_bytes = max(0, size - downloaded_bytes)
+                        estimated_remaining = remaining_bytes / speed if speed > 0 else 0
+
+                        await progress_callback({
+                            "event": "model_download",
+                            "bytes_downloaded": downloaded_bytes,
+                            "bytes_total": size,
+                            "percent": round((downloaded_bytes / size) * 100, 1) if size > 0 else 0.0,
+                            "speed_mbps": round(speed / 1_048_576, 1),  # MB/s
+                            "estimated_remaining_seconds": int(estimated_remaining)
+                        })
+                        last_emit_time = current_time
+
+                part_path = filepath.with_name(filename + ".part")
+                if ranged and size > 0:
+                    digest = await _download_ranged(client, url, part_path, size, etag, connections, part_size, on_bytes)
+                else:
+                    logger.info("Server does not support range requests, downloading model.bin as a single stream")
+                    digest = await _download_stream(client, url, part_path, on_bytes)
+
+                # Emit final 100% just in case it was skipped by throttle
+                if progress_callback:
+                    await progress_callback({
+                        "event": "model_download",
+                        "bytes_downloaded": size,
+                        "bytes_total": size,
+                        "percent": 100.0,
+                        "speed_mbps": 0.0,
+                        "estimated_remaining_seconds": 0
+                    })
+
+                if expected_sha256 and digest != expected_sha256:
+                    logger.error(f"SHA256 mismatch for {filename}. Expected {expected_sha256}, got {digest}")
+                    part_path.unlink(missing_ok=True)
+                    return False
+                os.replace(part_path, filepath)
+                files[filename] = _stamp(filepath, digest)
+
+        _write_manifest(model_dir, files)
         return True
     except Exception as e:
         logger.error(f"Error downloading model: {e}")
         return False
-
-def is_model_downloaded() -> bool:
-    """Checks if the Whisper model is present and apparently downloaded."""
-    return (MODEL_DIR / "model.bin").exists() and \
-           (MODEL_DIR / "config.json").exists() and \
-           (MODEL_DIR / "vocabulary.txt").exists()
@@ -0,0 +1,97 @@
+"""
+Opt-in span tracing (config.PROFILING / AURA_PROFILE=1), exported per job in the Chrome trace
+event format (load the JSON in chrome://tracing or https://ui.perfetto.dev).
+
+All spans use time.perf_counter(), which is a system-wide monotonic clock on Windows (QPC),
+Linux (CLOCK_MONOTONIC) and macOS, so spans recorded inside the worker processes line up with
+the server's without any offset correction.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class Trace:
+    """
+    Spans of one job (server side) or of one worker run. When disabled every call is a no-op,
+    so call sites do not need to check the flag themselves.
+    Spans are grouped into named lanes (one Chrome "thread" each) because a job's stages overlap:
+    the probe runs alongside admission, and the chunks of a long file run in parallel.
+    """
+
+    def __init__(self, enabled: bool = True, lane: str = "pipeline"):
+        self.enabled = enabled
+        self.lane = lane
+        self.events: List[Dict[str, Any]] = []
+
+    def add_span(self, name: str, start: float, end: float, lane: Optional[str] = None, **args):
+        """Records a finished span; start/end are time.perf_counter() values."""
+        if not self.enabled:
+            return
+        self.events.append({
+            "name": name,
+            "ph": "X",
+            "ts": round(start * 1e6, 1),
+            "dur": round(max(0.0, end - start) * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": lane or self.lane,
+            "args": args
+        })
+
+    def span(self, name: str, lane: Optional[str] = None, **args):
+        return self._span(name, lane, args) if self.enabled else nullcontext()
+
+    @contextmanager
+    def _span(self, name: str, lane: Optional[str], args: Dict[str, Any]):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.perf_counter(), lane, **args)
+
+    def extend(self, events: List[Dict[str, Any]]):
+        """Merges spans recorded in another process (already on the same clock)."""
+        if self.enabled and events:
+            self.events.extend(events)
+
+    def to_chrome(self, title: str = "") -> Dict[str, Any]:
+        """Chrome trace JSON object. Lane names become numbered threads with thread_name metadata."""
+        server_pid = os.getpid()
+        tids: Dict[tuple, int] = {}
+        events = []
+        for event in self.events:
+            key = (event["pid"], event["tid"])
+            if key not in tids:
+                tids[key] = len(tids) + 1
+            events.append({**event, "tid": tids[key]})
+
+        metadata = []
+        for pid in sorted({pid for pid, _ in tids}):
+            name = f"server {title}".strip() if pid == server_pid else f"worker (PID {pid})"
+            metadata.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": name}})
+            metadata.append({"name": "process_sort_index", "ph": "M", "pid": pid, "tid": 0,
+                             "args": {"sort_index": 0 if pid == server_pid else pid}})
+        for (pid, lane), tid in tids.items():
+            metadata.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": lane}})
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def save(self, path: Path, title: str = ""):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_chrome(title)), encoding="utf-8")
+
+
+@contextmanager
+def cprofile_to(path: Path):
+    """Runs the block under cProfile and dumps the stats to path (open with pstats or snakeviz)."""
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(path))
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from multiprocessing.connection import Connection, wait
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressSender:
+    """Worker-side end of the progress channel. Keeps the put() interface of the queue it replaces."""
+
+    def __init__(self, conn: Connection):
+        self._conn = conn
+
+    def put(self, msg: dict):
+        self._conn.send(msg)
+
+
+class ProgressChannel:
+    """
+    Progress transport from worker processes to the event loop.
+    Every worker writes to its own one-way Pipe; a single reader thread blocks in
+    multiprocessing.connection.wait() on all of them at once and hands each message
+    to the loop the moment it arrives. No polling interval and no Manager round-trip.
+    Works with Windows pipe handles as well as POSIX fds.
+    """
+
+    def __init__(self):
+        self._readers: List[Connection] = []
+        # Writing to this pipe wakes the reader thread up so it can exit
+        self._wake_r, self._wake_w = multiprocessing.Pipe(duplex=False)
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def new_sender(self) -> Connection:
+        """
+        Creates the channel for one worker and returns its write end. The same Connection can be
+        handed to every process that worker respawns. Must be called before start().
+        """
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        self._readers.append(reader)
+        return writer
+
+    def start(self, loop: asyncio.AbstractEventLoop, handler: Callable[[dict], None]):
+        """Starts delivering messages; handler is invoked on the loop thread for each one."""
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, args=(loop, handler), name="ProgressChannel", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wake_w.send(None)
+        self._thread.join(timeout=2)
+        self._thread = None
+
+    def _run(self, loop: asyncio.AbstractEventLoop, handler: Callable[[dict], None]):
+        readers = list(self._readers)
+        while not self._stopping:
+            for conn in wait(readers + [self._wake_r]):
+                if conn is self._wake_r:
+                    conn.recv()
+                    continue
+                try:
+                    msg = conn.recv()
+                except (EOFError, OSError):
+                    readers.remove(conn)
+                    continue
+                try:
+                    loop.call_soon_threadsafe(handler, msg)
+                except RuntimeError:
+                    # Event loop already closed: nothing left to deliver to
+                    return
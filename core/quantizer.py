@@ -0,0 +1,143 @@
+"""
+Offline int8 quantization of a CTranslate2 model.bin, so a worker loading with compute_type="int8"
+reads weights that are already int8 instead of converting every float matrix on each cold start.
+
+The output is exactly what CTranslate2 builds in memory when it converts at load time: every 2D
+weight matrix outside the convolutions becomes int8 with a float32 per-row "<name>_scale"
+(scale = 127 / max|row|, value = round(weight * scale)), and every other float variable is stored as
+float32, so nothing is left to convert when it loads.
+Works variable by variable on a memory-mapped input, so peak memory stays around one matrix.
+"""
+import mmap
+import struct
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+# Order of the DataType enum in CTranslate2's include/ctranslate2/types.h
+DTYPES = ["float32", "int8", "int16", "int32", "float16", "bfloat16"]
+FLOAT_TYPES = {"float32", "float16", "bfloat16"}
+# Binary version 4 introduced the dtype id + byte count layout read below
+MIN_BINARY_VERSION = 4
+
+
+class _Reader:
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.offset = 0
+
+    def unpack(self, fmt: str):
+        values = struct.unpack_from(fmt, self.buffer, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return values[0] if len(values) == 1 else values
+
+    def string(self) -> str:
+        length = self.unpack("H")
+        value = bytes(self.buffer[self.offset:self.offset + length - 1]).decode("utf-8")
+        self.offset += length
+        return value
+
+    def view(self, num_bytes: int) -> memoryview:
+        value = memoryview(self.buffer)[self.offset:self.offset + num_bytes]
+        self.offset += num_bytes
+        return value
+
+
+def _to_float32(data: memoryview, dtype: str, shape: Tuple[int, ...]) -> np.ndarray:
+    if dtype == "bfloat16":
+        # numpy has no bfloat16: it is the top half of a float32
+        raw = np.frombuffer(data, dtype=np.uint16).astype(np.uint32) << 16
+        return raw.view(np.float32).reshape(shape)
+    return np.frombuffer(data, dtype=dtype).reshape(shape).astype(np.float32)
+
+
+def read_variables(buffer) -> Tuple[Dict[str, Any], Iterator[Tuple[str, str, Tuple[int, ...], memoryview]], List[Tuple[str, str]]]:
+    """
+    Parses a model.bin held in `buffer`. Returns the header ({"version", "spec", "revision"}),
+    a lazy iterator of (name, dtype, shape, raw bytes) and, once that is exhausted, the alias list is filled.
+    """
+    reader = _Reader(buffer)
+    version = reader.unpack("I")
+    if version < MIN_BINARY_VERSION:
+        raise ValueError(f"Unsupported CTranslate2 binary version {version}")
+    header = {"version": version, "spec": reader.string(), "revision": reader.unpack("I")}
+    aliases: List[Tuple[str, str]] = []
+
+    def variables():
+        for _ in range(reader.unpack("I")):
+            name = reader.string()
+            shape = tuple(reader.unpack("I") for _ in range(reader.unpack("B")))
+            dtype = DTYPES[reader.unpack("B")]
+            yield name, dtype, shape, reader.view(reader.unpack("I"))
+        for _ in range(reader.unpack("I")):
+            aliases.append((reader.string(), reader.string()))
+
+    return header, variables(), aliases
+
+
+def _write_string(out: BinaryIO, value: str):
+    encoded = value.encode("utf-8")
+    out.write(struct.pack("H", len(encoded) + 1))
+    out.write(encoded + b"\0")
+
+
+def _write_variable(out: BinaryIO, name: str, value: np.ndarray):
+    _write_string(out, name)
+    out.write(struct.pack("B", value.ndim))
+    for dim in value.shape:
+        out.write(struct.pack("I", dim))
+    out.write(struct.pack("B", DTYPES.index(value.dtype.name)))
+    out.write(struct.pack("I", value.nbytes))
+    out.write(np.ascontiguousarray(value).tobytes())
+
+
+def is_quantizable(name: str, shape: Tuple[int, ...]) -> bool:
+    """Same rule as CTranslate2's Whisper loader: weight matrices, except the convolutions."""
+    return name.endswith("weight") and "conv" not in name and len(shape) == 2
+
+
+def quantize_int8(weight: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    amax = np.amax(np.absolute(weight), axis=1)
+    amax[amax == 0] = 127.0
+    scale = (127.0 / amax).astype(np.float32)
+    return np.rint(weight * scale[:, None]).astype(np.int8), scale
+
+
+def quantize_model_file(source: Path, target: Path) -> Dict[str, int]:
+    """
+    Writes an int8 copy of the model.bin at `source` to `target`.
+    Returns counts of quantized / converted / copied variables (for the log).
+    """
+    stats = {"quantized": 0, "converted": 0, "copied": 0}
+    with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        header, variables, aliases = read_variables(buffer)
+        # The variable count goes in front, and scales are extra variables: collect the plan first
+        plan = list(variables)
+        count = len(plan) + sum(1 for name, dtype, shape, _ in plan if dtype in FLOAT_TYPES and is_quantizable(name, shape))
+
+        with open(target, "wb") as out:
+            out.write(struct.pack("I", header["version"]))
+            _write_string(out, header["spec"])
+            out.write(struct.pack("I", header["revision"]))
+            out.write(struct.pack("I", count))
+            for name, dtype, shape, data in plan:
+                if dtype in FLOAT_TYPES and is_quantizable(name, shape):
+                    weight, scale = quantize_int8(_to_float32(data, dtype, shape))
+                    _write_variable(out, name, weight)
+                    _write_variable(out, f"{name}_scale", scale)
+                    stats["quantized"] += 1
+                elif dtype in FLOAT_TYPES and dtype != "float32":
+                    _write_variable(out, name, _to_float32(data, dtype, shape))
+                    stats["converted"] += 1
+                else:
+                    _write_variable(out, name, np.frombuffer(data, dtype=dtype).reshape(shape))
+                    stats["copied"] += 1
+            out.write(struct.pack("I", len(aliases)))
+            for alias, name in aliases:
+                _write_string(out, alias)
+                _write_string(out, name)
+        # Release the views into the map before it closes
+        for *_, data in plan:
+            data.release()
+    return stats
@@ -0,0 +1,64 @@
+import re
+import zlib
+from collections import deque
+from typing import List, Optional
+
+from config import (
+    REPETITION_MAX_PHRASE_WORDS, REPETITION_MAX_REPEATS, REPETITION_MIN_LOOP_WORDS, REPETITION_HISTORY_WORDS,
+    REPETITION_MAX_COMPRESSION
+)
+
+_WORD = re.compile(r"\w+")
+
+
+def compression_ratio(text: str) -> float:
+    """Same measure as Whisper's fallback rule: looping text compresses far better than speech."""
+    data = text.encode("utf-8")
+    return len(data) / len(zlib.compress(data)) if data else 0.0
+
+
+class RepetitionDetector:
+    """
+    Watches the stream of decoded segments for the repetition loops Whisper sometimes falls into.
+    check() returns why a segment looks like one ("repeats": the recent text ends up holding one phrase
+    of up to max_phrase_words words max_repeats times back to back, min_loop_words words at least;
+    "compression": the segment's text compresses beyond max_compression), or None. Only back-to-back
+    copies count: a phrase that comes back with other words in between is how people talk.
+    A segment that trips the detector is not added to the history.
+    """
+
+    def __init__(self, max_phrase_words: int = REPETITION_MAX_PHRASE_WORDS, max_repeats: int = REPETITION_MAX_REPEATS,
+                 min_loop_words: int = REPETITION_MIN_LOOP_WORDS, history_words: int = REPETITION_HISTORY_WORDS,
+                 max_compression: float = REPETITION_MAX_COMPRESSION):
+        self.max_phrase_words = max_phrase_words
+        self.max_repeats = max_repeats
+        self.min_loop_words = min_loop_words
+        self.max_compression = max_compression
+        self._words: deque = deque(maxlen=history_words)
+
+    def check(self, text: str) -> Optional[str]:
+        if compression_ratio(text) > self.max_compression:
+            return "compression"
+        words = list(self._words) + [w.lower() for w in _WORD.findall(text)]
+        if self._loops(words, len(self._words)):
+            return "repeats"
+        self._words.extend(words[len(self._words):])
+        return None
+
+    def _loops(self, words: List[str], new_from: int) -> bool:
+        """
+        Whether words hold a loop reaching into words[new_from:] (the history before it was checked already).
+        A phrase of p words repeated back to back is a stretch where every word equals the one p places on.
+        """
+        for period in range(1, self.max_phrase_words + 1):
+            # Consecutive matches needed: all copies but the first
+            needed = max(period * self.max_repeats, self.min_loop_words) - period
+            run = 0
+            for i in range(max(0, new_from - period - needed), len(words) - period):
+                run = run + 1 if words[i] == words[i + period] else 0
+                if run >= needed:
+                    return True
+        return False
+
+    def reset(self):
+        self._words.clear()
@@ -0,0 +1,93 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Callable, List, Tuple
+
+from schemas.models import Job
+from config import SCHEDULER_POLICY, SCHEDULER_SJF_AGING
+
+# fifo:     submission order
+# shortest: shortest probed duration first, aged so long files are never starved
+# fair:     round-robin between batches (uploads), submission order within a batch
+POLICIES = ("fifo", "shortest", "fair")
+
+# Served-job counters kept for this many recent batches
+_MAX_TRACKED_BATCHES = 1024
+
+
+class JobScheduler:
+    """
+    Waiting room in front of the extraction stage. Keeps the put_nowait()/get() interface of the
+    asyncio.Queue it replaces, but get() hands out the best job under the active policy.
+    Keys are evaluated when a job is taken, not when it is queued, so priority changes and
+    durations probed while a job waits reorder the queue without any extra bookkeeping.
+    An explicit job.priority always outranks the policy (higher runs first).
+    """
+
+    def __init__(self, policy: str = SCHEDULER_POLICY, aging: float = SCHEDULER_SJF_AGING,
+                 clock: Callable[[], float] = time.time):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scheduling policy '{policy}' (expected one of {', '.join(POLICIES)})")
+        self.policy = policy
+        self.aging = aging
+        self.clock = clock
+        self._waiting: List[Job] = []
+        self._served: OrderedDict[str, int] = OrderedDict()
+        self._not_empty = asyncio.Event()
+
+    @property
+    def needs_duration(self) -> bool:
+        """Whether jobs should be probed before they are queued for this policy to order them."""
+        return self.policy == "shortest"
+
+    def qsize(self) -> int:
+        return len(self._waiting)
+
+    def _batch(self, job: Job) -> str:
+        return job.batch_id or job.id
+
+    def _key(self, job: Job, now: float) -> Tuple:
+        if self.policy == "shortest":
+            # Unknown durations sort last; waiting earns credit so a long file eventually gets its turn
+            duration = job.duration_seconds if job.duration_seconds else float("inf")
+            policy_key = (duration - self.aging * (now - job.created_at), job.created_at)
+        elif self.policy == "fair":
+            policy_key = (self._served.get(self._batch(job), 0), job.created_at)
+        else:
+            policy_key = (job.created_at,)
+        return (-job.priority,) + policy_key
+
+    def put_nowait(self, job: Job):
+        self._waiting.append(job)
+        self._not_empty.set()
+
+    def remove(self, job: Job) -> bool:
+        """Takes a job out of the waiting room (e.g. cancelled before dispatch). False if it was not waiting."""
+        if job in self._waiting:
+            self._waiting.remove(job)
+            return True
+        return False
+
+    def pop_next(self) -> Job:
+        """Removes and returns the job that should run next. The queue must not be empty."""
+        now = self.clock()
+        job = min(self._waiting, key=lambda j: self._key(j, now))
+        self._waiting.remove(job)
+
+        batch = self._batch(job)
+        self._served[batch] = self._served.get(batch, 0) + 1
+        self._served.move_to_end(batch)
+        while len(self._served) > _MAX_TRACKED_BATCHES:
+            self._served.popitem(last=False)
+        return job
+
+    async def get(self) -> Job:
+        while not self._waiting:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self.pop_next()
+
+    def ordered(self) -> List[Job]:
+        """Waiting jobs in the order they would be dispatched right now (ignoring fair-share updates)."""
+        now = self.clock()
+        return sorted(self._waiting, key=lambda j: self._key(j, now))
@@ -0,0 +1,232 @@
+import bisect
+import logging
+import wave
+from pathlib import Path
+from typing import List, Tuple, Dict, Any, Optional
+
+import numpy as np
+
+from core.media_processor import SAMPLE_RATE
+from config import VAD_MIN_SILENCE_MS, VAD_SPEECH_PAD_MS, VAD_ENERGY_MARGIN_DB
+
+logger = logging.getLogger(__name__)
+
+# Whisper's input length: audio is decoded in windows of at most this many seconds
+WINDOW_SECONDS = 30.0
+# Energy frames used to look for silence
+FRAME_SECONDS = 0.05
+# Minimum pause we try to cut inside, so cuts don't land between two words
+MIN_SILENCE_SECONDS = 0.4
+# Energy gate: the noise floor is this percentile of frame energies, and the speech threshold derived
+# from it is kept within these bounds (dBFS), so a file that is all speech or all digital silence still
+# gets a sensible one
+NOISE_FLOOR_PERCENTILE = 10
+SPEECH_THRESHOLD_DB = (-60.0, -35.0)
+# Shorter voiced stretches are clicks or breaths, not speech
+MIN_SPEECH_SECONDS = 0.25
+
+
+def _rms_db(samples: np.ndarray, frame_len: int) -> np.ndarray:
+    """RMS energy (dBFS) of each whole frame_len-sample frame of float samples."""
+    usable = (len(samples) // frame_len) * frame_len
+    frames = samples[:usable].reshape(-1, frame_len)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-6))
+
+
+def frame_energy_db(wav_path: Path, frame_seconds: float = FRAME_SECONDS) -> np.ndarray:
+    """
+    Computes the RMS energy (dBFS) of consecutive frames of a 16-bit mono WAV.
+    The file is read in blocks, so memory stays bounded for multi-hour recordings.
+    """
+    energies = []
+    with wave.open(str(wav_path), "rb") as w:
+        frame_len = max(1, int(w.getframerate() * frame_seconds))
+        # ~1 minute of audio per read, always a whole number of frames
+        block_frames = frame_len * max(1, int(60 / frame_seconds))
+        while True:
+            raw = w.readframes(block_frames)
+            if not raw:
+                break
+            samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+            if len(samples) < frame_len:
+                break
+            energies.append(_rms_db(samples, frame_len))
+    return np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+
+
+def samples_energy_db(samples: np.ndarray, frame_seconds: float = FRAME_SECONDS) -> np.ndarray:
+    """frame_energy_db for audio already in memory (16 kHz float32)."""
+    return _rms_db(samples, max(1, int(SAMPLE_RATE * frame_seconds)))
+
+
+def find_chunk_boundaries(
+    energy_db: np.ndarray,
+    chunk_seconds: float,
+    frame_seconds: float = FRAME_SECONDS,
+    search_seconds: float = 30.0
+) -> List[Tuple[float, float]]:
+    """
+    Splits the timeline into chunks of about chunk_seconds, cutting at the quietest
+    MIN_SILENCE_SECONDS-long stretch within +/- search_seconds of each target boundary.
+    No chunk is ever longer than chunk_seconds + search_seconds.
+    """
+    total = len(energy_db) * frame_seconds
+    if total <= chunk_seconds + search_seconds:
+        return [(0.0, total)]
+
+    # Moving average so a single quiet frame between two words doesn't count as a pause
+    window = max(1, int(MIN_SILENCE_SECONDS / frame_seconds))
+    smoothed = np.convolve(energy_db, np.ones(window) / window, mode="same")
+
+    boundaries = [0.0]
+    position = 0.0
+    while total - position > chunk_seconds + search_seconds:
+        target = position + chunk_seconds
+        lo = int((target - search_seconds) / frame_seconds)
+        hi = int((target + search_seconds) / frame_seconds)
+        cut = (lo + int(np.argmin(smoothed[lo:hi]))) * frame_seconds
+        boundaries.append(cut)
+        position = cut
+    boundaries.append(total)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def plan_chunks(wav_path: Path, chunk_seconds: float) -> List[Tuple[float, float]]:
+    """Returns (start, end) second ranges splitting the WAV on silence into chunks of bounded length."""
+    chunks = find_chunk_boundaries(frame_energy_db(wav_path), chunk_seconds)
+    logger.info(f"Split {wav_path.name} into {len(chunks)} chunks on silence")
+    return chunks
+
+
+def plan_windows(samples: np.ndarray, window_seconds: float, search_seconds: float = 5.0) -> List[Tuple[float, float]]:
+    """
+    Splits in-memory audio into windows of at most window_seconds (the model's 30 s input), cutting on
+    silence within the last search_seconds of each window. The last window ends at the last sample.
+    """
+    total = len(samples) / SAMPLE_RATE
+    if total <= window_seconds:
+        return [(0.0, total)]
+    windows = find_chunk_boundaries(samples_energy_db(samples), window_seconds - search_seconds, search_seconds=search_seconds)
+    windows[-1] = (windows[-1][0], total)
+    return windows
+
+
+def speech_regions(
+    energy_db: np.ndarray,
+    frame_seconds: float = FRAME_SECONDS,
+    margin_db: float = VAD_ENERGY_MARGIN_DB,
+    min_silence_seconds: float = VAD_MIN_SILENCE_MS / 1000,
+    pad_seconds: float = VAD_SPEECH_PAD_MS / 1000
+) -> List[Tuple[float, float]]:
+    """
+    Energy gate: (start, end) second ranges of the frames more than margin_db above the noise floor.
+    Pauses shorter than min_silence_seconds are bridged and every region is padded by pad_seconds,
+    so quiet word endings are kept.
+    """
+    if not len(energy_db):
+        return []
+    floor = float(np.percentile(energy_db, NOISE_FLOOR_PERCENTILE))
+    threshold = min(max(floor + margin_db, SPEECH_THRESHOLD_DB[0]), SPEECH_THRESHOLD_DB[1])
+    edges = np.diff(np.concatenate(([0], (energy_db > threshold).astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+    regions: List[Tuple[float, float]] = []
+    for start, end in zip(starts * frame_seconds, ends * frame_seconds):
+        if regions and start - regions[-1][1] < min_silence_seconds:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+
+    total = len(energy_db) * frame_seconds
+    padded: List[Tuple[float, float]] = []
+    for start, end in regions:
+        if end - start < MIN_SPEECH_SECONDS:
+            continue
+        start, end = max(0.0, start - pad_seconds), min(total, end + pad_seconds)
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], end)
+        else:
+            padded.append((start, end))
+    return [(round(float(start), 3), round(float(end), 3)) for start, end in padded]
+
+
+def plan_speech(wav_path: Path) -> List[Tuple[float, float]]:
+    """Speech regions of an extracted WAV (energy gate), on the file's timeline."""
+    regions = speech_regions(frame_energy_db(wav_path))
+    logger.info(f"{wav_path.name}: {sum(e - s for s, e in regions):.0f}s of speech in {len(regions)} regions")
+    return regions
+
+
+def clip_regions(regions: List[Tuple[float, float]], start: float, end: float) -> List[Tuple[float, float]]:
+    """The parts of regions inside [start, end), relative to start."""
+    return [
+        (max(s, start) - start, min(e, end) - start)
+        for s, e in regions if e > start and s < end
+    ]
+
+
+class SpeechTimeline:
+    """
+    Maps times in audio made of the speech regions laid end to end back onto the audio they were cut from.
+    An end time that falls exactly on the join of two regions belongs to the first of them.
+    """
+
+    def __init__(self, regions: List[Tuple[float, float]]):
+        self.regions = regions
+        self._offsets: List[float] = []   # where each region starts in the joined audio
+        position = 0.0
+        for start, end in regions:
+            self._offsets.append(position)
+            position += end - start
+
+    def original(self, seconds: float, is_end: bool = False) -> float:
+        index = max(0, bisect.bisect_right(self._offsets, seconds) - 1)
+        if is_end and index > 0 and seconds == self._offsets[index]:
+            index -= 1
+        start, end = self.regions[index]
+        return min(end, start + seconds - self._offsets[index])
+
+
+def join_speech(samples: np.ndarray, regions: List[Tuple[float, float]]) -> np.ndarray:
+    """The speech regions of in-memory audio, back to back."""
+    return np.concatenate([samples[int(s * SAMPLE_RATE):int(e * SAMPLE_RATE)] for s, e in regions])
+
+
+def merge_vad_reports(reports: List[Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Adds up per-chunk VAD reports (see transcriber.vad_report); None when no chunk ran the VAD."""
+    reports = [r for r in reports if r]
+    if not reports:
+        return None
+    saved = [r["saved_seconds"] for r in reports]
+    return {
+        "audio_seconds": round(sum(r["audio_seconds"] for r in reports), 2),
+        "speech_seconds": round(sum(r["speech_seconds"] for r in reports), 2),
+        "saved_seconds": None if None in saved else round(sum(saved), 2)
+    }
+
+
+def merge_chunk_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Stitches per-chunk transcription results (in chunk order) back into a single job result."""
+    # A paused chunk pauses the whole job; finished chunks are picked up again from their journals
+    for status in ("error", "cancelled", "paused"):
+        failed = next((r for r in results if r["status"] == status), None)
+        if failed:
+            return failed
+
+    timings: Dict[str, float] = {}
+    for r in results:
+        for stage, seconds in r.get("timings", {}).items():
+            # Chunks run concurrently: the slowest one bounds each stage
+            timings[stage] = max(timings.get(stage, 0.0), seconds)
+
+    return {
+        "status": "completed",
+        "text": " ".join(r["text"] for r in results if r["text"]).strip(),
+        "detected_language": results[0]["detected_language"],
+        "segments": [seg for r in results for seg in r.get("segments", [])],
+        "timings": timings,
+        "vad": merge_vad_reports([r.get("vad") for r in results]),
+        "interventions": [i for r in results for i in r.get("interventions", [])]
+    }
@@ -0,0 +1,50 @@
+import time
+from collections import namedtuple
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from core.media_processor import SAMPLE_RATE, wav_duration
+
+StubSegment = namedtuple("StubSegment", ["start", "end", "text"])
+StubInfo = namedtuple("StubInfo", ["language", "duration"])
+
+# Length of each synthetic segment
+SEGMENT_SECONDS = 5.0
+
+
+class StubWhisperModel:
+    """
+    Stands in for faster_whisper.WhisperModel when TRANSCRIPTION_ENGINE is "stub".
+    Emits one placeholder segment per SEGMENT_SECONDS of input without running any model, so
+    benchmarks can measure the JobManager, worker and WebSocket overhead on their own.
+    realtime_factor > 0 paces the segments as if decoding ran at that speed.
+    """
+
+    def __init__(self, realtime_factor: float = 0.0):
+        self.realtime_factor = realtime_factor
+
+    def transcribe(self, audio, language=None, task="transcribe", **kwargs) -> Tuple[Iterator[StubSegment], StubInfo]:
+        if isinstance(audio, np.ndarray):
+            duration = len(audio) / SAMPLE_RATE
+        else:
+            duration = wav_duration(audio)
+        return self._segments(duration), StubInfo(language or "es", duration)
+
+    def transcribe_batch(self, windows: List[np.ndarray], languages: List[Optional[str]]) -> List[Tuple[list, str]]:
+        """Batched counterpart used by transcriber.run_batch: (segments, language) per window, paced as one call."""
+        if self.realtime_factor > 0:
+            time.sleep(sum(len(w) for w in windows) / SAMPLE_RATE / self.realtime_factor)
+        return [
+            ([(s.start, s.end, s.text) for s in self._segments(len(w) / SAMPLE_RATE, paced=False)], language or "es")
+            for w, language in zip(windows, languages)
+        ]
+
+    def _segments(self, duration: float, paced: bool = True) -> Iterator[StubSegment]:
+        start, index = 0.0, 0
+        while start < duration:
+            end = min(duration, start + SEGMENT_SECONDS)
+            if paced and self.realtime_factor > 0:
+                time.sleep((end - start) / self.realtime_factor)
+            yield StubSegment(start, end, f" Segment {index}.")
+            start, index = end, index + 1
@@ -1,12 +1,107 @@
 import logging
+import time
 import multiprocessing
 from multiprocessing.synchronize import Event
 from multiprocessing.queues import Queue
 from pathlib import Path
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
+import numpy as np
 from faster_whisper import WhisperModel
-from config import MODEL_DIR
+from config import (
+    WHISPER_MODEL, WHISPER_COMPUTE_TYPE, BATCH_MAX_SIZE, VAD_MODE, VAD_MIN_SILENCE_MS, VAD_SPEECH_PAD_MS,
+    REPETITION_GUARD, REPETITION_RETRY_TEMPERATURES
+)
+from core.model_manager import model_load_path, model_path
+from core.media_processor import SAMPLE_RATE, stream_audio, read_wav_range
+from core.segmenter import (
+    WINDOW_SECONDS, plan_windows, speech_regions, samples_energy_db, clip_regions, join_speech, SpeechTimeline
+)
+from core.checkpoint import CheckpointJournal, journal_path
+from core.repetition import RepetitionDetector, compression_ratio
+from core.profiler import Trace
+
+# Process-wide model instance. Lives as long as the worker process does.
+_model: Optional[WhisperModel] = None
+# Decoding seconds per second of speech in this worker's last run, to price the audio the VAD dropped
+_decode_cost: Optional[float] = None
+# Time step of Whisper's timestamp tokens
+TIMESTAMP_STEP = 0.02
+# Decoding settings of every pass: given to WhisperModel.transcribe, and applied by _decode_windows to the
+# batched windows (faster-whisper's own defaults, spelled out so that both paths decode alike)
+DECODE_OPTIONS: Dict[str, Any] = {
+    "beam_size": 5,
+    "best_of": 5,
+    "patience": 1,
+    "length_penalty": 1,
+    "repetition_penalty": 1,
+    "no_repeat_ngram_size": 0,
+    "temperature": [0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
+    "compression_ratio_threshold": 2.4,
+    "log_prob_threshold": -1.0,
+    "no_speech_threshold": 0.6,
+    "condition_on_previous_text": True,
+    "prompt_reset_on_temperature": 0.5,
+    "suppress_blank": True,
+    "suppress_tokens": [-1],
+    "max_initial_timestamp": 1.0
+}
+
+def get_model(
+    cpu_threads: int = 0, engine: str = "whisper", model: str = WHISPER_MODEL, compute_type: str = WHISPER_COMPUTE_TYPE
+) -> Tuple[WhisperModel, float]:
+    """
+    Returns the process-wide Whisper model, loading it on first use.
+    A worker process only ever runs one model size and compute type (see WorkerPool.configure_model).
+    cpu_threads=0 lets CTranslate2 pick its default thread count.
+    engine="stub" returns a StubWhisperModel instead (benchmarks only, no model files needed).
+    int8 compute types load the pre-quantized copy when there is one, and the original if that fails.
+    The second value is the time spent loading (0.0 when the model was already warm).
+    """
+    global _model
+    if _model is not None:
+        return _model, 0.0
+
+    start = time.perf_counter()
+    if engine == "stub":
+        from core.stub_engine import StubWhisperModel
+        _model = StubWhisperModel()
+    else:
+        path = model_load_path(model, compute_type)
+        try:
+            # Needs to be string for faster-whisper
+            _model = WhisperModel(str(path), device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+        except Exception as e:
+            if path == model_path(model):
+                raise
+            logging.getLogger("transcriber_worker").warning(
+                f"Could not load the pre-quantized model from {path} ({e}), loading the original"
+            )
+            _model = WhisperModel(str(model_path(model)), device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+    return _model, time.perf_counter() - start
+
+def detect_speech(audio: np.ndarray, vad: str) -> List[Tuple[float, float]]:
+    """(start, end) seconds of speech in 16 kHz audio, with faster-whisper's Silero model or the energy gate."""
+    if vad == "silero":
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+        options = VadOptions(min_silence_duration_ms=VAD_MIN_SILENCE_MS, speech_pad_ms=VAD_SPEECH_PAD_MS)
+        return [(c["start"] / SAMPLE_RATE, c["end"] / SAMPLE_RATE) for c in get_speech_timestamps(audio, options)]
+    return speech_regions(samples_energy_db(audio))
+
+def vad_report(audio_seconds: float, speech_seconds: float, transcribe_seconds: float) -> Dict[str, Any]:
+    """
+    Audio and speech seconds seen by the VAD, and the decoding time the dropped audio would have cost,
+    priced at this run's decoding seconds per speech second (the worker's previous run when nothing was decoded).
+    """
+    global _decode_cost
+    if speech_seconds > 0 and transcribe_seconds > 0:
+        _decode_cost = transcribe_seconds / speech_seconds
+    skipped = max(0.0, audio_seconds - speech_seconds)
+    return {
+        "audio_seconds": round(audio_seconds, 2),
+        "speech_seconds": round(speech_seconds, 2),
+        "saved_seconds": round(skipped * _decode_cost, 2) if _decode_cost else None
+    }
 
 def run_transcription(
     job_id: str,
@@ -15,46 +110,160 @@ def run_transcription(
     duration_seconds: float,
     pause_event: Event,
     cancel_event: Event,
-    progress_queue: Queue
+    progress_queue: Queue,
+    cpu_threads: int = 0,
+    engine: str = "whisper",
+    model: str = WHISPER_MODEL,
+    compute_type: str = WHISPER_COMPUTE_TYPE,
+    stream: bool = False,
+    start_seconds: float = 0.0,
+    end_seconds: Optional[float] = None,
+    chunk_index: Optional[int] = None,
+    checkpoint_key: Optional[str] = None,
+    vad: str = VAD_MODE,
+    speech_regions: Optional[List[Tuple[float, float]]] = None,
+    trace: Optional[Trace] = None
 ) -> Dict[str, Any]:
     """
-    Worker function executed in ProcessPoolExecutor.
-    Reads audio_path, initializes Whisper, and yields progress.
-    Returns the final concatenated text and detected language.
+    Worker function executed inside the persistent transcription worker.
+    Reads audio_path using the warm Whisper model and yields progress.
+    With stream=True, audio_path is the original media file and is decoded by ffmpeg
+    straight into memory instead of going through an extracted WAV.
+    start_seconds/end_seconds restrict transcription to a range of the WAV (one chunk of a long file);
+    duration_seconds is then the length of that range, and segment timestamps are shifted back onto
+    the file's timeline. Progress messages carry chunk_index so the JobManager can combine chunks.
+    With a checkpoint_key, every segment is appended to a journal as soon as it is decoded, and a
+    previous journal makes the run resume from its last committed segment instead of from zero.
+    With vad "silero" or "energy", only the speech regions (speech_regions on the file's timeline, computed
+    during extraction, or detected here) are decoded, back to back; segment timestamps, progress and
+    checkpoints are mapped back onto the original timeline, and the result carries a "vad" report.
+    With the repetition guard on, a segment that looks like a decoding loop is dropped and its window is
+    decoded again, or skipped if the retry loops too (see _guarded_segments); the result
+    lists these "interventions".
+    Pausing then returns {"status": "paused"} right after the current segment is committed, freeing
+    the worker; running the unit again continues from that offset.
+    With an enabled trace, every step and every decoded segment is recorded as a span; the
+    "manager_events" spans time the pause/cancel checks, which are IPC round-trips to the Manager process.
+    Returns the final concatenated text, segments, detected language and stage timings.
     """
     logger = logging.getLogger("transcriber_worker")
     logger.setLevel(logging.INFO)
-    
-    # Needs to be string for faster-whisper
-    model_path = str(MODEL_DIR)
+    trace = trace or Trace(enabled=False)
+    journal = CheckpointJournal(journal_path(checkpoint_key, chunk_index)) if checkpoint_key else None
     
     try:
         # Check cancel before starting
         if cancel_event.is_set():
             return {"status": "cancelled", "text": None}
+        if journal and not pause_event.is_set():
+            # Paused before this unit got a worker (e.g. a queued chunk): nothing to checkpoint yet
+            return {"status": "paused", "text": None}
+
+        with trace.span("checkpoint_load"):
+            journal_language, committed = journal.load() if journal else (None, [])
+        # Seek past what a previous run already committed
+        offset = committed[-1]["end"] if committed else start_seconds
+        if committed:
+            logger.info(f"Job {job_id} resuming from checkpoint at {offset:.1f}s ({len(committed)} segments)")
+            range_end = end_seconds if end_seconds is not None else start_seconds + duration_seconds
+            if range_end - offset < 1.0:
+                # The interrupted run had already committed everything
+                return {
+                    "status": "completed",
+                    "text": "".join(seg["text"] for seg in committed).strip(),
+                    "segments": committed,
+                    "detected_language": journal_language,
+                    "timings": {}
+                }
             
-        model = WhisperModel(model_path, device="cpu", compute_type="int8")
-        
-        # 'auto' is not a valid language param in faster-whisper, it expects None for auto-detect
-        lang_arg = language if language and language != "auto" else None
+        with trace.span("get_model"):
+            whisper, model_load_seconds = get_model(cpu_threads, engine, model, compute_type)
+        timings = {"model_load": round(model_load_seconds, 3)}
+        # 'auto' is not a valid language param in faster-whisper, it expects None for auto-detect.
+        # When resuming, stick to the language detected by the interrupted run.
+        lang_arg = journal_language or (language if language and language != "auto" else None)
 
-        segments, info = model.transcribe(
-            str(audio_path),
-            language=lang_arg,
-            task="transcribe"
-        )
+        audio = str(audio_path)
+        if stream:
+            decode_start = time.perf_counter()
+            audio = stream_audio(audio_path, duration_seconds, cancel_event)
+            timings["decode"] = round(time.perf_counter() - decode_start, 3)
+            trace.add_span("ffmpeg_stream_decode", decode_start, time.perf_counter())
+            if cancel_event.is_set():
+                return {"status": "cancelled", "text": None}
+            if audio is None:
+                return {"status": "error", "error": "Failed to decode audio using FFmpeg", "text": None}
+        elif offset or end_seconds is not None or vad != "off":
+            with trace.span("read_wav_range", offset=offset):
+                audio = read_wav_range(audio_path, offset, end_seconds)
+
+        # Times in the audio handed to the model -> seconds since `offset`
+        timeline = None
+        if vad != "off":
+            vad_start = time.perf_counter()
+            audio_seconds = len(audio) / SAMPLE_RATE
+            with trace.span("vad", mode=vad):
+                if speech_regions is not None:
+                    regions = clip_regions(speech_regions, offset, offset + audio_seconds)
+                else:
+                    regions = detect_speech(audio, vad)
+            timings["vad"] = round(time.perf_counter() - vad_start, 3)
+            speech_seconds = sum(end - start for start, end in regions)
+            logger.info(f"Job {job_id}: {speech_seconds:.0f}s of speech in {audio_seconds:.0f}s of audio ({vad} VAD)")
+            if not regions:
+                # Nothing to decode: the committed segments (if any) are the whole transcript
+                return {
+                    "status": "completed",
+                    "text": "".join(seg["text"] for seg in committed).strip(),
+                    "segments": committed,
+                    "detected_language": lang_arg,
+                    "timings": timings,
+                    "vad": vad_report(audio_seconds, 0.0, 0.0)
+                }
+            timeline = SpeechTimeline(regions)
+            audio = join_speech(audio, regions)
+
+        transcribe_start = time.perf_counter()
+
+        # Feature extraction and language detection happen here; segments are decoded lazily below
+        with trace.span("model_transcribe_setup"):
+            segments, info = whisper.transcribe(
+                audio,
+                language=lang_arg,
+                task="transcribe",
+                **DECODE_OPTIONS
+            )
         
         detected_language = info.language
-        text_segments = []
+        if journal:
+            journal.start(detected_language)
+        text_segments = [seg["text"] for seg in committed]
+        timed_segments = list(committed)
+        interventions: List[Dict[str, Any]] = []
+        if REPETITION_GUARD:
+            segments = _guarded_segments(
+                whisper, audio, segments, detected_language, job_id, interventions,
+                lambda t: (timeline.original(t) if timeline else t) + offset, trace
+            )
+        else:
+            segments = ((segment.start, segment.end, segment.text) for segment in segments)
         
-        for segment in segments:
+        segment_start = time.perf_counter()
+        for seg_start, seg_end, seg_text in segments:
+            step = time.perf_counter()
+            if timeline:
+                seg_start, seg_end = timeline.original(seg_start), timeline.original(seg_end, is_end=True)
+            trace.add_span("decode_segment", segment_start, step,
+                           audio_start=round(seg_start + offset, 2), audio_end=round(seg_end + offset, 2))
             # Check cancel
-            if cancel_event.is_set():
+            cancelled = cancel_event.is_set()
+            trace.add_span("manager_events", step, time.perf_counter())
+            if cancelled:
                 logger.info(f"Job {job_id} cancelled during transcription.")
                 return {"status": "cancelled", "text": None}
-                
-            # Check pause
-            if not pause_event.is_set():
+
+            # Without a journal there is nowhere to resume from, so pause has to hold the worker
+            if not journal and not pause_event.is_set():
                 logger.info(f"Job {job_id} paused. Waiting...")
                 progress_queue.put({"job_id": job_id, "event": "status_change", "status": "paused"})
                 pause_event.wait() # blocks indefinitely until set
@@ -65,25 +274,456 @@ def run_transcription(
                 logger.info(f"Job {job_id} resumed.")
                 progress_queue.put({"job_id": job_id, "event": "status_change", "status": "transcribing"})
                 
-            text_segments.append(segment.text)
+            timed = {
+                "start": round(seg_start + offset, 2),
+                "end": round(seg_end + offset, 2),
+                "text": seg_text
+            }
+            text_segments.append(seg_text)
+            timed_segments.append(timed)
+            if journal:
+                with trace.span("journal_append"):
+                    journal.append(timed)
+            step = time.perf_counter()
+            # Stream the segment to the UI as soon as it is decoded
+            segment_msg = {"job_id": job_id, "event": "segment", **timed}
+            if chunk_index is not None:
+                segment_msg["chunk"] = chunk_index
+            progress_queue.put(segment_msg)
             
             # Calculate progress
             if duration_seconds > 0:
-                progress = min(1.0, segment.end / duration_seconds)
-                progress_queue.put({
+                progress = min(1.0, (timed["end"] - start_seconds) / duration_seconds)
+                msg = {
                     "job_id": job_id,
                     "event": "progress_update",
                     "progress": progress
-                })
-                
+                }
+                if chunk_index is not None:
+                    msg["chunk"] = chunk_index
+                progress_queue.put(msg)
+            trace.add_span("progress_send", step, time.perf_counter())
+
+            step = time.perf_counter()
+            paused = journal and not pause_event.is_set()
+            trace.add_span("manager_events", step, time.perf_counter())
+            if paused:
+                # Everything up to here is committed: give the worker back and resume from the journal later
+                logger.info(f"Job {job_id} paused at {timed['end']:.1f}s, releasing the worker")
+                return {"status": "paused", "text": None, "offset": timed["end"]}
+            segment_start = time.perf_counter()
+
         full_text = "".join(text_segments).strip()
+        timings["transcribe"] = round(time.perf_counter() - transcribe_start, 3)
         
-        return {
+        result = {
             "status": "completed",
             "text": full_text,
-            "detected_language": detected_language
+            "segments": timed_segments,
+            "detected_language": detected_language,
+            "timings": timings,
+            "interventions": interventions
         }
+        if timeline:
+            result["vad"] = vad_report(audio_seconds, speech_seconds, timings["transcribe"])
+        return result
         
     except Exception as e:
         logger.exception(f"Exception in transcription worker for job {job_id}: {e}")
         return {"status": "error", "error": str(e), "text": None}
+    finally:
+        if journal:
+            journal.close()
+
+
+def _redecode(whisper, samples: np.ndarray, language: Optional[str]) -> Optional[List[Tuple[float, float, str]]]:
+    """
+    Decodes one window again with the fallback settings: sampling at REPETITION_RETRY_TEMPERATURES and no
+    prompt from the previous text, which is what usually feeds a loop. None if the retry loops as well.
+    """
+    segments, _ = whisper.transcribe(
+        samples,
+        language=language,
+        task="transcribe",
+        **{**DECODE_OPTIONS, "temperature": REPETITION_RETRY_TEMPERATURES, "condition_on_previous_text": False}
+    )
+    detector = RepetitionDetector()
+    decoded = []
+    for segment in segments:
+        if detector.check(segment.text):
+            return None
+        decoded.append((segment.start, segment.end, segment.text))
+    return decoded
+
+
+def _intervene(whisper, samples: np.ndarray, at: float, language: Optional[str], reason: str, text: str,
+               job_id: str, trace: Trace) -> Tuple[Optional[List[Tuple[float, float, str]]], Dict[str, Any]]:
+    """
+    Re-decodes the window `samples` after a loop was detected in it, and logs and reports what was done:
+    "redecoded", or "skipped" when the retry loops as well and the caller drops the looping part of the window.
+    `at` is where the window starts on the file's timeline (for the log and the report only).
+    """
+    retry_start = time.perf_counter()
+    with trace.span("repetition_retry", audio_start=round(at, 2), reason=reason):
+        retried = _redecode(whisper, samples, language)
+    intervention = {
+        "start": round(at, 2),
+        "seconds": round(len(samples) / SAMPLE_RATE, 2),
+        "reason": reason,
+        "action": "redecoded" if retried is not None else "skipped",
+        "retry_seconds": round(time.perf_counter() - retry_start, 3)
+    }
+    logging.getLogger("transcriber_worker").warning(
+        f"Job {job_id}: repetition loop ({reason}) at {at:.1f}s in {text.strip()[:80]!r}, "
+        f"window of {intervention['seconds']:.0f}s {intervention['action']} in {intervention['retry_seconds']:.1f}s"
+    )
+    return retried, intervention
+
+
+def _guarded_segments(whisper, audio, segments, language: Optional[str], job_id: str,
+                      interventions: List[Dict[str, Any]], locate: Callable[[float], float], trace: Trace):
+    """
+    Yields (start, end, text) for the segments of `audio` (times in that audio), watching them with a
+    RepetitionDetector. A segment that trips it stops the decoding pass there: the WINDOW_SECONDS from
+    its start are decoded again (_intervene) and yielded if the retry is clean; if the retry loops too,
+    the window is skipped, so no hallucinated repeats reach the transcript. A new pass starts at the end
+    of the window, with the same DECODE_OPTIONS as the first, so a loop costs at most one window's retry,
+    never the rest of the file. Segments already yielded before the trigger are kept. locate() maps a
+    time in `audio` onto the file's timeline, for the report.
+    """
+    detector = RepetitionDetector()
+    position = 0.0
+    while True:
+        trigger = None
+        for segment in segments:
+            reason = detector.check(segment.text)
+            if reason:
+                trigger = (segment, reason)
+                break
+            yield position + segment.start, position + segment.end, segment.text
+        if trigger is None:
+            return
+
+        if isinstance(audio, str):
+            # Not loaded yet: faster-whisper was given the WAV path
+            audio = read_wav_range(Path(audio))
+        first, reason = trigger
+        start = position + first.start
+        total = len(audio) / SAMPLE_RATE
+        end = min(total, start + WINDOW_SECONDS)
+        retried, intervention = _intervene(
+            whisper, audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)], locate(start), language, reason,
+            first.text, job_id, trace
+        )
+        interventions.append(intervention)
+        for seg_start, seg_end, seg_text in retried or []:
+            yield start + seg_start, start + min(seg_end, end - start), seg_text
+        detector.reset()
+        if total - end < 1.0:
+            return
+        position = end
+        segments, _ = whisper.transcribe(
+            audio[int(end * SAMPLE_RATE):], language=language, task="transcribe", **DECODE_OPTIONS
+        )
+
+
+def _split_by_timestamps(
+    tokenizer, tokens: List[int], window_end: float
+) -> Tuple[List[Tuple[float, float, str]], List[int]]:
+    """
+    Cuts a window's tokens into (start, end, text) segments relative to the window, like
+    WhisperModel.generate_segments: at each pair of consecutive timestamps, or as one segment when there
+    is none. A segment still open at the end runs to the end of the window, where the sequential path
+    would decode it again from its last timestamp (a batch window has a fixed end).
+    Returns the segments and the tokens they were made of, which prompt the job's next window.
+    """
+    begin = tokenizer.timestamp_begin
+    cuts = [i for i in range(1, len(tokens)) if tokens[i] >= begin and tokens[i - 1] >= begin]
+    pieces = []   # (start, end, tokens)
+    if cuts:
+        last = 0
+        for cut in cuts + [len(tokens)]:
+            piece = tokens[last:cut]
+            if piece:
+                closed = cut < len(tokens) or (len(piece) >= 2 and piece[-2] < begin <= piece[-1])
+                end = (piece[-1] - begin) * TIMESTAMP_STEP if closed else window_end
+                pieces.append(((piece[0] - begin) * TIMESTAMP_STEP, end, piece))
+            last = cut
+    else:
+        timestamps = [token for token in tokens if token >= begin]
+        end = (timestamps[-1] - begin) * TIMESTAMP_STEP if timestamps and timestamps[-1] != begin else window_end
+        pieces.append((0.0, end, tokens))
+    kept = [(start, end, piece) for start, end, piece in pieces if start != end and tokenizer.decode(piece).strip()]
+    return [(start, end, tokenizer.decode(piece)) for start, end, piece in kept], [t for *_, piece in kept for t in piece]
+
+
+def _decode_windows(
+    whisper, windows: List[np.ndarray], languages: List[Optional[str]], previous: List[List[int]]
+) -> List[Tuple[List[Tuple[float, float, str]], str, List[int]]]:
+    """
+    Decodes up to 30 s windows in one batched CTranslate2 call: one encoder pass over the stacked features,
+    language detection for the windows that need it, then one batched beam search with the settings of the
+    sequential path (DECODE_OPTIONS): each window is prompted with the text decoded before it (previous[i],
+    the tokens of its job so far), blank and non-speech tokens are suppressed, and a window whose text
+    compresses too well or scores too low falls back to sampling at the next temperature, batched with the
+    other windows that still need it. Returns (segments, language, tokens) per window, where tokens is what
+    the job's next window is prompted with.
+    """
+    if hasattr(whisper, "transcribe_batch"):
+        # StubWhisperModel
+        return [(segments, language, []) for segments, language in whisper.transcribe_batch(windows, languages)]
+
+    from faster_whisper.tokenizer import Tokenizer
+    from faster_whisper.transcribe import get_suppressed_tokens
+
+    options = DECODE_OPTIONS
+    frames = whisper.feature_extractor.nb_max_frames
+    features = []
+    for audio in windows:
+        # generate_segments leaves out the last frame, the one for the feature extractor's padding
+        mel = whisper.feature_extractor(audio)[:, :-1][:, :frames]
+        features.append(np.pad(mel, ((0, 0), (0, frames - mel.shape[1]))))
+    features = np.stack(features)
+    encoder_output = whisper.encode(features)
+
+    if not whisper.model.is_multilingual:
+        # What transcribe() does with an English-only model, whatever language was asked for
+        languages = ["en"] * len(windows)
+    elif any(language is None for language in languages):
+        detected = [results[0][0][2:-2] for results in whisper.model.detect_language(encoder_output)]
+        languages = [language or found for language, found in zip(languages, detected)]
+
+    tokenizers = [
+        Tokenizer(whisper.hf_tokenizer, whisper.model.is_multilingual, task="transcribe", language=language)
+        for language in languages
+    ]
+    prompts = [
+        whisper.get_prompt(tokenizer, tokens if options["condition_on_previous_text"] else [])
+        for tokenizer, tokens in zip(tokenizers, previous)
+    ]
+    # The same for every language
+    suppress_tokens = get_suppressed_tokens(tokenizers[0], list(options["suppress_tokens"]))
+
+    # Same rules as WhisperModel.generate_with_fallback, one temperature at a time over the pending windows
+    attempts: List[list] = [[] for _ in windows]   # (result, avg_logprob, temperature, compression) per window
+    chosen: List[Optional[tuple]] = [None] * len(windows)
+    pending = list(range(len(windows)))
+    for temperature in options["temperature"]:
+        if temperature > 0:
+            sampling = {"beam_size": 1, "num_hypotheses": options["best_of"], "sampling_topk": 0,
+                        "sampling_temperature": temperature}
+        else:
+            sampling = {"beam_size": options["beam_size"], "patience": options["patience"]}
+        results = whisper.model.generate(
+            encoder_output if len(pending) == len(windows) else whisper.encode(features[pending]),
+            [prompts[i] for i in pending],
+            length_penalty=options["length_penalty"],
+            repetition_penalty=options["repetition_penalty"],
+            no_repeat_ngram_size=options["no_repeat_ngram_size"],
+            max_length=whisper.max_length,
+            return_scores=True,
+            return_no_speech_prob=True,
+            suppress_blank=options["suppress_blank"],
+            suppress_tokens=suppress_tokens,
+            max_initial_timestamp_index=int(round(options["max_initial_timestamp"] / TIMESTAMP_STEP)),
+            **sampling
+        )
+        for i, result in zip(pending, results):
+            tokens = result.sequences_ids[0]
+            avg_logprob = result.scores[0] * len(tokens) ** options["length_penalty"] / (len(tokens) + 1)
+            compression = compression_ratio(tokenizers[i].decode(tokens).strip())
+            attempts[i].append((result, avg_logprob, temperature, compression))
+            too_repetitive = compression > options["compression_ratio_threshold"]
+            too_unlikely = avg_logprob < options["log_prob_threshold"]
+            silence = result.no_speech_prob > options["no_speech_threshold"] and too_unlikely
+            if silence or not (too_repetitive or too_unlikely):
+                chosen[i] = attempts[i][-1]
+        pending = [i for i in pending if chosen[i] is None]
+        if not pending:
+            break
+    for i in pending:
+        # Every temperature failed: the likeliest attempt that is not too repetitive, else the likeliest
+        below = [a for a in attempts[i] if a[3] <= options["compression_ratio_threshold"]]
+        result, avg_logprob, _, compression = max(below or attempts[i], key=lambda a: a[1])
+        chosen[i] = (result, avg_logprob, options["temperature"][-1], compression)
+
+    decoded = []
+    for audio, tokenizer, language, tokens, (result, avg_logprob, temperature, _) in zip(
+            windows, tokenizers, languages, previous, chosen):
+        if result.no_speech_prob > options["no_speech_threshold"] and avg_logprob <= options["log_prob_threshold"]:
+            # Dropped as silence, and the prompt carries on unchanged
+            decoded.append(([], language, tokens))
+            continue
+        segments, kept = _split_by_timestamps(tokenizer, result.sequences_ids[0], len(audio) / SAMPLE_RATE)
+        if temperature > options["prompt_reset_on_temperature"]:
+            # A window that needed a hot fallback does not prompt the next one
+            tokens = []
+        else:
+            tokens = tokens + kept
+        decoded.append((segments, language, tokens))
+    return decoded
+
+
+def run_batch(
+    units: List[Dict[str, Any]],
+    progress_queue: Queue,
+    cpu_threads: int = 0,
+    engine: str = "whisper",
+    model: str = WHISPER_MODEL,
+    compute_type: str = WHISPER_COMPUTE_TYPE,
+    max_size: int = BATCH_MAX_SIZE,
+    vad: str = VAD_MODE,
+    trace: Optional[Trace] = None
+) -> Dict[str, Any]:
+    """
+    Worker function for a batch of short jobs. Each unit is a job (job_id, audio_path, stream,
+    duration_seconds, language, pause/cancel events); its audio is loaded, cut into <= 30 s windows on
+    silence, and the windows of all units are decoded max_size at a time with _decode_windows, with
+    the same settings as a job transcribed alone; a job contributes one window per call, so each of its
+    windows is prompted with the text before it. A job's language is detected on its first window and
+    kept for the others.
+    With a VAD, a job's windows are planned over its speech regions only (the unit's speech_regions or
+    detected here), and segment times are mapped back onto its original timeline.
+    Each job's windows go through the repetition guard; a looping window is decoded again on its own
+    with the fallback settings, or cut off at the loop if the retry loops too (see _intervene).
+    Segments and progress are sent per job as soon as the batch holding them is decoded, so the
+    UI sees the same events as for a job transcribed alone. Batched jobs write no checkpoint journal:
+    they are short enough to simply run again. A job paused or cancelled before the batch starts
+    returns at once; after that, cancelling takes effect at the next batch of windows.
+    Returns {"results": {job_id: result}, "timings": {...}} with the timings of the whole batch.
+    """
+    logger = logging.getLogger("transcriber_worker")
+    trace = trace or Trace(enabled=False)
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        with trace.span("get_model"):
+            whisper, model_load_seconds = get_model(cpu_threads, engine, model, compute_type)
+    except Exception as e:
+        logger.exception(f"Could not load the model for a batch of {len(units)} jobs: {e}")
+        return {"results": {u["job_id"]: {"status": "error", "error": str(e), "text": None} for u in units}, "timings": {}}
+
+    load_start = time.perf_counter()
+    windows = []   # (unit, start, end, samples)
+    for unit in units:
+        job_id = unit["job_id"]
+        if unit["cancel_event"].is_set():
+            results[job_id] = {"status": "cancelled", "text": None}
+            continue
+        if not unit["pause_event"].is_set():
+            results[job_id] = {"status": "paused", "text": None}
+            continue
+        try:
+            with trace.span("load_audio", job_id=job_id):
+                if unit["stream"]:
+                    audio = stream_audio(unit["audio_path"], unit["duration_seconds"], unit["cancel_event"])
+                else:
+                    audio = read_wav_range(unit["audio_path"])
+        except Exception as e:
+            logger.error(f"Job {job_id}: could not read audio for batching: {e}")
+            audio = None
+        if audio is None:
+            results[job_id] = {"status": "error", "error": "Failed to decode audio using FFmpeg", "text": None}
+            continue
+        unit["segments"], unit["language"] = [], unit["language"] if unit["language"] != "auto" else None
+        unit["timeline"], unit["interventions"], unit["tokens"] = None, [], []
+        unit["detector"] = RepetitionDetector() if REPETITION_GUARD else None
+        if vad != "off":
+            with trace.span("vad", job_id=job_id, mode=vad):
+                regions = unit.get("speech_regions")
+                regions = detect_speech(audio, vad) if regions is None else clip_regions(regions, 0.0, len(audio) / SAMPLE_RATE)
+            unit["audio_seconds"] = len(audio) / SAMPLE_RATE
+            unit["speech_seconds"] = sum(end - start for start, end in regions)
+            if not regions:
+                continue
+            unit["timeline"] = SpeechTimeline(regions)
+            audio = join_speech(audio, regions)
+        for start, end in plan_windows(audio, WINDOW_SECONDS):
+            windows.append((unit, start, end, audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]))
+    load_seconds = time.perf_counter() - load_start
+
+    transcribe_start = time.perf_counter()
+    while windows:
+        # At most one window per job in each call: a job's windows are decoded in order, each one
+        # prompted with the text of the windows before it
+        windows = [w for w in windows if not w[0]["cancel_event"].is_set()]
+        group, jobs = [], set()
+        for window in windows:
+            if len(group) < max_size and id(window[0]) not in jobs:
+                group.append(window)
+                jobs.add(id(window[0]))
+        windows = [w for w in windows if not any(w is taken for taken in group)]
+        if not group:
+            break
+        try:
+            with trace.span("decode_batch", windows=len(group), jobs=len(group)):
+                decoded = _decode_windows(
+                    whisper, [w[3] for w in group], [w[0]["language"] for w in group], [w[0]["tokens"] for w in group]
+                )
+        except Exception as e:
+            logger.exception(f"Batched decode failed: {e}")
+            for unit, *_ in group:
+                results[unit["job_id"]] = {"status": "error", "error": str(e), "text": None}
+                unit["cancel_event"].set()
+            continue
+
+        for (unit, start, end, samples), (segments, language, tokens) in zip(group, decoded):
+            unit["language"] = unit["language"] or language
+            unit["tokens"] = tokens
+            timeline = unit["timeline"]
+            detector, trigger = unit["detector"], None
+            for index, (*_, text) in enumerate(segments if detector else []):
+                reason = detector.check(text)
+                if reason:
+                    trigger = (index, reason, text)
+                    break
+            if trigger:
+                # A looping window is decoded again on its own; if the retry loops too, only the segments
+                # before the loop are kept
+                index, *trigger = trigger
+                at = timeline.original(start) if timeline else start
+                retried, intervention = _intervene(whisper, samples, at, unit["language"], *trigger, unit["job_id"], trace)
+                unit["interventions"].append(intervention)
+                segments = segments[:index] if retried is None else retried
+                detector.reset()
+                unit["tokens"] = []
+            for seg_start, seg_end, text in segments:
+                seg_start, seg_end = start + seg_start, start + min(seg_end, end - start)
+                if timeline:
+                    seg_start, seg_end = timeline.original(seg_start), timeline.original(seg_end, is_end=True)
+                timed = {"start": round(seg_start, 2), "end": round(seg_end, 2), "text": text}
+                unit["segments"].append(timed)
+                progress_queue.put({"job_id": unit["job_id"], "event": "segment", **timed})
+            if unit["duration_seconds"] > 0:
+                progress = min(1.0, (timeline.original(end, is_end=True) if timeline else end) / unit["duration_seconds"])
+                progress_queue.put({"job_id": unit["job_id"], "event": "progress_update", "progress": progress})
+    transcribe_seconds = time.perf_counter() - transcribe_start
+    # The batch's decoding time is shared out per speech second
+    batch_speech = sum(u.get("speech_seconds", 0.0) for u in units if u["job_id"] not in results)
+
+    for unit in units:
+        job_id = unit["job_id"]
+        if job_id in results:
+            continue
+        if unit["cancel_event"].is_set():
+            results[job_id] = {"status": "cancelled", "text": None}
+            continue
+        results[job_id] = {
+            "status": "completed",
+            "text": "".join(seg["text"] for seg in unit["segments"]).strip(),
+            "segments": unit["segments"],
+            "detected_language": unit["language"],
+            "interventions": unit["interventions"]
+        }
+        if "speech_seconds" in unit:
+            results[job_id]["vad"] = vad_report(
+                unit["audio_seconds"], unit["speech_seconds"],
+                transcribe_seconds * unit["speech_seconds"] / batch_speech if batch_speech else 0.0
+            )
+    return {
+        "results": results,
+        "timings": {
+            "model_load": round(model_load_seconds, 3),
+            "load_audio": round(load_seconds, 3),
+            "transcribe": round(transcribe_seconds, 3)
+        }
+    }
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from config import (
+    TRANSCRIPT_CACHE_DIR, TRANSCRIPT_CACHE_MAX_MB, VAD_MIN_SILENCE_MS, VAD_SPEECH_PAD_MS, VAD_ENERGY_MARGIN_DB,
+    REPETITION_GUARD, REPETITION_MAX_PHRASE_WORDS, REPETITION_MAX_REPEATS, REPETITION_MIN_LOOP_WORDS,
+    REPETITION_HISTORY_WORDS, REPETITION_MAX_COMPRESSION, REPETITION_RETRY_TEMPERATURES, BATCHING,
+    BATCH_MAX_JOB_SECONDS, LONG_FILE_MIN_SECONDS, LONG_FILE_CHUNK_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+# Fast fingerprint: size plus a few sampled blocks of content
+FINGERPRINT_BLOCK_BYTES = 1 << 20
+FINGERPRINT_SAMPLES = 4
+HASH_CHUNK_BYTES = 1 << 20
+# Part of every key: bump it when a code change alters the transcripts of unchanged settings,
+# so entries written by older code stop matching
+CACHE_KEY_VERSION = 2
+
+
+def file_fingerprint(path: Path, full_hash: bool = False) -> str:
+    """
+    Content fingerprint of a media file.
+    The fast variant hashes the size and FINGERPRINT_SAMPLES evenly spaced 1 MiB blocks; the full
+    variant is the plain SHA256 of the content, the same digest streamed uploads compute while
+    they are written. mtime is deliberately left out: uploads are rewritten to TMP_DIR on every
+    submit, so it changes even when the content does not.
+    """
+    hasher = hashlib.sha256()
+    size = path.stat().st_size
+
+    with open(path, "rb") as f:
+        if full_hash:
+            while chunk := f.read(HASH_CHUNK_BYTES):
+                hasher.update(chunk)
+        else:
+            hasher.update(str(size).encode())
+            if size <= FINGERPRINT_BLOCK_BYTES * FINGERPRINT_SAMPLES:
+                hasher.update(f.read())
+            else:
+                step = (size - FINGERPRINT_BLOCK_BYTES) // (FINGERPRINT_SAMPLES - 1)
+                for i in range(FINGERPRINT_SAMPLES):
+                    f.seek(i * step)
+                    hasher.update(f.read(FINGERPRINT_BLOCK_BYTES))
+
+    return ("sha256:" if full_hash else "fp:") + hasher.hexdigest()
+
+
+def decode_settings(engine: str, vad_mode: str, workers: int) -> Dict[str, Any]:
+    """
+    The settings other than model, compute type and language that change a job's transcript: the engine,
+    the VAD, the repetition guard, and the ones choosing how the job is decoded (batched with other short
+    files, split into chunks across several workers, or alone).
+    """
+    return {
+        "engine": engine,
+        "vad": [vad_mode, VAD_MIN_SILENCE_MS, VAD_SPEECH_PAD_MS, VAD_ENERGY_MARGIN_DB] if vad_mode != "off" else "off",
+        "repetition_guard": [
+            REPETITION_MAX_PHRASE_WORDS, REPETITION_MAX_REPEATS, REPETITION_MIN_LOOP_WORDS, REPETITION_HISTORY_WORDS,
+            REPETITION_MAX_COMPRESSION, REPETITION_RETRY_TEMPERATURES
+        ] if REPETITION_GUARD else None,
+        "batching": BATCH_MAX_JOB_SECONDS if BATCHING else None,
+        "long_file_chunks": [LONG_FILE_MIN_SECONDS, LONG_FILE_CHUNK_SECONDS] if workers > 1 else None
+    }
+
+
+def cache_key(fingerprint: str, model: str, compute_type: str, language: str, settings: Dict[str, Any]) -> str:
+    """
+    A transcript depends on the media content and on every setting that changes the decoded text:
+    model, compute type, language and the decode_settings, under CACHE_KEY_VERSION.
+    """
+    raw = "|".join([
+        f"v{CACHE_KEY_VERSION}", fingerprint, model, compute_type, language or "auto",
+        json.dumps(settings, sort_keys=True)
+    ])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class TranscriptCache:
+    """
+    Persistent content-addressed transcript cache: one JSON file per key under `directory`.
+    Entries are evicted least-recently-used first (file mtime doubles as last-access time)
+    once the cache grows past max_bytes. Safe to call from worker threads.
+    """
+
+    def __init__(self, directory: Path = TRANSCRIPT_CACHE_DIR, max_bytes: int = TRANSCRIPT_CACHE_MAX_MB * 1_048_576):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._total_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _scan_size(self) -> int:
+        if not self.directory.exists():
+            return 0
+        return sum(e.stat().st_size for e in os.scandir(self.directory) if e.name.endswith(".json"))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        with self._lock:
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+                os.utime(path)   # Mark as recently used
+                self.hits += 1
+                return entry
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            except (OSError, ValueError) as e:
+                logger.warning(f"Dropping unreadable transcript cache entry {path.name}: {e}")
+                path.unlink(missing_ok=True)
+                self.misses += 1
+                return None
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        path = self._path(key)
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            if path.exists():
+                self._total_bytes -= path.stat().st_size
+
+            # Write-then-rename so a crash never leaves a truncated entry behind
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        entries = sorted(
+            (e for e in os.scandir(self.directory) if e.name.endswith(".json")),
+            key=lambda e: e.stat().st_mtime
+        )
+        for e in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            size = e.stat().st_size
+            try:
+                os.unlink(e.path)
+            except OSError:
+                continue
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes
+            }
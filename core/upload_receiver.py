@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import logging
+import shutil
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Dict, Any, Optional
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from config import TMP_DIR, UPLOAD_MAX_FILE_MB, UPLOAD_MAX_REQUEST_MB, UPLOAD_MIN_FREE_MB
+
+logger = logging.getLogger(__name__)
+
+# Request bytes are buffered up to this size before each (threaded) write + hash
+UPLOAD_WRITE_CHUNK_BYTES = 1 << 20
+
+
+class UploadRejected(Exception):
+    """The upload was refused or aborted; status_code is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status_code: int = 413):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class _PartWriter:
+    """
+    Writes one file part to TMP_DIR and hashes it on the way. Disk writes and hashing run in a
+    worker thread per 1 MiB block, so the event loop only ever copies bytes into a buffer.
+    """
+
+    def __init__(self, filename: str, path: Path, file, min_free_bytes: int):
+        self.filename = filename
+        self.path = path
+        self.size = 0
+        self._file = file
+        self._hasher = hashlib.sha256()
+        self._buffer = bytearray()
+        self._min_free_bytes = min_free_bytes
+
+    @classmethod
+    async def open(cls, filename: str, min_free_bytes: int) -> "_PartWriter":
+        path = TMP_DIR / f"upload_{uuid.uuid4().hex}.part"
+        f = await asyncio.to_thread(open, path, "wb")
+        return cls(filename, path, f, min_free_bytes)
+
+    async def write(self, data: bytes):
+        self._buffer += data
+        self.size += len(data)
+        if len(self._buffer) >= UPLOAD_WRITE_CHUNK_BYTES:
+            await self._flush()
+
+    async def _flush(self):
+        if not self._buffer:
+            return
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        await asyncio.to_thread(self._write_block, data)
+
+    def _write_block(self, data: bytes):
+        if shutil.disk_usage(self.path.parent).free - len(data) < self._min_free_bytes:
+            raise UploadRejected("Not enough free disk space for the upload", status_code=507)
+        # hashlib releases the GIL on large buffers, so this overlaps with the loop as well
+        self._hasher.update(data)
+        self._file.write(data)
+
+    async def finish(self) -> Dict[str, Any]:
+        await self._flush()
+        await asyncio.to_thread(self._file.close)
+        return {
+            "filename": self.filename,
+            "path": self.path,
+            "size": self.size,
+            "sha256": self._hasher.hexdigest()
+        }
+
+    async def abort(self):
+        await asyncio.to_thread(self._file.close)
+        self.path.unlink(missing_ok=True)
+
+
+async def receive_uploads(
+    request,
+    field_name: str = "files",
+    max_file_bytes: int = UPLOAD_MAX_FILE_MB * 1_048_576,
+    max_request_bytes: int = UPLOAD_MAX_REQUEST_MB * 1_048_576,
+    min_free_bytes: int = UPLOAD_MIN_FREE_MB * 1_048_576
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parses a multipart/form-data request body as it streams in and yields every file of
+    `field_name` as soon as its last byte is on disk, with its size and SHA256 content hash.
+    Other form fields are ignored. Raises UploadRejected when a quota is exceeded or the body
+    is not multipart; the partial file is removed, files already yielded are left to the caller.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise UploadRejected("Expected a multipart/form-data body", status_code=400)
+
+    declared = int(request.headers.get("content-length") or 0)
+    if declared > max_request_bytes:
+        raise UploadRejected(f"Upload exceeds the {max_request_bytes // 1_048_576} MB limit per request")
+    TMP_DIR.mkdir(parents=True, exist_ok=True)
+    if declared and shutil.disk_usage(TMP_DIR).free - declared < min_free_bytes:
+        raise UploadRejected("Not enough free disk space for the upload", status_code=507)
+
+    # The parser reports through synchronous callbacks; collect them and act on them between reads
+    events = []
+    headers: Dict[bytes, bytes] = {}
+    header_field = bytearray()
+    header_value = bytearray()
+
+    def on_part_begin():
+        headers.clear()
+
+    def on_header_field(data, start, end):
+        header_field.extend(data[start:end])
+
+    def on_header_value(data, start, end):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        events.append(("headers", dict(headers)))
+
+    def on_part_data(data, start, end):
+        events.append(("data", bytes(data[start:end])))
+
+    def on_part_end():
+        events.append(("end", None))
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    current: Optional[_PartWriter] = None
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_request_bytes:
+                raise UploadRejected(f"Upload exceeds the {max_request_bytes // 1_048_576} MB limit per request")
+            parser.write(chunk)
+
+            for kind, value in events:
+                if kind == "headers":
+                    _, disposition = parse_options_header(value.get(b"content-disposition", b""))
+                    filename = disposition.get(b"filename")
+                    if disposition.get(b"name") == field_name.encode() and filename:
+                        current = await _PartWriter.open(filename.decode("utf-8", "replace"), min_free_bytes)
+                elif kind == "data" and current:
+                    await current.write(value)
+                    if current.size > max_file_bytes:
+                        raise UploadRejected(
+                            f"{current.filename} exceeds the {max_file_bytes // 1_048_576} MB limit per file"
+                        )
+                elif kind == "end" and current:
+                    landed = await current.finish()
+                    current = None
+                    yield landed
+            events.clear()
+        parser.finalize()
+    finally:
+        # Quota hit, malformed body or client disconnect: never leave a partial file behind
+        if current:
+            await current.abort()
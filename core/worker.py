@@ -0,0 +1,398 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from contextlib import nullcontext
+from typing import Dict, Any, Optional, List
+
+import psutil
+
+from core.progress_channel import ProgressChannel, ProgressSender
+from core.profiler import Trace, cprofile_to
+from config import (
+    WORKER_MAX_JOBS, WORKER_MAX_RSS_MB,
+    TRANSCRIPTION_WORKERS, WORKER_CPU_THREADS, WORKER_PIN_CPUS, TRANSCRIPTION_ENGINE, WHISPER_MODEL, WHISPER_COMPUTE_TYPE,
+    PROFILE_CPROFILE, PROFILE_DIR
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_main(conn, progress_conn, preload: bool, cpu_threads: int, cpu_affinity: Optional[List[int]], engine: str,
+                 model: str, compute_type: str):
+    """
+    Entry point of the worker process.
+    Optionally warms the model up front, then serves commands from `conn` until told to stop.
+    Commands are (name, payload) tuples; every command except "stop" gets exactly one reply.
+    Progress is written to `progress_conn`, this worker's end of the ProgressChannel.
+    """
+    from core import transcriber
+
+    progress_queue = ProgressSender(progress_conn)
+
+    worker_logger = logging.getLogger("transcriber_worker")
+    if cpu_affinity:
+        try:
+            psutil.Process().cpu_affinity(cpu_affinity)
+        except (AttributeError, psutil.Error) as e:
+            # cpu_affinity is not available on every platform (e.g. macOS)
+            worker_logger.warning(f"Could not pin worker to CPUs {cpu_affinity}: {e}")
+
+    if preload:
+        try:
+            _, load_seconds = transcriber.get_model(cpu_threads, engine, model, compute_type)
+            worker_logger.info(f"Model {model} ({compute_type}) preloaded in {load_seconds:.2f}s")
+        except Exception as e:
+            # Not fatal: the first job will retry the load and report the error itself
+            worker_logger.error(f"Model preload failed: {e}")
+
+    while True:
+        try:
+            cmd, payload = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        if cmd == "stop":
+            break
+        elif cmd == "load":
+            # Warm-up of a worker that was spawned before the model was available
+            try:
+                _, load_seconds = transcriber.get_model(cpu_threads, engine, model, compute_type)
+                conn.send({"status": "loaded", "load_seconds": round(load_seconds, 3)})
+            except Exception as e:
+                worker_logger.error(f"Model load failed: {e}")
+                conn.send({"status": "error", "error": str(e)})
+        elif cmd == "transcribe":
+            # payload["profile"]: record spans and return them with the result (merged into the job's trace)
+            chunk_index = payload.get("chunk_index")
+            unit = "transcribe" if chunk_index is None else f"chunk {chunk_index}"
+            trace = Trace(payload.pop("profile", False), lane=unit)
+            profile_path = PROFILE_DIR / f"{payload.get('job_id')}_{unit.replace(' ', '')}_{time.time_ns()}.prof"
+            start = time.perf_counter()
+            with cprofile_to(profile_path) if PROFILE_CPROFILE else nullcontext():
+                result = transcriber.run_transcription(
+                    progress_queue=progress_queue, cpu_threads=cpu_threads, engine=engine,
+                    model=model, compute_type=compute_type, trace=trace, **payload
+                )
+            trace.add_span("run_transcription", start, time.perf_counter(), status=result.get("status"))
+            if trace.enabled:
+                result["trace"] = trace.events
+            conn.send(result)
+        elif cmd == "transcribe_batch":
+            # Several short jobs decoded together; the spans are shared by every job of the batch
+            trace = Trace(payload.pop("profile", False), lane="batch")
+            start = time.perf_counter()
+            result = transcriber.run_batch(
+                progress_queue=progress_queue, cpu_threads=cpu_threads, engine=engine,
+                model=model, compute_type=compute_type, trace=trace, **payload
+            )
+            trace.add_span("run_batch", start, time.perf_counter(), jobs=len(payload["units"]))
+            if trace.enabled:
+                result["trace"] = trace.events
+            conn.send(result)
+        else:
+            conn.send({"status": "error", "error": f"Unknown worker command: {cmd}", "text": None})
+
+    conn.close()
+
+
+class TranscriptionWorker:
+    """
+    Long-lived process that keeps the Whisper model loaded between jobs.
+    Jobs are sent over a Pipe command channel; progress flows back through the worker's ProgressChannel pipe.
+    The process is recycled after `max_jobs` jobs or once its RSS exceeds `max_rss_mb`.
+    """
+
+    def __init__(
+        self,
+        progress_conn,
+        cpu_threads: int = 0,
+        cpu_affinity: Optional[List[int]] = None,
+        max_jobs: int = WORKER_MAX_JOBS,
+        max_rss_mb: int = WORKER_MAX_RSS_MB,
+        engine: str = TRANSCRIPTION_ENGINE,
+        model: str = WHISPER_MODEL,
+        compute_type: str = WHISPER_COMPUTE_TYPE
+    ):
+        self.progress_conn = progress_conn
+        self.engine = engine
+        self.model = model
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.cpu_affinity = cpu_affinity
+        self.max_jobs = max_jobs
+        self.max_rss_mb = max_rss_mb
+        self.jobs_served = 0
+        self._process: Optional[multiprocessing.Process] = None
+        self._conn = None
+        self._preload = False
+        # Job currently running on this worker, and whether preempt() killed it
+        self.current_job_id: Optional[str] = None
+        self._preempted = False
+        # Serializes access to the command channel (one job at a time per worker)
+        self._lock = threading.Lock()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._process.pid if self._process else None
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self, preload: bool = False):
+        """Spawns the worker process. With preload=True the model is loaded right away in the background."""
+        with self._lock:
+            self._preload = preload
+            self._spawn()
+
+    def _spawn(self):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_worker_main,
+            args=(
+                child_conn, self.progress_conn, self._preload, self.cpu_threads, self.cpu_affinity, self.engine,
+                self.model, self.compute_type
+            ),
+            name="AuraTranscribeWorker",
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self.jobs_served = 0
+        logger.info(
+            f"Transcription worker started (PID {self._process.pid}, model={self.model}/{self.compute_type}, "
+            f"threads={self.cpu_threads or 'auto'}, "
+            f"cpus={self.cpu_affinity or 'any'}, preload={self._preload})"
+        )
+
+    def _shutdown(self, timeout: float = 5.0):
+        if self._process is None:
+            return
+        try:
+            self._conn.send(("stop", None))
+        except Exception:
+            pass
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout)
+        self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def stop(self):
+        with self._lock:
+            self._shutdown()
+
+    def configure(self, model: str, compute_type: str, cpu_threads: int):
+        """Switches the model this worker runs; a live process is replaced by a warm one with the new setup."""
+        with self._lock:
+            if (model, compute_type, cpu_threads) == (self.model, self.compute_type, self.cpu_threads):
+                return
+            self.model, self.compute_type, self.cpu_threads = model, compute_type, cpu_threads
+            if self.is_alive():
+                self._shutdown()
+                self._preload = True
+                self._spawn()
+
+    def preempt(self):
+        """
+        Hard-stops whatever the worker is running by killing its process. Safe to call while run() is
+        blocked in another thread: run() then respawns a warm worker and reports the job as cancelled.
+        """
+        process = self._process
+        if process is not None and process.is_alive():
+            self._preempted = True
+            process.kill()
+
+    def rss_bytes(self) -> int:
+        try:
+            return psutil.Process(self.pid).memory_info().rss if self.is_alive() else 0
+        except psutil.Error:
+            return 0
+
+    def _should_recycle(self) -> bool:
+        if self.jobs_served >= self.max_jobs:
+            logger.info(f"Recycling transcription worker after {self.jobs_served} jobs")
+            return True
+        rss_mb = self.rss_bytes() / 1_048_576
+        if rss_mb > self.max_rss_mb:
+            logger.info(f"Recycling transcription worker at {rss_mb:.0f} MB RSS (limit {self.max_rss_mb} MB)")
+            return True
+        return False
+
+    def warm(self) -> Dict[str, Any]:
+        """
+        Blocking call: loads the model in the worker now (spawning it if needed), so the next job finds it warm.
+        A worker busy with a job answers once that job is done; its model is loaded by then anyway.
+        """
+        return self._request("load", {}, None, jobs=0)
+
+    def run(self, **payload) -> Dict[str, Any]:
+        """
+        Blocking call: sends a transcription job to the worker and waits for its result.
+        Intended to be run from a thread (e.g. loop.run_in_executor).
+        """
+        return self._request("transcribe", payload, payload.get("job_id"))
+
+    def run_batch(self, units: List[Dict[str, Any]], **payload) -> Dict[str, Any]:
+        """
+        Blocking call: transcribes several short jobs in one batched decode (see transcriber.run_batch).
+        Returns {"results": {job_id: result}, "timings": {...}}. A batch is never preempted: it is
+        short, and killing it would cancel the other jobs in it too.
+        """
+        result = self._request("transcribe_batch", {"units": units, **payload}, None, jobs=len(units))
+        if "results" not in result:
+            # The worker died: every job of the batch gets its error
+            result = {"results": {unit["job_id"]: result for unit in units}, "timings": {}}
+        return result
+
+    def _request(self, cmd: str, payload: Dict[str, Any], job_id: Optional[str], jobs: int = 1) -> Dict[str, Any]:
+        with self._lock:
+            if not self.is_alive():
+                self._spawn()
+
+            self._preempted = False
+            self.current_job_id = job_id
+            try:
+                self._conn.send((cmd, payload))
+                result = self._conn.recv()
+            except (EOFError, OSError) as e:
+                self._shutdown(timeout=1.0)
+                if self._preempted:
+                    logger.info(f"Transcription worker preempted while running job {job_id}")
+                    # Bring a warm replacement up right away, off the cancelled job's critical path
+                    self._preload = True
+                    self._spawn()
+                    return {"status": "cancelled", "text": None}
+                logger.error(f"Transcription worker died while running {f'job {job_id}' if job_id else 'a batch'}: {e}")
+                return {"status": "error", "error": "Transcription worker exited unexpectedly", "text": None}
+            finally:
+                self.current_job_id = None
+
+            self.jobs_served += jobs
+            if self._should_recycle():
+                # Respawn right away so the next job finds a warm model again
+                self._shutdown()
+                self._preload = True
+                self._spawn()
+            return result
+
+
+def _partition_cpus(size: int, cpu_threads: int, pin: bool):
+    """
+    Splits the available cores between `size` workers.
+    Returns (threads_per_worker, [affinity per worker]); affinities are None unless pinning is requested.
+    """
+    try:
+        cpus = sorted(psutil.Process().cpu_affinity())
+    except (AttributeError, psutil.Error):
+        cpus = list(range(psutil.cpu_count() or 1))
+
+    share = max(1, len(cpus) // size)
+    threads = cpu_threads or share
+    if not pin:
+        return threads, [None] * size
+
+    affinities = []
+    for i in range(size):
+        chunk = cpus[i * share:(i + 1) * share]
+        affinities.append(chunk or [cpus[i % len(cpus)]])
+    return threads, affinities
+
+
+class WorkerPool:
+    """
+    Fixed set of TranscriptionWorkers, each owning a fixed share of the CPU threads.
+    Workers are handed out with acquire()/release() and the pool keeps throughput stats
+    for its configuration (workers x threads, pinned or not).
+    """
+
+    def __init__(
+        self,
+        progress_channel: ProgressChannel,
+        size: int = TRANSCRIPTION_WORKERS,
+        cpu_threads: int = WORKER_CPU_THREADS,
+        pin_cpus: bool = WORKER_PIN_CPUS,
+        engine: str = TRANSCRIPTION_ENGINE
+    ):
+        self.size = max(1, size)
+        self.pin_cpus = pin_cpus
+        self.cpu_threads, affinities = _partition_cpus(self.size, cpu_threads, pin_cpus)
+        self.workers = [
+            TranscriptionWorker(
+                progress_channel.new_sender(), cpu_threads=self.cpu_threads, cpu_affinity=affinity, engine=engine
+            )
+            for affinity in affinities
+        ]
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for w in self.workers:
+            self._idle.put_nowait(w)
+
+        # Throughput accounting: audio seconds transcribed over the time at least one worker was busy
+        self._active = 0
+        self._busy_since = 0.0
+        self._busy_seconds = 0.0
+        self._jobs_done = 0
+        self._audio_seconds = 0.0
+
+    @property
+    def active_workers(self) -> int:
+        return self._active
+
+    def is_alive(self) -> bool:
+        return all(w.is_alive() for w in self.workers)
+
+    def start(self, preload: bool = False):
+        for w in self.workers:
+            if not w.is_alive():
+                w.start(preload)
+
+    def stop(self):
+        for w in self.workers:
+            w.stop()
+
+    def configure_model(self, model: str, compute_type: str, cpu_threads: int = 0):
+        """
+        Points every worker at a model size / compute type (as chosen by model_manager.select_model_config).
+        cpu_threads=0 keeps the pool's own share of the cores. Blocks while a worker finishes its current job.
+        """
+        self.cpu_threads = cpu_threads or self.cpu_threads
+        for w in self.workers:
+            w.configure(model, compute_type, self.cpu_threads)
+
+    async def acquire(self) -> TranscriptionWorker:
+        worker = await self._idle.get()
+        if self._active == 0:
+            self._busy_since = time.perf_counter()
+        self._active += 1
+        return worker
+
+    def release(self, worker: TranscriptionWorker, audio_seconds: float = 0.0):
+        """Returns a worker to the pool; audio_seconds is how much audio it transcribed for the job."""
+        self._active -= 1
+        if self._active == 0:
+            self._busy_seconds += time.perf_counter() - self._busy_since
+        if audio_seconds:
+            self._jobs_done += 1
+            self._audio_seconds += audio_seconds
+        self._idle.put_nowait(worker)
+
+    def throughput(self) -> Dict[str, Any]:
+        """Throughput of this pool configuration, expressed as audio seconds per wall-clock second."""
+        busy = self._busy_seconds
+        if self._active:
+            busy += time.perf_counter() - self._busy_since
+        return {
+            "workers": self.size,
+            "model": self.workers[0].model,
+            "compute_type": self.workers[0].compute_type,
+            "cpu_threads_per_worker": self.cpu_threads,
+            "pinned": self.pin_cpus,
+            "jobs_completed": self._jobs_done,
+            "audio_seconds": round(self._audio_seconds, 1),
+            "busy_seconds": round(busy, 1),
+            "realtime_factor": round(self._audio_seconds / busy, 2) if busy > 0 else 0.0
+        }
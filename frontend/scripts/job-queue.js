@@ -24,6 +24,7 @@ document.addEventListener("DOMContentLoaded", () => {
     const audioProgressBar = document.getElementById("audio-progress-bar");
     const audioProgressText = document.getElementById("audio-progress-text");
     const audioEta = document.getElementById("audio-eta");
+    const liveTranscript = document.getElementById("live-transcript");
 
     const batchProgressBar = document.getElementById("batch-progress-bar");
     const batchProgressText = document.getElementById("batch-progress-text");
@@ -48,8 +49,11 @@ document.addEventListener("DOMContentLoaded", () => {
 
     // -- State --
     let currentJobId = null;
+    let transcribingJobId = null;
     let completedJobIds = [];
     let isPaused = false;
+    // A paused job releases its worker, so other files keep transcribing; the controls stay on the paused one
+    let pausedJobId = null;
     let completedFilenames = [];
     let expectedBatchTotal = 0;
     let isSingleFileUpload = false;
@@ -57,6 +61,7 @@ document.addEventListener("DOMContentLoaded", () => {
     let renderedFileKeys = new Set();
     let selectedExportJobIds = new Set();
     const completedTextsByJobId = new Map();
+    const liveSegmentsByJobId = new Map();
     let selectedExportFolder = null;
 
     // -- Radio Group Selection --
@@ -276,11 +281,12 @@ document.addEventListener("DOMContentLoaded", () => {
             audioEta.innerText = "Calculating...";
             batchProgressBar.style.width = "0%";
             batchProgressText.innerText = `0 / ${expectedBatchTotal} files`;
+            liveTranscript.innerText = "";
             spinner.classList.remove("paused");
             isPaused = false;
             updatePauseResumeButton();
 
-            const res = await fetch("/api/transcription/upload", {
+            const res = await fetch(`/api/transcription/upload?total=${expectedBatchTotal}`, {
                 method: "POST",
                 body: formData
             });
@@ -301,18 +307,30 @@ document.addEventListener("DOMContentLoaded", () => {
     // -- WebSocket Event Handlers --
     window.wsClient.on("status_change", (data) => {
         if (data.status === "extracting") {
-            currentJobId = data.job_id;
-            currentFileLabel.innerText = window.i18n.t("processing_extracting");
+            // Upcoming files are extracted ahead of time; keep the controls bound to the file being transcribed
+            if (!transcribingJobId && !pausedJobId) {
+                currentJobId = data.job_id;
+                currentFileLabel.innerText = window.i18n.t("processing_extracting");
+            }
         } else if (data.status === "transcribing") {
+            if (data.job_id !== transcribingJobId) renderLiveTranscript(data.job_id);
+            transcribingJobId = data.job_id;
+            if (pausedJobId && data.job_id !== pausedJobId) return;
+            pausedJobId = null;
             currentJobId = data.job_id;
             isPaused = false;
             updatePauseResumeButton();
             spinner.classList.remove("paused");
         } else if (data.status === "paused") {
+            if (data.job_id === transcribingJobId) transcribingJobId = null;
+            pausedJobId = data.job_id;
+            currentJobId = data.job_id;
             isPaused = true;
             updatePauseResumeButton();
             spinner.classList.add("paused");
         } else if (data.status === "cancelled" || data.status === "error") {
+            if (data.job_id === transcribingJobId) transcribingJobId = null;
+            if (data.job_id === pausedJobId) pausedJobId = null;
             if (data.status === "error") alert(`Error processing file: ${data.error_message}`);
             uploadPanel.classList.remove("hidden");
             processingPanel.classList.add("hidden");
@@ -320,7 +338,7 @@ document.addEventListener("DOMContentLoaded", () => {
     });
 
     window.wsClient.on("progress", (data) => {
-        currentJobId = data.job_id;
+        if (!pausedJobId) currentJobId = data.job_id;
         const pAudio = (data.audio_progress * 100).toFixed(1);
 
         audioProgressBar.style.width = `${pAudio}%`;
@@ -335,14 +353,33 @@ document.addEventListener("DOMContentLoaded", () => {
 
         const filesLabel = window.i18n.t("export_count_suffix").split(" ")[0];
         batchProgressText.innerText = `${data.batch_current} / ${data.batch_total} ${filesLabel}`;
+        if (data.batch_total > 1 && data.batch_eta_seconds > 0) {
+            batchProgressText.innerText += ` [${formatTime(data.batch_eta_seconds)} ${etaPrefix}]`;
+        }
 
         currentFileLabel.innerText = `${window.i18n.t("processing_transcribing")} ${data.batch_current}...`;
     });
 
+    // Segments arrive as soon as they are decoded; show the tail of the current file's transcript
+    window.wsClient.on("segment", (data) => {
+        if (!liveSegmentsByJobId.has(data.job_id)) liveSegmentsByJobId.set(data.job_id, []);
+        liveSegmentsByJobId.get(data.job_id).push(data);
+        if (data.job_id === transcribingJobId) renderLiveTranscript(data.job_id);
+    });
+
+    function renderLiveTranscript(jobId) {
+        const segments = [...(liveSegmentsByJobId.get(jobId) || [])].sort((a, b) => a.start - b.start);
+        const text = segments.map(s => s.text).join("").trim();
+        liveTranscript.innerText = text.length > 240 ? "…" + text.slice(-240) : text;
+    }
+
     window.wsClient.on("completed", (data) => {
+        if (data.job_id === transcribingJobId) transcribingJobId = null;
         completedJobIds.push(data.job_id);
         completedFilenames.push(data.filename);
+        // The final text is fetched from text_url on demand (see setSingleTranscriptView)
         completedTextsByJobId.set(data.job_id, data.text || "");
+        liveSegmentsByJobId.delete(data.job_id);
 
         if (completedJobIds.length >= expectedBatchTotal) {
             showExportPanel();
@@ -369,6 +406,13 @@ document.addEventListener("DOMContentLoaded", () => {
         if (!currentJobId) return;
         const endpoint = isPaused ? "resume" : "pause";
         fetch(`/api/transcription/${currentJobId}/${endpoint}`, { method: "POST" }).catch(console.error);
+        if (isPaused) {
+            // The job goes back into the queue; its "transcribing" event rebinds the controls
+            pausedJobId = null;
+            isPaused = false;
+            updatePauseResumeButton();
+            spinner.classList.remove("paused");
+        }
     });
 
     btnCancelJob.addEventListener("click", () => {
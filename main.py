@@ -144,6 +144,12 @@ if __name__ == "__main__":
     import multiprocessing
     multiprocessing.freeze_support()
 
+    if "--autotune" in sys.argv:
+        # Benchmarks the installed models on this machine and exits (see core/autotune.py)
+        from core.autotune import main as autotune_main
+        autotune_main([arg for arg in sys.argv[1:] if arg != "--autotune"])
+        sys.exit(0)
+
     # Kill any stale instance holding the port
     kill_process_on_port(FASTAPI_PORT)
 
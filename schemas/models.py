@@ -3,8 +3,9 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from concurrent.futures import Future
 import multiprocessing
+import time
 import uuid
-from typing import Optional, Any
+from typing import Optional, Any, Dict, List
 
 class JobStatus(str, Enum):
     QUEUED       = "queued"
@@ -31,6 +32,27 @@ class Job:
     detected_language: Optional[str]     = None
     duration_seconds: Optional[float]    = None
     error: Optional[str]                 = None
+    stage_timings: Dict[str, float]      = field(default_factory=dict)   # seconds per pipeline stage
+    created_at: float                    = field(default_factory=time.time)
+    batch_id: Optional[str]              = None   # jobs submitted in one request share it (fair scheduling)
+    priority: int                        = 0      # higher is dispatched first, whatever the policy
+    speech_ratio: Optional[float]        = None   # share of the audio the VAD kept for decoding
+    vad_saved_seconds: Optional[float]   = None   # estimated decoding time the VAD saved
     _process_future: Optional[Future]    = field(default=None, repr=False)
     _pause_event: Any = field(default=None, repr=False)
     _cancel_event: Any = field(default=None, repr=False)
+    _cache_key: Optional[str] = field(default=None, repr=False)   # transcript cache key, set on admission
+    _content_fingerprint: Optional[str] = field(default=None, repr=False)   # known up front for streamed uploads
+    _fingerprint_task: Any = field(default=None, repr=False)   # shared by admission and the probe
+    _probe_task: Any = field(default=None, repr=False)   # duration probe started at submit time
+    _stream_audio: bool = field(default=False, repr=False)   # decode in the worker instead of extracting a WAV
+    _workers: List[Any] = field(default_factory=list, repr=False)   # workers currently running this job
+    _cancel_requested_at: Optional[float] = field(default=None, repr=False)   # perf_counter() at cancel_job
+    _queued_at: Optional[float] = field(default=None, repr=False)   # perf_counter() when handed to the scheduler
+    _ready_at: Optional[float] = field(default=None, repr=False)    # perf_counter() when put on the ready queue
+    _batched_at: Optional[float] = field(default=None, repr=False)  # perf_counter() when handed to the batcher
+    _speech_regions: Optional[List[Any]] = field(default=None, repr=False)   # energy VAD: (start, end) found at extraction
+    _trace: Any = field(default=None, repr=False)   # core.profiler.Trace, recording only when PROFILING is on
+    _segment_seq: int = field(default=0, repr=False)   # segments streamed over the WebSocket so far
+    _chunk_weights: List[float] = field(default_factory=list, repr=False)   # long files: seconds per chunk
+    _chunk_progress: List[float] = field(default_factory=list, repr=False)  # long files: 0.0 → 1.0 per chunk
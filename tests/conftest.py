@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+import pytest
+
+DIM = 64
+# English-only vocabulary: some text tokens, Whisper's special tokens, then the 1501 timestamps right after
+# <|notimestamps|>, which is where both CTranslate2 and faster-whisper look for them
+TEXT_TOKENS = 200
+SPECIAL_TOKENS = ["<|endoftext|>", "<|startoftranscript|>", "<|translate|>", "<|transcribe|>", "<|startoflm|>",
+                  "<|startofprev|>", "<|nocaptions|>", "<|notimestamps|>"]
+VOCABULARY = [f"w{i}" for i in range(TEXT_TOKENS)] + SPECIAL_TOKENS + [f"<|{i * 0.02:.2f}|>" for i in range(1501)]
+
+
+def _whisper_spec(vocabulary, dtype: str, seed: int):
+    """A one-layer Whisper with random weights: small enough to build here, same variable layout as the real ones."""
+    from ctranslate2.specs import whisper_spec
+
+    rng = np.random.default_rng(seed)
+
+    def w(*shape):
+        return (rng.standard_normal(shape) * 0.1).astype(np.float32)
+
+    def linear(layer, out_dim, in_dim):
+        layer.weight, layer.bias = w(out_dim, in_dim), w(out_dim)
+
+    def norm(layer):
+        layer.gamma, layer.beta = 1 + w(DIM), w(DIM)
+
+    spec = whisper_spec.WhisperSpec(1, 2, 1, 2)
+    encoder, decoder = spec.encoder, spec.decoder
+    encoder.conv1.weight, encoder.conv1.bias = w(DIM, 80, 3), w(DIM)
+    encoder.conv2.weight, encoder.conv2.bias = w(DIM, DIM, 3), w(DIM)
+    encoder.position_encodings.encodings = w(1500, DIM)
+    norm(encoder.layer_norm)
+    norm(decoder.layer_norm)
+    for layer in encoder.layer + decoder.layer:
+        norm(layer.self_attention.layer_norm)
+        norm(layer.ffn.layer_norm)
+        linear(layer.self_attention.linear[0], 3 * DIM, DIM)
+        linear(layer.self_attention.linear[1], DIM, DIM)
+        linear(layer.ffn.linear_0, 4 * DIM, DIM)
+        linear(layer.ffn.linear_1, DIM, 4 * DIM)
+    for layer in decoder.layer:
+        norm(layer.attention.layer_norm)
+        linear(layer.attention.linear[0], DIM, DIM)
+        linear(layer.attention.linear[1], 2 * DIM, DIM)
+        linear(layer.attention.linear[2], DIM, DIM)
+    decoder.embeddings.weight = w(len(vocabulary), DIM)
+    decoder.position_encodings.encodings = w(448, DIM)
+    decoder.projection.weight = decoder.embeddings.weight
+    decoder.projection.bias = np.zeros(len(vocabulary), np.float32)
+
+    spec.register_vocabulary(vocabulary)
+    spec.validate()
+    spec.optimize(quantization=dtype)
+    return spec
+
+
+@pytest.fixture
+def make_whisper_model():
+    """
+    Saves a tiny random Whisper to a directory, as CTranslate2's converter would, plus a word-level
+    tokenizer.json so faster-whisper can load it too. Decodes are gibberish but deterministic.
+    """
+    pytest.importorskip("ctranslate2")
+
+    def make(path, dtype: str = "float16", seed: int = 0):
+        path.mkdir(parents=True, exist_ok=True)
+        _whisper_spec(VOCABULARY, dtype, seed).save(str(path))
+        tokenizer = {
+            "version": "1.0", "truncation": None, "padding": None, "added_tokens": [], "normalizer": None,
+            "pre_tokenizer": {"type": "WhitespaceSplit"}, "post_processor": None, "decoder": None,
+            "model": {"type": "WordLevel", "vocab": {token: i for i, token in enumerate(VOCABULARY)}, "unk_token": "w0"},
+        }
+        (path / "tokenizer.json").write_text(json.dumps(tokenizer), encoding="utf-8")
+        return path
+
+    return make
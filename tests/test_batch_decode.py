@@ -0,0 +1,120 @@
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+ctranslate2 = pytest.importorskip("ctranslate2")
+
+from faster_whisper import WhisperModel
+
+from core import transcriber
+from core.media_processor import SAMPLE_RATE
+
+
+class _Recorder:
+    """Stands in for WhisperModel.model and records every generate call with what it returned."""
+
+    def __init__(self, model):
+        self.model = model
+        self.calls = []
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def generate(self, encoder_output, prompts, **options):
+        results = self.model.generate(encoder_output, prompts, **options)
+        self.calls.append({
+            "encoder_output": np.array(encoder_output),
+            "prompts": prompts,
+            "options": {k: list(v) if isinstance(v, tuple) else v for k, v in options.items()},
+            "results": [(r.sequences_ids, r.scores, r.no_speech_prob) for r in results],
+        })
+        return results
+
+
+@pytest.fixture
+def model_dir(tmp_path, make_whisper_model):
+    return make_whisper_model(tmp_path / "tiny")
+
+
+def _load(model_dir):
+    """
+    A fresh model for each run: the temperature fallbacks sample, and CTranslate2 seeds a thread's
+    random generator once, when the model's threads start.
+    """
+    ctranslate2.set_random_seed(0)
+    whisper = WhisperModel(str(model_dir), device="cpu", compute_type="int8", cpu_threads=1)
+    whisper.model = _Recorder(whisper.model)
+    return whisper
+
+
+def _token(model_dir, token):
+    return json.loads((model_dir / "vocabulary.json").read_text()).index(token)
+
+
+def _clip(seconds, seed=0):
+    return (np.random.default_rng(seed).standard_normal(int(seconds * SAMPLE_RATE)) * 0.1).astype(np.float32)
+
+
+def _sequential(model_dir, audio, **options):
+    """transcribe() on its own: the generate calls and segments of its first 30 s window, and its language."""
+    whisper = _load(model_dir)
+    segments, info = whisper.transcribe(audio, task="transcribe", vad_filter=False, **{**transcriber.DECODE_OPTIONS, **options})
+    first = [seg for seg in segments if seg.seek == 0]
+    return list(whisper.model.calls), first, info.language
+
+
+def _batched(model_dir, windows, languages, previous):
+    whisper = _load(model_dir)
+    decoded = transcriber._decode_windows(whisper, windows, languages, previous)
+    return list(whisper.model.calls), decoded
+
+
+# The random model never gets past the default thresholds, so every temperature is tried; with lenient ones
+# the beam search result is kept and prompts the next window
+LENIENT = {"log_prob_threshold": -20.0, "compression_ratio_threshold": 100.0}
+
+
+@pytest.mark.parametrize("thresholds", [{}, LENIENT], ids=["fallbacks", "first-pass"])
+@pytest.mark.parametrize("seconds", [8.0, 30.0])
+def test_window_decodes_like_transcribe(model_dir, monkeypatch, seconds, thresholds):
+    monkeypatch.setattr(transcriber, "DECODE_OPTIONS", {**transcriber.DECODE_OPTIONS, **thresholds})
+    audio = _clip(seconds)
+    calls, first, language = _sequential(model_dir, audio, language="en")
+    batched_calls, [(segments, batched_language, tokens)] = _batched(model_dir, [audio], ["en"], [[]])
+
+    # Same encoder input, prompt and options, and the same temperatures tried
+    assert 1 <= len(batched_calls) <= len(calls)
+    assert len(batched_calls) == (1 if thresholds else len(transcriber.DECODE_OPTIONS["temperature"]))
+    for ours, theirs in zip(batched_calls, calls):
+        assert np.array_equal(ours["encoder_output"], theirs["encoder_output"])
+        assert ours["prompts"] == theirs["prompts"]
+        assert ours["options"] == theirs["options"]
+        assert ours["results"] == theirs["results"]
+    # ...the same segments, plus at most one left open at the end, which the sequential path decodes again
+    assert first and [(s.start, s.end, s.text) for s in first] == segments[:len(first)]
+    assert len(segments) - len(first) <= 1
+    assert batched_language == language
+
+    # The next window is prompted with the kept segments' tokens, as transcribe() would, or not at all
+    # after a hot fallback
+    if first[0].temperature > transcriber.DECODE_OPTIONS["prompt_reset_on_temperature"]:
+        assert tokens == []
+    else:
+        assert tokens[:sum(len(s.tokens) for s in first)] == [t for s in first for t in s.tokens]
+        assert len(tokens) > sum(len(s.tokens) for s in first) or len(segments) == len(first)
+
+
+def test_previous_tokens_go_in_front_of_the_prompt(model_dir):
+    calls, _ = _batched(model_dir, [_clip(5.0)], ["en"], [[1, 2, 3]])
+    assert calls[0]["prompts"][0][:4] == [_token(model_dir, "<|startofprev|>"), 1, 2, 3]
+
+
+def test_english_only_model_reports_english(model_dir):
+    audio = _clip(5.0)
+    _, [(_, language, _)] = _batched(model_dir, [audio], ["es"], [[]])
+    assert language == "en"
+    _, [(_, language, _)] = _batched(model_dir, [audio], [None], [[]])
+    assert language == "en"
+
@@ -0,0 +1,137 @@
+import json
+import threading
+import wave
+
+import numpy as np
+import pytest
+
+from core import checkpoint
+from core.checkpoint import CheckpointJournal, discard_checkpoints, has_checkpoint, journal_path
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_DIR", tmp_path)
+    return tmp_path
+
+
+def _journal(path, language, segments, torn=None):
+    lines = [json.dumps({"language": language})] + [json.dumps(seg) for seg in segments]
+    path.write_text("".join(line + "\n" for line in lines) + (torn or ""), encoding="utf-8")
+
+
+def test_load_returns_language_and_segments():
+    path = journal_path("key")
+    segments = [{"start": 0.0, "end": 5.0, "text": " Hola."}, {"start": 5.0, "end": 9.5, "text": " Adiós."}]
+    _journal(path, "es", segments)
+    assert CheckpointJournal(path).load() == ("es", segments)
+
+
+def test_torn_last_line_is_cut_off_and_appends_stay_readable():
+    path = journal_path("key")
+    _journal(path, "es", [{"start": 0.0, "end": 5.0, "text": " Hola."}], torn='{"start": 5.0, "end": 9')
+
+    journal = CheckpointJournal(path)
+    language, segments = journal.load()
+    assert language == "es" and [seg["end"] for seg in segments] == [5.0]
+    assert path.read_bytes().endswith(b"\n")
+
+    journal.append({"start": 5.0, "end": 8.0, "text": " Sigo."})
+    journal.close()
+    assert [seg["end"] for seg in CheckpointJournal(path).load()[1]] == [5.0, 8.0]
+
+
+def test_complete_line_with_bad_json_ends_the_journal():
+    path = journal_path("key")
+    _journal(path, "en", [{"start": 0.0, "end": 2.0, "text": " One."}], torn="not json\n")
+    path.write_text(path.read_text() + json.dumps({"start": 2.0, "end": 3.0, "text": " Two."}) + "\n")
+    assert [seg["text"] for seg in CheckpointJournal(path).load()[1]] == [" One."]
+
+
+def test_language_is_recorded_once():
+    path = journal_path("key")
+    journal = CheckpointJournal(path)
+    journal.start("es")
+    journal.append({"start": 0.0, "end": 1.0, "text": " Uno."})
+    journal.start("es")
+    journal.close()
+    assert path.read_text().count("language") == 1
+
+
+def test_discard_removes_whole_file_and_chunk_journals_only_of_that_key(checkpoint_dir):
+    for path in (journal_path("abc"), journal_path("abc", 0), journal_path("abc", 3), journal_path("xyz", 0)):
+        _journal(path, "es", [])
+    assert has_checkpoint("abc")
+
+    discard_checkpoints("abc")
+    assert not has_checkpoint("abc")
+    assert sorted(p.name for p in checkpoint_dir.iterdir()) == ["xyz.chunk0.jsonl"]
+    discard_checkpoints(None)
+    assert has_checkpoint("xyz")
+
+
+class _Progress:
+    def __init__(self):
+        self.messages = []
+
+    def put(self, msg):
+        self.messages.append(msg)
+
+
+def _run(wav, seconds, **kwargs):
+    pytest.importorskip("faster_whisper")
+    from core import transcriber
+
+    pause, cancel = threading.Event(), threading.Event()
+    pause.set()
+    progress = _Progress()
+    result = transcriber.run_transcription("job", wav, "es", seconds, pause, cancel, progress,
+                                           engine="stub", checkpoint_key="key", vad="off", **kwargs)
+    return result, progress
+
+
+@pytest.fixture
+def wav(tmp_path, monkeypatch):
+    pytest.importorskip("faster_whisper")
+    from core import transcriber
+
+    monkeypatch.setattr(transcriber, "_model", None)
+    path = tmp_path / "audio.wav"
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(np.zeros(16000 * 20, dtype=np.int16).tobytes())
+    return path
+
+
+def test_resume_continues_after_the_last_committed_segment(wav):
+    committed = [{"start": 0.0, "end": 5.0, "text": " Antes."}, {"start": 5.0, "end": 7.5, "text": " Antes."}]
+    _journal(journal_path("key"), "es", committed)
+
+    result, progress = _run(wav, 20.0)
+    assert result["status"] == "completed"
+    assert result["segments"][:2] == committed
+    new = result["segments"][2:]
+    assert new and new[0]["start"] == 7.5 and new[-1]["end"] == 20.0
+    # Only the new segments are streamed again
+    assert [m["start"] for m in progress.messages if m["event"] == "segment"] == [seg["start"] for seg in new]
+    # ...and appended to the same journal
+    assert CheckpointJournal(journal_path("key")).load()[1] == result["segments"]
+
+
+def test_resume_of_a_fully_committed_unit_decodes_nothing(wav):
+    committed = [{"start": 0.0, "end": 19.5, "text": " Todo."}]
+    _journal(journal_path("key"), "es", committed)
+
+    result, progress = _run(wav, 20.0)
+    assert result["status"] == "completed" and result["segments"] == committed
+    assert progress.messages == []
+
+
+def test_chunk_resumes_from_its_own_journal(wav):
+    _journal(journal_path("key", 1), "es", [{"start": 10.0, "end": 12.0, "text": " Trozo."}])
+
+    result, _ = _run(wav, 10.0, start_seconds=10.0, end_seconds=20.0, chunk_index=1)
+    starts = [seg["start"] for seg in result["segments"]]
+    assert starts[0] == 10.0 and starts[1] == 12.0 and result["segments"][-1]["end"] == 20.0
@@ -0,0 +1,107 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import textwrap
+import wave
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Each phase is its own process: config (and so every data path) is read from AURA_DATA_DIR at import,
+# in the test process and in the workers alike
+_CRASH = textwrap.dedent("""
+    import asyncio, hashlib, json, sys
+    from pathlib import Path
+    from core.checkpoint import CheckpointJournal, journal_path
+    from core.job_manager import JobManager
+    from schemas.models import Job, JobStatus
+
+    async def main(media):
+        manager = JobManager(engine="stub", vad_mode="off")
+        manager.store.open()
+        # An upload: its fingerprint is the SHA256 computed while it landed, not the sampled one
+        job = Job(original_filename=media.name, original_path=media, status=JobStatus.TRANSCRIBING,
+                  _content_fingerprint="sha256:" + hashlib.sha256(media.read_bytes()).hexdigest())
+        await manager._complete_from_cache(job)
+        # The worker had committed one segment when the app went down
+        journal = CheckpointJournal(journal_path(job._cache_key))
+        journal.start("es")
+        journal.append({"start": 0.0, "end": 5.0, "text": " Before the restart."})
+        journal.close()
+        manager.store.save(job)
+        manager.store.close()
+        manager.manager.shutdown()
+        print(json.dumps({"job_id": job.id, "cache_key": job._cache_key}))
+
+    asyncio.run(main(Path(sys.argv[1])))
+""")
+
+_RESTART = textwrap.dedent("""
+    import asyncio, json, sys
+    from core.checkpoint import has_checkpoint
+    from core.job_manager import JobManager
+
+    async def main(job_id, cache_key):
+        manager = JobManager(engine="stub", vad_mode="off")
+        done = asyncio.Event()
+
+        async def on_event(event):
+            if event.get("job_id") == job_id and event["event"] in ("completed", "status_change"):
+                if event["event"] == "completed" or event["status"] in ("error", "cancelled"):
+                    done.set()
+
+        manager.add_event_callback(on_event)
+        await manager.start()
+        await asyncio.wait_for(done.wait(), 60)
+        job = await manager.get_job(job_id)
+        # The journal goes in the cleanup that follows the completed event
+        for _ in range(100):
+            if not has_checkpoint(cache_key):
+                break
+            await asyncio.sleep(0.05)
+        report = {
+            "status": job.status.value,
+            "text": job.result_text,
+            "cache_key": job._cache_key,
+            "journal_left": has_checkpoint(cache_key),
+        }
+        await manager.stop()
+        manager.manager.shutdown()
+        print(json.dumps(report))
+
+    asyncio.run(main(*sys.argv[1:]))
+""")
+
+
+def _phase(script, data_dir, *args):
+    env = dict(os.environ, AURA_DATA_DIR=str(data_dir))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    out = subprocess.run([sys.executable, "-c", script, *map(str, args)], cwd=ROOT, env=env,
+                         capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stderr
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.skipif(not shutil.which("ffmpeg") or not shutil.which("ffprobe"), reason="needs ffmpeg")
+def test_restored_upload_resumes_from_its_journal(tmp_path):
+    pytest.importorskip("faster_whisper")
+    media = tmp_path / "upload.wav"
+    with wave.open(str(media), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\x01\x00" * 16000 * 20)
+    data_dir = tmp_path / "data"
+
+    crashed = _phase(_CRASH, data_dir, media)
+    restarted = _phase(_RESTART, data_dir, crashed["job_id"], crashed["cache_key"])
+
+    assert restarted["status"] == "completed"
+    assert restarted["cache_key"] == crashed["cache_key"]
+    # Resumed after the committed segment instead of starting again from 0 s
+    assert restarted["text"].startswith("Before the restart. Segment 0.")
+    assert not restarted["journal_left"]
@@ -0,0 +1,40 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from core import model_manager
+
+
+@pytest.fixture
+def models_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_manager, "MODELS_DIR", tmp_path)
+    return tmp_path
+
+
+def _install(models_dir, model, mb):
+    directory = models_dir / model
+    directory.mkdir()
+    (directory / "model.bin").write_bytes(b"\0" * int(mb * 1_048_576))
+    (directory / "config.json").write_text("{}")
+    return directory
+
+
+def test_model_size_mb(models_dir):
+    assert model_manager.model_size_mb(_install(models_dir, "base", 3)) == 3.0
+    assert model_manager.model_size_mb(models_dir / "medium") is None
+
+
+def test_status_reports_the_selected_model_and_its_size(models_dir, monkeypatch):
+    pytest.importorskip("fastapi")
+    import core.globals
+    from api.model import get_model_status
+
+    _install(models_dir, "small", 2)
+    _install(models_dir, "base", 1)
+    selected = {"model": "base", "compute_type": "int8", "cpu_threads": 2, "source": "autotune"}
+    monkeypatch.setattr(core.globals, "job_manager", SimpleNamespace(model_config=selected))
+
+    status = asyncio.run(get_model_status())
+    assert status["model"] == "base" == status["selected"]["model"]
+    assert status["size_mb"] == 1.0
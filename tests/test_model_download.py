@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core import model_manager
+
+PART = 65536
+MODEL_BIN = os.urandom(5 * PART + 1234)
+FILES = {
+    "config.json": b"{}",
+    "tokenizer.json": b'{"model": {}}',
+    "vocabulary.txt": b"a\nb\n",
+    "model.bin": MODEL_BIN,
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Serves FILES with Range support, like the Hugging Face file server. Once `budget` bytes of model.bin
+    have gone out, the connection drops partway through the response.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        data = FILES.get(self.path.rsplit("/", 1)[-1])
+        if data is None:
+            self.send_error(404)
+            return
+        start, end = 0, len(data) - 1
+        header = self.headers.get("Range")
+        if header:
+            first, last = header.split("=", 1)[1].split("-")
+            start, end = int(first), min(int(last or end), end)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+
+        body = data[start:end + 1]
+        with server.lock:
+            if self.path.endswith("model.bin") and header != "bytes=0-0":
+                if server.budget is not None and len(body) > server.budget - server.served:
+                    body = body[:server.budget - server.served]
+                    self.close_connection = True
+                server.ranges.append((start, end + 1))
+                server.served += len(body)
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.lock, httpd.ranges, httpd.served, httpd.budget = threading.Lock(), [], 0, None
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _download(server, model_dir, sha256=hashlib.sha256(MODEL_BIN).hexdigest(), connections=3):
+    return asyncio.run(model_manager.download_model(
+        model="tiny", base_url=f"http://127.0.0.1:{server.server_port}/tiny", model_dir=model_dir,
+        expected_sha256=sha256, connections=connections, part_size=PART
+    ))
+
+
+def test_parts_fetched_over_several_connections_reassemble_the_file(server, tmp_path):
+    assert _download(server, tmp_path)
+    assert (tmp_path / "model.bin").read_bytes() == MODEL_BIN
+    # One range per part, covering the file exactly once
+    assert sorted(server.ranges) == [(i * PART, min(len(MODEL_BIN), (i + 1) * PART)) for i in range(6)]
+    assert server.served == len(MODEL_BIN)
+    assert not (tmp_path / "model.bin.part").exists() and not (tmp_path / "model.bin.part.json").exists()
+    assert model_manager.verify_model(tmp_path, hashlib.sha256(MODEL_BIN).hexdigest(), full=True)
+
+
+def test_interrupted_download_resumes_inside_the_partial_part(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(model_manager, "MODEL_DOWNLOAD_RETRIES", 0)
+    server.budget = PART + 1000
+    assert not _download(server, tmp_path, connections=1)
+    # Part 0 completed; part 1 was cut 1000 bytes in, and its state says so
+    state = json.loads((tmp_path / "model.bin.part.json").read_text())
+    assert state["done"] == {"0": PART, "1": 1000}
+
+    server.budget, server.ranges, server.served = None, [], 0
+    assert _download(server, tmp_path, connections=1)
+    assert (tmp_path / "model.bin").read_bytes() == MODEL_BIN
+    assert server.ranges[0] == (PART + 1000, 2 * PART)
+    assert server.served == len(MODEL_BIN) - PART - 1000
+
+
+def test_sha256_mismatch_is_rejected(server, tmp_path):
+    assert not _download(server, tmp_path, sha256="0" * 64)
+    assert not (tmp_path / "model.bin").exists()
+    assert not (tmp_path / "model.bin.part").exists()
+    assert not model_manager.is_model_downloaded(tmp_path)
@@ -0,0 +1,51 @@
+import json
+import shutil
+
+import numpy as np
+import pytest
+
+from core.quantizer import quantize_model_file, read_variables
+
+ctranslate2 = pytest.importorskip("ctranslate2")
+
+
+@pytest.fixture(params=["float16", "float32"])
+def models(request, tmp_path, make_whisper_model):
+    """(float model dir, its pre-quantized copy), for a float16 and a float32 source."""
+    source, target = make_whisper_model(tmp_path / "float", request.param), tmp_path / "int8"
+    target.mkdir()
+    for path in source.iterdir():
+        if path.name != "model.bin":
+            shutil.copy2(path, target / path.name)
+    quantize_model_file(source / "model.bin", target / "model.bin")
+    return source, target
+
+
+def _decode(model_dir, features):
+    model = ctranslate2.models.Whisper(str(model_dir), compute_type="int8")
+    encoded = np.array(model.encode(ctranslate2.StorageView.from_array(features)))
+    prompt = [json.loads((model_dir / "vocabulary.json").read_text()).index("<|startoftranscript|>"), 1, 2, 3]
+    results = model.generate(ctranslate2.StorageView.from_array(features), [prompt] * len(features),
+                             max_length=40, return_scores=True, suppress_blank=False, suppress_tokens=[])
+    return encoded, [(r.sequences_ids, r.scores) for r in results]
+
+
+def test_prequantized_copy_decodes_exactly_like_the_conversion_at_load(models):
+    source, target = models
+    features = np.random.default_rng(1).standard_normal((2, 80, 3000)).astype(np.float32)
+
+    encoded, decoded = _decode(source, features)
+    encoded_q, decoded_q = _decode(target, features)
+    assert np.array_equal(encoded, encoded_q)
+    assert decoded == decoded_q
+
+
+def test_prequantized_copy_stores_int8_matrices_and_float32_elsewhere(models):
+    _, target = models
+    with open(target / "model.bin", "rb") as f:
+        _, variables, _ = read_variables(f.read())
+        dtypes = {name: dtype for name, dtype, *_ in variables}
+    assert dtypes["decoder/layer_0/ffn/linear_0/weight"] == "int8"
+    assert dtypes["decoder/layer_0/ffn/linear_0/weight_scale"] == "float32"
+    assert dtypes["encoder/conv1/weight"] == "float32"
+    assert not {"float16", "bfloat16"} & set(dtypes.values())
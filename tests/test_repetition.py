@@ -0,0 +1,111 @@
+import pytest
+
+from core.repetition import RepetitionDetector
+
+
+def _first_trigger(segments):
+    """(index, reason) of the first segment that trips a fresh detector, or None."""
+    detector = RepetitionDetector()
+    for index, text in enumerate(segments):
+        reason = detector.check(text)
+        if reason:
+            return index, reason
+    return None
+
+
+def test_phrase_repeated_with_words_in_between_is_speech():
+    segments = [
+        " I don't know what happened yesterday, but I don't know what the others think about it.",
+        " Thank you very much for coming, I don't know what we would have done without you.",
+        " Thank you very much, all of you.",
+        " And again, thank you very much.",
+    ]
+    assert _first_trigger(segments) is None
+
+
+def test_few_back_to_back_copies_are_speech():
+    assert _first_trigger([" Thank you very much. Thank you very much. Thank you very much."]) is None
+    assert _first_trigger([" No, no, no, no, that's not what I said."]) is None
+
+
+def test_phrase_looping_across_segments():
+    segments = [" Vamos a empezar con la reunión de hoy."] + [" Gracias por ver el video."] * 10
+    index, reason = _first_trigger(segments)
+    assert reason == "repeats"
+    assert index == 4   # the fourth copy
+
+
+def test_phrase_looping_inside_one_segment():
+    detector = RepetitionDetector(max_compression=float("inf"))
+    assert detector.check(" Y entonces le dije que no, y entonces le dije que no, y entonces le dije que no.") is None
+    assert detector.check(" Y entonces le dije que no, y entonces le dije que no, y entonces le dije que no, y entonces"
+                          " le dije que no, y entonces le dije que no.") == "repeats"
+
+
+def test_single_word_loop():
+    index, reason = _first_trigger([" no"] * 40)
+    assert reason == "repeats"
+    assert index == 11   # twelve words
+
+
+def test_long_repetitive_segment_trips_compression():
+    assert _first_trigger([" " + "ja" * 200]) == (0, "compression")
+
+
+def test_tripping_segment_is_not_remembered():
+    detector = RepetitionDetector()
+    for _ in range(3):
+        assert detector.check(" Gracias por ver el video.") is None
+    assert detector.check(" Gracias por ver el video.") == "repeats"
+    assert detector.check(" Gracias por ver el video.") == "repeats"
+    detector.reset()
+    assert detector.check(" Gracias por ver el video.") is None
+
+
+class _Segment:
+    def __init__(self, start, end, text):
+        self.start, self.end, self.text = start, end, text
+
+
+class _LoopingWhisper:
+    """Every pass loops after one clean segment; so does every fallback retry."""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **options):
+        self.calls.append(options)
+        if options.get("condition_on_previous_text") is False:
+            return iter([_Segment(0.0, 1.0, " ha" * 300)]), None
+        return iter([_Segment(0.0, 2.0, " Hola a todos."), _Segment(2.0, 20.0, " ha" * 300),
+                     _Segment(20.0, 25.0, " ha" * 300)]), None
+
+
+def _guard(whisper, seconds):
+    import numpy as np
+    pytest.importorskip("faster_whisper")
+    from core import transcriber
+    from core.profiler import Trace
+
+    audio = np.zeros(int(seconds * transcriber.SAMPLE_RATE), dtype=np.float32)
+    segments, _ = whisper.transcribe(audio, language="es", task="transcribe", **transcriber.DECODE_OPTIONS)
+    interventions = []
+    out = list(transcriber._guarded_segments(whisper, audio, segments, "es", "job", interventions,
+                                             lambda t: t, Trace(enabled=False)))
+    return out, interventions
+
+
+def test_guard_skips_a_window_whose_retry_loops_too():
+    whisper = _LoopingWhisper()
+    out, interventions = _guard(whisper, 40.0)
+    assert [text for *_, text in out] == [" Hola a todos.", " Hola a todos."]
+    assert [(s, e) for s, e, _ in out] == [(0.0, 2.0), (32.0, 34.0)]
+    assert [i["action"] for i in interventions] == ["skipped", "skipped"]
+
+
+def test_guard_resumes_with_the_first_pass_options():
+    whisper = _LoopingWhisper()
+    _guard(whisper, 40.0)
+    first, retry, resumed = whisper.calls[:3]
+    assert resumed == first
+    assert retry["condition_on_previous_text"] is False
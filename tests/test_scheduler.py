@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from core.scheduler import JobScheduler
+from schemas.models import Job
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _job(name: str, created_at: float, duration=None, batch=None, priority: int = 0) -> Job:
+    return Job(id=name, created_at=created_at, duration_seconds=duration, batch_id=batch, priority=priority)
+
+
+def _drain(scheduler: JobScheduler):
+    order = []
+    while scheduler.qsize():
+        order.append(scheduler.pop_next().id)
+    return order
+
+
+def _queue(scheduler: JobScheduler, *jobs: Job) -> JobScheduler:
+    for job in jobs:
+        scheduler.put_nowait(job)
+    return scheduler
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        JobScheduler(policy="lifo")
+
+
+def test_fifo_is_submission_order_whatever_the_durations():
+    scheduler = _queue(JobScheduler("fifo", clock=_Clock()),
+                       _job("c", 3, duration=10), _job("a", 1, duration=600), _job("b", 2, duration=5))
+    assert not scheduler.needs_duration
+    assert _drain(scheduler) == ["a", "b", "c"]
+
+
+def test_shortest_first_with_unknown_durations_last():
+    clock = _Clock(now=100.0)
+    scheduler = _queue(JobScheduler("shortest", aging=0.0, clock=clock),
+                       _job("long", 1, duration=600), _job("unknown", 2), _job("short", 3, duration=30),
+                       _job("mid", 4, duration=120))
+    assert scheduler.needs_duration
+    assert _drain(scheduler) == ["short", "mid", "long", "unknown"]
+
+
+def test_shortest_ties_go_by_submission_order():
+    scheduler = _queue(JobScheduler("shortest", aging=0.0, clock=_Clock()),
+                       _job("second", 2, duration=60), _job("first", 1, duration=60))
+    assert _drain(scheduler) == ["first", "second"]
+
+
+def test_shortest_aging_lets_a_long_file_through_eventually():
+    clock = _Clock(now=0.0)
+    scheduler = JobScheduler("shortest", aging=0.1, clock=clock)
+    scheduler.put_nowait(_job("long", 0.0, duration=600))
+
+    # A steady stream of short files: one arrives and one is dispatched every 10 s
+    served = []
+    for step in range(1, 1000):
+        clock.now = step * 10.0
+        scheduler.put_nowait(_job(f"short{step}", clock.now, duration=30))
+        served.append(scheduler.pop_next().id)
+        if "long" in served:
+            break
+    assert "long" in served
+    # It waited until 600 s - 0.1 * waited < 30 s - 0.1 * 0, i.e. a bit over 5700 s
+    assert 5700 <= clock.now <= 5720
+
+
+def test_shortest_without_aging_starves_a_long_file():
+    clock = _Clock(now=0.0)
+    scheduler = JobScheduler("shortest", aging=0.0, clock=clock)
+    scheduler.put_nowait(_job("long", 0.0, duration=600))
+    for step in range(1, 200):
+        clock.now = step * 10.0
+        scheduler.put_nowait(_job(f"short{step}", clock.now, duration=30))
+        assert scheduler.pop_next().id != "long"
+
+
+def test_fair_round_robins_between_batches():
+    scheduler = _queue(JobScheduler("fair", clock=_Clock()),
+                       *[_job(f"big{i}", i, batch="big") for i in range(4)],
+                       _job("small0", 10, batch="small"), _job("small1", 11, batch="small"),
+                       _job("single", 12))
+    assert _drain(scheduler) == ["big0", "small0", "single", "big1", "small1", "big2", "big3"]
+
+
+def test_fair_does_not_starve_a_late_batch():
+    scheduler = _queue(JobScheduler("fair", clock=_Clock()), *[_job(f"big{i}", i, batch="big") for i in range(50)])
+    for _ in range(10):
+        scheduler.pop_next()
+    scheduler.put_nowait(_job("late", 100, batch="late"))
+    assert scheduler.pop_next().id == "late"
+
+
+@pytest.mark.parametrize("policy", ["fifo", "shortest", "fair"])
+def test_priority_outranks_every_policy(policy):
+    scheduler = _queue(JobScheduler(policy, clock=_Clock()),
+                       _job("first", 1, duration=5, batch="x"), _job("urgent", 9, duration=900, batch="x", priority=1))
+    assert scheduler.ordered()[0].id == "urgent"
+    assert _drain(scheduler) == ["urgent", "first"]
+
+
+def test_durations_probed_while_waiting_reorder_the_queue():
+    scheduler = _queue(JobScheduler("shortest", aging=0.0, clock=_Clock()), _job("a", 1), _job("b", 2, duration=60))
+    assert [j.id for j in scheduler.ordered()] == ["b", "a"]
+    scheduler.ordered()[1].duration_seconds = 10
+    assert [j.id for j in scheduler.ordered()] == ["a", "b"]
+
+
+def test_remove_takes_a_job_out_of_the_waiting_room():
+    a, b = _job("a", 1), _job("b", 2)
+    scheduler = _queue(JobScheduler("fifo", clock=_Clock()), a, b)
+    assert scheduler.remove(a)
+    assert not scheduler.remove(a)
+    assert _drain(scheduler) == ["b"]
+
+
+def test_get_waits_for_a_job():
+    async def scenario():
+        scheduler = JobScheduler("fifo", clock=_Clock())
+        waiter = asyncio.create_task(scheduler.get())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        scheduler.put_nowait(_job("a", 1))
+        return (await asyncio.wait_for(waiter, 1)).id
+
+    assert asyncio.run(scenario()) == "a"
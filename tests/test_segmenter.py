@@ -0,0 +1,110 @@
+import threading
+import wave
+
+import numpy as np
+import pytest
+
+from core.media_processor import SAMPLE_RATE
+from core.segmenter import SpeechTimeline, clip_regions, join_speech, merge_vad_reports, samples_energy_db, speech_regions
+
+REGIONS = [(1.0, 3.0), (5.5, 6.0), (10.0, 12.25)]   # joined: [0, 2) [2, 2.5) [2.5, 4.75]
+
+
+def test_timeline_inside_regions():
+    timeline = SpeechTimeline(REGIONS)
+    assert timeline.original(0.0) == 1.0
+    assert timeline.original(1.5) == 2.5
+    assert timeline.original(2.25) == 5.75
+    assert timeline.original(3.5) == 11.0
+
+
+def test_timeline_at_joins_start_goes_to_the_next_region_and_end_to_the_previous():
+    timeline = SpeechTimeline(REGIONS)
+    assert timeline.original(2.0) == 5.5
+    assert timeline.original(2.0, is_end=True) == 3.0
+    assert timeline.original(2.5) == 10.0
+    assert timeline.original(2.5, is_end=True) == 6.0
+
+
+def test_timeline_at_the_very_start_and_end():
+    timeline = SpeechTimeline(REGIONS)
+    assert timeline.original(0.0, is_end=True) == 1.0
+    assert timeline.original(4.75) == 12.25
+    assert timeline.original(4.75, is_end=True) == 12.25
+
+
+def test_timeline_past_the_last_region_clamps_to_its_end():
+    timeline = SpeechTimeline(REGIONS)
+    assert timeline.original(4.8) == 12.25
+    assert timeline.original(100.0, is_end=True) == 12.25
+
+
+def test_timeline_segment_spanning_a_join():
+    # A segment decoded across two regions starts in the first and ends in the second
+    timeline = SpeechTimeline(REGIONS)
+    assert (timeline.original(1.75), timeline.original(2.4, is_end=True)) == (2.75, 5.9)
+
+
+def test_join_speech_matches_the_timeline():
+    samples = np.arange(13 * SAMPLE_RATE, dtype=np.float32)
+    joined = join_speech(samples, REGIONS)
+    assert len(joined) == int(4.75 * SAMPLE_RATE)
+    timeline = SpeechTimeline(REGIONS)
+    for t in (0.0, 1.999, 2.0, 2.3, 2.5, 4.7):
+        assert joined[int(t * SAMPLE_RATE)] == samples[int(round(timeline.original(t) * SAMPLE_RATE))]
+
+
+def test_clip_regions_is_relative_to_the_range():
+    assert clip_regions(REGIONS, 2.0, 11.0) == [(0.0, 1.0), (3.5, 4.0), (8.0, 9.0)]
+    assert clip_regions(REGIONS, 6.0, 10.0) == []
+
+
+def _tones(seconds, voiced):
+    rng = np.random.default_rng(0)
+    audio = rng.normal(0, 0.001, int(seconds * SAMPLE_RATE)).astype(np.float32)
+    for start, end in voiced:
+        t = np.arange(int((end - start) * SAMPLE_RATE)) / SAMPLE_RATE
+        audio[int(start * SAMPLE_RATE):int(start * SAMPLE_RATE) + len(t)] += 0.3 * np.sin(2 * np.pi * 220 * t)
+    return audio
+
+
+def test_energy_gate_finds_padded_speech_and_bridges_short_pauses():
+    audio = _tones(20.0, [(2.0, 4.0), (4.5, 6.0), (12.0, 13.0)])
+    regions = speech_regions(samples_energy_db(audio), min_silence_seconds=1.0, pad_seconds=0.3)
+    assert regions == [(1.7, 6.3), (11.7, 13.3)]
+
+
+def test_energy_gate_on_silence_finds_nothing():
+    assert speech_regions(samples_energy_db(np.zeros(5 * SAMPLE_RATE, dtype=np.float32))) == []
+
+
+def test_merge_vad_reports():
+    reports = [{"audio_seconds": 10, "speech_seconds": 4, "saved_seconds": 1.5}, None,
+               {"audio_seconds": 5, "speech_seconds": 5, "saved_seconds": 0.0}]
+    assert merge_vad_reports(reports) == {"audio_seconds": 15, "speech_seconds": 9, "saved_seconds": 1.5}
+    assert merge_vad_reports([None]) is None
+
+
+def test_transcript_timestamps_land_on_the_original_timeline(tmp_path, monkeypatch):
+    pytest.importorskip("faster_whisper")
+    from core import transcriber
+
+    monkeypatch.setattr(transcriber, "_model", None)
+    path = tmp_path / "audio.wav"
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(np.zeros(13 * SAMPLE_RATE, dtype=np.int16).tobytes())
+    pause, cancel = threading.Event(), threading.Event()
+    pause.set()
+
+    class _Progress:
+        def put(self, msg):
+            pass
+
+    # The stub engine emits one segment per 5 s of the audio it is given: here the 4.75 s of joined speech
+    result = transcriber.run_transcription("job", path, "es", 13.0, pause, cancel, _Progress(), engine="stub",
+                                           vad="energy", speech_regions=REGIONS)
+    assert [(seg["start"], seg["end"]) for seg in result["segments"]] == [(1.0, 12.25)]
+    assert result["vad"]["speech_seconds"] == 4.75 and result["vad"]["audio_seconds"] == 13.0
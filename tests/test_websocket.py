@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from api.websocket import ClientChannel, ConnectionManager
+
+
+class _Socket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+def _events(socket):
+    return [(m["event"], m.get("progress", m.get("status"))) for m in socket.sent]
+
+
+async def _flush():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_newer_progress_goes_after_a_status_change_queued_in_between():
+    async def scenario():
+        manager, socket = ConnectionManager(), _Socket()
+        manager._channels[socket] = ClientChannel(socket)
+        # All queued before the writer gets to run
+        await manager.broadcast({"event": "progress", "job_id": "a", "progress": 0.5})
+        await manager.broadcast({"event": "status_change", "job_id": "a", "status": "paused"})
+        await manager.broadcast({"event": "progress", "job_id": "a", "progress": 0.6})
+        await _flush()
+        manager.disconnect(socket)
+        return socket
+
+    assert _events(asyncio.run(scenario())) == [("status_change", "paused"), ("progress", 0.6)]
+
+
+def test_progress_coalesces_per_job_and_other_events_are_kept():
+    async def scenario():
+        socket = _Socket()
+        channel = ClientChannel(socket)
+        for progress in (0.1, 0.2, 0.3):
+            channel.enqueue(json.dumps({"event": "progress", "job_id": "a", "progress": progress}), ("progress", "a"))
+            channel.enqueue(json.dumps({"event": "progress", "job_id": "b", "progress": progress}), ("progress", "b"))
+            channel.enqueue(json.dumps({"event": "segment", "job_id": "a", "status": progress}))
+        await _flush()
+        channel.close()
+        return socket
+
+    socket = asyncio.run(scenario())
+    assert [e for e in _events(socket) if e[0] == "segment"] == [("segment", 0.1), ("segment", 0.2), ("segment", 0.3)]
+    assert [(m["job_id"], m["progress"]) for m in socket.sent if m["event"] == "progress"] == [("a", 0.3), ("b", 0.3)]
+
+
+def test_full_queue_rejects_new_messages_but_still_takes_replacements():
+    async def scenario():
+        channel = ClientChannel(_Socket(), max_pending=2)
+        assert channel.enqueue("{}", ("progress", "a"))
+        assert channel.enqueue("{}")
+        assert not channel.enqueue("{}")
+        assert not channel.enqueue("{}", ("progress", "b"))
+        assert channel.enqueue("{}", ("progress", "a"))
+        assert len(channel._pending) == 2 and list(channel._by_key) == [("progress", "a")]
+        channel.close()
+
+    asyncio.run(scenario())